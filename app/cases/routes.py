@@ -4,9 +4,9 @@ import uuid
 import shutil
 import os
 import datetime
-import pdfplumber
 from app.database import get_driver
-from app.services.extractor import Mind7Extractor
+from app.services.extractor import extract_evidence
+from app.services.pdf_pool import pdf_pool, PdfPoolBusy, BrokenProcessPool
 from pydantic import BaseModel
 
 # ========== CONFIGURAÇÃO DO ROUTER ==========
@@ -68,30 +68,27 @@ async def process_upload_logic(case_id: str, file: UploadFile):
     driver = get_driver()
     print(f"--> Processando Upload: {file.filename}")
     
-    file_path = f"{UPLOAD_DIR}/{case_id}_{file.filename}"
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        content = await file.read()
     except:
         return {"status": "error", "detail": "Falha IO"}
     
-    text_content = ""
-    try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text: text_content += text + "\n"
-    except Exception as e:
-        print(f"Erro PDF: {e}")
-    
     target_name = "ALVO"
     with driver.session() as session:
         res = session.run("MATCH (c:Case {id: $id}) RETURN c.title as title", id=case_id).single()
         if res: target_name = res["title"]
 
-    extractor = Mind7Extractor(raw_text=text_content, target_name=target_name)
-    phones = extractor.extract_phones()
-    addresses = extractor.extract_addresses()
+    # Texto (cache por SHA-256) + extração de telefones/endereços no pool de processos de PDF
+    phones, addresses = [], []
+    try:
+        evidence = await pdf_pool.process(content, extract_evidence, target_name)
+        phones, addresses = evidence["phones"], evidence["addresses"]
+    except PdfPoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except BrokenProcessPool:
+        raise HTTPException(status_code=503, detail="Worker de PDF caiu. Tente novamente em instantes.")
+    except Exception as e:
+        print(f"Erro PDF: {e!r}")
     
     count = 0
     doc_id = f"doc_{uuid.uuid4().hex[:8]}"
@@ -107,7 +104,7 @@ async def process_upload_logic(case_id: str, file: UploadFile):
 
         # 2. Ligar Telefones ao Documento E ao Alvo
         for p in phones:
-            if p.confidence_score > 30:
+            if p["score"] > 30:
                 session.run("""
                     MATCH (d:Document {id: $doc_id})
                     MATCH (c:Case {id: $cid})
@@ -119,7 +116,7 @@ async def process_upload_logic(case_id: str, file: UploadFile):
                     
                     MERGE (d)-[:SOURCE_OF]->(t)
                     MERGE (p)-[:HAS_PHONE]->(t)
-                """, doc_id=doc_id, cid=case_id, name=target_name, num=p.number, owner=p.registered_owner)
+                """, doc_id=doc_id, cid=case_id, name=target_name, num=p["number"], owner=p["owner"])
                 count += 1
         
         # 3. Ligar Endereços ao Documento E ao Alvo
@@ -134,12 +131,9 @@ async def process_upload_logic(case_id: str, file: UploadFile):
                 
                 MERGE (d)-[:SOURCE_OF]->(addr)
                 MERGE (p)-[:LIVES_AT]->(addr)
-            """, doc_id=doc_id, cid=case_id, name=target_name, full=a.full_address)
+            """, doc_id=doc_id, cid=case_id, name=target_name, full=a)
             count += 1
 
-    try: os.remove(file_path)
-    except: pass
-
     return {"status": "processed", "count": count, "detail": f"Evidência processada."}
 
 @router.post("/{case_id}/upload")
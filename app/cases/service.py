@@ -1,9 +1,10 @@
 ﻿import os
 import re
 import uuid
-import pdfplumber
 from datetime import datetime
 from app.db import get_driver
+from app.services.pdf_text_cache import pdf_text_cache
+from app.services.entity_tokenizer import first_by_kind, digits
 
 def create_case(title: str):
     driver = get_driver()
@@ -39,41 +40,31 @@ def extract_entities_from_pdf(file_bytes):
     # (Mantendo a mesma lógica de extração V5 que já funcionava)
     # ... (código do regex omitido para brevidade, mas o arquivo manterá o anterior se não sobrescrevermos tudo)
     # VOU REESCREVER O BLOCO DE EXTRAÇÃO COMPLETO PARA GARANTIR QUE NÃO APAGUE
-    text = ""
-    temp_filename = f"temp_{uuid.uuid4().hex}.pdf"
-    with open(temp_filename, "wb") as f: f.write(file_bytes)
     results = []
     seen = set()
     try:
-        with pdfplumber.open(temp_filename) as pdf:
-            for page in pdf.pages:
-                lines = page.extract_text().split('\n')
-                for line in lines:
-                    cpf_match = re.search(r'(?:\d{3}\.?\d{3}\.?\d{3}-?\d{2})', line)
-                    if cpf_match:
-                        cpf_val = cpf_match.group(0)
-                        possible_name = re.sub(r'(CPF|Nome|:|;|-|\.|[\d])', '', line.replace(cpf_val, "")).strip()
-                        label_text = f"{cpf_val}\n{possible_name}" if len(possible_name) > 3 else cpf_val
-                        if f"CPF:{cpf_val}" not in seen:
-                            results.append({"type": "CPF", "value": label_text})
-                            seen.add(f"CPF:{cpf_val}")
-                            continue 
-                    patterns = {
-                        "PHONE": r'\b(?:[1-9]{2})\s?(?:9\d{4}[-\s]?\d{4}|[2-5]\d{3}[-\s]?\d{4})\b',
-                        "PLACA": r'\b[A-Z]{3}[-]?[0-9][A-Z0-9][0-9]{2}\b',
-                        "EMAIL": r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-                    }
-                    for label, pat in patterns.items():
-                        match = re.search(pat, line)
-                        if match:
-                            val = match.group(0)
-                            if label == "PHONE" and (len(re.sub(r'\D','',val)) < 10 or val.startswith('0')): continue
-                            if f"{label}:{val}" not in seen:
-                                results.append({"type": label, "value": val})
-                                seen.add(f"{label}:{val}")
+        # Texto por página vem do cache por SHA-256 (mesmo PDF já lido por outra rota)
+        for page_text in pdf_text_cache.pages(file_bytes):
+            lines = page_text.split('\n')
+            for line in lines:
+                # Uma varredura por linha (tokenizador compartilhado): primeiro valor de cada tipo
+                found = first_by_kind(line)
+                cpf_val = found.get("CPF")
+                if cpf_val:
+                    possible_name = re.sub(r'(CPF|Nome|:|;|-|\.|[\d])', '', line.replace(cpf_val, "")).strip()
+                    label_text = f"{cpf_val}\n{possible_name}" if len(possible_name) > 3 else cpf_val
+                    if f"CPF:{cpf_val}" not in seen:
+                        results.append({"type": "CPF", "value": label_text})
+                        seen.add(f"CPF:{cpf_val}")
+                        continue 
+                for label in ("PHONE", "PLACA", "EMAIL"):
+                    val = found.get(label)
+                    if val:
+                        if label == "PHONE" and (len(digits(val)) < 10 or digits(val).startswith('0')): continue
+                        if f"{label}:{val}" not in seen:
+                            results.append({"type": label, "value": val})
+                            seen.add(f"{label}:{val}")
     except: pass
-    finally:
-        if os.path.exists(temp_filename): os.remove(temp_filename)
     return results
 
 def process_upload(case_id: str, file_bytes: bytes):
@@ -93,29 +84,22 @@ def process_upload(case_id: str, file_bytes: bytes):
     return {"count": len(entities)}
 
 # --- AGENTE DE BUSCA (OSINT) ---
-from duckduckgo_search import DDGS
+from app.services.web_search import web_search, error_result
 
-def search_web_intelligence(query: str, limit: int = 5):
+async def search_web_intelligence(query: str, limit: int = 5):
     """
     Realiza uma busca real na web e retorna os resultados estruturados.
-    Não abre navegador, o servidor que busca.
+    Não abre navegador, o servidor que busca (assíncrono, com cache por consulta).
     """
-    results = []
     try:
-        with DDGS() as ddgs:
-            # Busca textual
-            search_gen = ddgs.text(query, region="br-pt", safesearch="off", max_results=limit)
-            for r in search_gen:
-                results.append({
-                    "title": r.get("title"),
-                    "link": r.get("href"),
-                    "snippet": r.get("body")
-                })
+        return await web_search.search(query, limit)
     except Exception as e:
         print(f"Erro na busca OSINT: {e}")
-        return [{"title": "Erro na busca", "snippet": str(e), "link": "#"}]
-    
-    return results
+        return error_result(e)
+
+async def search_web_intelligence_many(queries: list, limit: int = 5):
+    """Várias consultas de uma vez, em paralelo sob rate limit -> {consulta: resultados}."""
+    return await web_search.search_many(queries, limit)
 
 # --- PERSISTÊNCIA DE INTELIGÊNCIA (MIND-7 TO GRAPH) ---
 def save_intelligence_to_case(case_id: str, data: dict):
@@ -1,17 +1,22 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks
-from fastapi.responses import StreamingResponse, HTMLResponse
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse, HTMLResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-import subprocess
 import os
 import sys
 import json
 import asyncio
+import functools
+import math
+import sqlite3
 import httpx
 import traceback
 import io
 import re
+import shutil
+import tempfile
+import time
 from datetime import datetime
 from jinja2 import Template
 
@@ -60,11 +65,29 @@ except ImportError as e:
         addresses: List[Any]
         emails: List[Any] = [] # Adicionado para evitar erro de frontend
 
-# --- IMPORTS DE BUSCA ---
-try:
-    from googlesearch import search as google_search
-except ImportError:
-    google_search = None
+from app.services.tool_runner import tool_runner
+from app.services.scan_cache import scan_cache, search_cache
+
+from app.services.dorks import iter_dorks, fallback_links
+from app.services.jobs import job_queue
+from app.services.site_prober import site_prober
+from app.services.holehe_batch import holehe_batch, build_email_matrix
+from app.services.email_domains import email_domains, DOMAIN_LABELS
+from app.services.site_health import site_health, percentile
+from app.services.maigret_report import (
+    find_reports, iter_maigret_hits, maigret_scope, maigret_site_names, MAIGRET_DEFAULT_TIMEOUT
+)
+from app.services.negative_cache import negative_cache
+from app.services.artifact_store import artifact_store
+from app.services.web_search import web_search
+from app.services.pdf_text_cache import pdf_text_cache
+from app.services.entity_tokenizer import tokenize
+from app.services.pdf_pool import pdf_pool, PdfPoolBusy, BrokenProcessPool
+from app.services.scan_control import scan_registry, ScanCancelled
+from app.services.username_variants import generate_variants, merge_profiles, OSINT_VARIANTS_MAX
+from app.services.tiered_scan import (
+    start_tiered_scan, get_state, parse_tags, MAIGRET_FAST_TOP, MAIGRET_DEEP_TOP
+)
 
 app = FastAPI(title="DeltaTrace Intelligence - All-Source Engine")
 
@@ -105,6 +128,20 @@ def startup_event():
     except:
         print("[AVISO] Banco de dados offline ou não configurado.")
 
+@app.on_event("startup")
+async def warm_tools_event():
+    # Sobe os workers quentes em background para não atrasar o boot
+    if tool_runner.pool:
+        asyncio.create_task(tool_runner.pool.prewarm())
+    asyncio.create_task(pdf_pool.prewarm())
+
+@app.on_event("shutdown")
+async def close_tools_event():
+    if tool_runner.pool:
+        await tool_runner.pool.close()
+    await web_search.close()
+    await pdf_pool.close()
+
 @app.get("/")
 def read_root():
     return {"status": "DeltaTrace Intelligence Online", "version": "5.6 - HTML Export"}
@@ -114,91 +151,244 @@ async def health_check():
     return {"status": "online", "timestamp": datetime.now().isoformat()}
 
 # ==========================================
-# 1. FERRAMENTAS OSINT (VERSÃO SÍNCRONA PARA WINDOWS)
+# 1. FERRAMENTAS OSINT (MOTOR ASSÍNCRONO - app/services/tool_runner.py)
 # ==========================================
 
-def run_tool_sync(cmd_list):
-    """Executa comando de forma síncrona para evitar erro asyncio no Windows"""
-    print(f"[DEBUG COMANDO] {' '.join(cmd_list)}")
+# Opções de linha de comando de cada ferramenta (também entram na chave do cache)
+SHERLOCK_ARGS = ["--print-found", "--print-all", "--timeout", "15", "--no-color"]
+MAIGRET_BASE_ARGS = ["--no-progressbar", "--no-color", "--print-not-found", "-J", "simple"]
+MAIGRET_ARGS = ["--timeout", "40", *MAIGRET_BASE_ARGS]
+HOLEHE_ARGS = ["--only-used", "--no-color", "--timeout", "10"]
+
+def parse_sherlock_line(line: str):
+    """Converte uma linha '[+] Site: url' do Sherlock em hit estruturado."""
+    if "[+]" not in line or "http" not in line:
+        return None
+    parts = line.split(": ", 1)
+    if len(parts) != 2:
+        return None
+    url = parts[1].strip()
+    site_name = url.split("//")[-1].split("/")[0].replace("www.", "")
+    return {"tool": "Sherlock", "site": site_name, "url": url}
+
+def parse_maigret_line(line: str, username: str):
+    """Hit preliminar do stdout ('[+] Site: url'); o relatório JSON traz os dados completos."""
+    if "[+]" not in line or "http" not in line:
+        return None
+    parts = line.split("[+]", 1)[1].split(": ", 1)
+    if len(parts) != 2:
+        return None
+    url = parts[1].strip().split()[0]
+    return {"tool": "Maigret", "site": parts[0].strip(), "url": url}
+
+NOT_FOUND_RE = re.compile(r"^\[-\]\s*(.+?):\s*Not Found!", re.IGNORECASE)
+
+def parse_not_found_line(line: str):
+    """'[-] Site: Not Found!' (Sherlock --print-all / Maigret --print-not-found) -> nome do site."""
+    m = NOT_FOUND_RE.match(line.strip())
+    return m.group(1).strip() if m else None
+
+def parse_holehe_line(line: str):
+    if "[+]" not in line:
+        return None
+    site = line.split(":")[-1].strip() if ":" in line else line.replace("[+]", "").strip()
+    return {"tool": "Holehe", "site": site, "status": "Cadastrado"}
+
+def _flag_value(args: list, flag: str, default=None):
+    """Último valor de uma opção numa linha de comando (o argparse das ferramentas também usa o último)."""
+    value = default
+    for current, following in zip(args, args[1:]):
+        if current == flag:
+            value = following
+    return value
+
+async def _scan_scope(tool: str, username: str, site_names, refresh: bool, default_timeout: float,
+                      top_flag: str = None, restrict: bool = False):
+    """
+    Recorte do scan da CLI (--site ... e --timeout), com os mesmos dados das sondagens em lote:
+    - cache negativo: sites com 'Not Found' recente ficam de fora (refresh ignora o cache)
+    - circuit breaker (site_health): sites com circuito aberto ficam de fora
+    - --timeout: p95 dos timeouts adaptativos dos sites que sobraram (sem amostras = padrão),
+      nunca acima de default_timeout
+    site_names() = exatamente os sites que o scan rodaria (no Maigret, o top-N/tags da linha de
+    comando); as sondagens poupadas contam só dentro desse conjunto. top_flag (--top-sites no
+    Maigret) vai junto com len(keep): sem ele a ferramenta cortaria a lista pelo padrão dela.
+    restrict=True sempre passa a lista (site_names() já é um recorte, ex.: camada profunda).
+    Devolve (args extras, sondagens poupadas); args None = nenhum site a sondar.
+    """
+    try:
+        names = site_names()
+    except (OSError, ValueError, ModuleNotFoundError) as e:
+        print(f"[{tool.upper()}] Lista de sites indisponível ({e}); scan completo.")
+        return [], 0
+    absent = set() if refresh else await negative_cache.absent(username)
+    try:
+        plan = await site_health.plan(names, default_timeout)
+    except sqlite3.Error as e:
+        print(f"[{tool.upper()}] Histórico de sites indisponível ({e}); sem circuit breaker.")
+        plan = {"timeouts": {}, "open": []}
+    open_sites = {n.lower() for n in plan["open"]}
+    keep = [n for n in names if n.lower() not in absent and n.lower() not in open_sites]
+    saved = sum(1 for n in names if n.lower() in absent)
+    if saved:
+        print(f"--> [{tool.upper()}] Cache negativo: {saved} sondagens poupadas para {username}")
+    if open_sites:
+        print(f"--> [{tool.upper()}] Circuito aberto: {len(open_sites)} sites fora do scan")
+    if not keep:
+        return None, saved
+
+    args = []
+    timeouts = sorted(plan["timeouts"].get(n, default_timeout) for n in keep)
+    timeout = math.ceil(min(default_timeout, percentile(timeouts, 0.95)))
+    if timeout < default_timeout:
+        args += ["--timeout", str(timeout)]
+    if len(keep) < len(names) or restrict:
+        args += [arg for n in keep for arg in ("--site", n)]
+        if top_flag:
+            args += [top_flag, str(len(keep))]
+    return args, saved
+
+async def _store_artifacts(tool: str, target: str, out_dir: str):
+    """Arquivos gerados pela ferramenta vão para o armazém de artefatos (a pasta temporária é apagada)."""
     try:
-        # encoding latin-1 evita erro de caractere estranho no console
-        result = subprocess.run(
-            cmd_list,
-            capture_output=True,
-            text=True,
-            encoding='latin-1',
-            errors='ignore',
-            timeout=90 
-        )
-        return result.stdout, result.stderr
-    except subprocess.TimeoutExpired:
-        return "", "Timeout excedido na execução da ferramenta."
+        return await artifact_store.put_dir(tool, target, out_dir)
     except Exception as e:
-        return "", str(e)
+        print(f"[ARTEFATOS] Falha ao guardar saída do {tool} ({target}): {e}")
+        return []
 
-async def run_sherlock(username: str):
+async def run_sherlock(username: str, on_hit=None, refresh: bool = False, stats: dict = None):
     print(f"--> [SHERLOCK] Buscando: {username}")
-    cmd = [sys.executable, "-m", "sherlock_project", username, "--print-found", "--timeout", "15", "--no-color"]
-    
-    stdout, stderr = await asyncio.to_thread(run_tool_sync, cmd)
+    site_args, saved = await _scan_scope(
+        "sherlock", username, lambda: list(site_prober.sites()), refresh,
+        float(_flag_value(SHERLOCK_ARGS, "--timeout"))
+    )
+    if stats is not None:
+        stats["probes_saved"] = saved
+    if site_args is None:
+        return [{"info": "Nenhum resultado encontrado no Sherlock (cache negativo / circuito aberto)."}]
+    # Pasta própria por execução (nada de <username>.txt no diretório do processo)
+    out_dir = tempfile.mkdtemp(prefix="sherlock_")
+    cmd = [sys.executable, "-m", "sherlock_project", username, *SHERLOCK_ARGS, *site_args, "-fo", out_dir]
 
-    if stdout: print(f"[SHERLOCK STDOUT]: {stdout[:200]}...")
+    found, found_sites, absent = [], [], []
+    def on_line(line):
+        hit = parse_sherlock_line(line)
+        if hit:
+            found.append(hit)
+            found_sites.append(line.split("]", 1)[-1].split(": ", 1)[0].strip())
+            if on_hit: on_hit(hit)
+            return
+        site = parse_not_found_line(line)
+        if site:
+            absent.append(site)
+
+    try:
+        run = await tool_runner.run("sherlock", cmd, timeout=90, on_line=on_line, keep_output=False)
+        await _store_artifacts("sherlock", username, out_dir)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+        # Também em timeout/cancelamento: os "Not Found" já vistos continuam valendo
+        await negative_cache.update("sherlock", username, absent, found_sites, saved)
+    stderr = run["stderr"]
     if stderr and "Update" not in stderr:
         print(f"[SHERLOCK STDERR]: {stderr[:500]}")
 
-    found = []
-    if stdout:
-        for line in stdout.split('\n'):
-            if "[+]" in line and "http" in line:
-                try:
-                    parts = line.split(": ", 1)
-                    if len(parts) == 2:
-                        url = parts[1].strip()
-                        site_name = url.split("//")[-1].split("/")[0].replace("www.", "")
-                        found.append({"tool": "Sherlock", "site": site_name, "url": url})
-                except: continue
-    
     if not found:
         return [{"info": "Nenhum resultado encontrado no Sherlock."}]
         
     return found
 
-async def run_maigret(username: str):
+async def run_maigret(username: str, on_hit=None, args=None, timeout: float = 90,
+                      refresh: bool = False, stats: dict = None, skip_top: int = 0, lane: str = None):
+    """
+    skip_top: pula os primeiros N sites do ranking (já sondados pela camada rápida).
+    lane: faixa do tool_runner para execuções longas em background (ver tool_runner.run).
+    """
     print(f"--> [MAIGRET] Deep Scan: {username}")
-    cmd = [sys.executable, "-m", "maigret", username, "--timeout", "40", "--no-progressbar", "--print-not-found"]
-    
-    stdout, stderr = await asyncio.to_thread(run_tool_sync, cmd)
-    
-    if stderr: print(f"[MAIGRET STDERR]: {stderr[:500]}")
+    args = args or MAIGRET_ARGS
+    top, tags = maigret_scope(args)
+    site_args, saved = await _scan_scope(
+        "maigret", username, lambda: maigret_site_names(top, tags)[skip_top:], refresh,
+        float(_flag_value(args, "--timeout", MAIGRET_DEFAULT_TIMEOUT)),
+        top_flag="--top-sites", restrict=skip_top > 0
+    )
+    if stats is not None:
+        stats["probes_saved"] = saved
+    if site_args is None:
+        return [{"info": "Nenhum resultado no Maigret (cache negativo / circuito aberto)."}]
+    # Pasta própria por execução: scans simultâneos do mesmo nome não colidem em reports/
+    out_dir = tempfile.mkdtemp(prefix="maigret_")
+    cmd = [sys.executable, "-m", "maigret", username, *args, *site_args, "-fo", out_dir]
+
+    results, absent = [], []
+    def on_line(line):
+        hit = parse_maigret_line(line, username)
+        if hit:
+            results.append(hit)
+            if on_hit: on_hit(hit)
+            return
+        site = parse_not_found_line(line)
+        if site:
+            absent.append(site)
+
+    try:
+        run = await tool_runner.run("maigret", cmd, timeout=timeout, on_line=on_line, keep_output=False, lane=lane)
+        if run["stderr"]: print(f"[MAIGRET STDERR]: {run['stderr'][:500]}")
+
+        # Relatório JSON (tags, rank, checkType...) substitui os hits preliminares do stdout
+        reports = find_reports(out_dir)
+        if reports:
+            try:
+                structured = await asyncio.to_thread(lambda: [h for path in reports for h in iter_maigret_hits(path)])
+                results = structured
+            except ValueError as e:
+                print(f"[MAIGRET] Relatório JSON incompleto ({e}). Usando stdout.")
+        await _store_artifacts("maigret", username, out_dir)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+        # Também em timeout/cancelamento: os "Not Found" já vistos continuam valendo
+        await negative_cache.update("maigret", username, absent, [h["site"] for h in results], saved)
 
-    results = []
-    if stdout:
-        for line in stdout.split('\n'):
-            if "http" in line and username in line:
-                results.append({"tool": "Maigret", "raw_data": line.strip()})
-    
     if not results:
             return [{"info": "Nenhum resultado no Maigret."}]
 
     return results
 
-async def run_holehe(email: str):
+OSINT_HOLEHE_SKIP_DISPOSABLE = os.getenv("OSINT_HOLEHE_SKIP_DISPOSABLE", "1") == "1"
+
+def holehe_skip_reason(email: str):
+    """Domínio descartável/inválido: serviços quase nunca têm conta nele, não vale gastar o Holehe."""
+    if not OSINT_HOLEHE_SKIP_DISPOSABLE:
+        return None
+    kind = email_domains.classify_email(email)
+    if kind in ("disposable", "invalid"):
+        return [{"tool": "Holehe", "email": email, "domain_type": kind,
+                 "info": f"Holehe não executado: domínio {DOMAIN_LABELS[kind].lower()}."}]
+    return None
+
+async def run_holehe(email: str, on_hit=None):
+    skipped = holehe_skip_reason(email)
+    if skipped:
+        print(f"--> [HOLEHE] Ignorado ({skipped[0]['domain_type']}): {email}")
+        return skipped
     print(f"--> [HOLEHE] Verificando: {email}")
-    cmd = [sys.executable, "-m", "holehe", email, "--only-used", "--no-color", "--timeout", "10"]
-    
-    stdout, stderr = await asyncio.to_thread(run_tool_sync, cmd)
+    cmd = [sys.executable, "-m", "holehe", email, *HOLEHE_ARGS]
 
-    if stderr: print(f"[HOLEHE STDERR]: {stderr[:200]}")
-    
     results = []
-    if stdout:
-        for line in stdout.split('\n'):
-            if "[+]" in line:
-                site = line.split(":")[-1].strip() if ":" in line else line.replace("[+]", "").strip()
-                results.append({"tool": "Holehe", "site": site, "status": "Cadastrado"})
+    def on_line(line):
+        hit = parse_holehe_line(line)
+        if hit:
+            results.append(hit)
+            if on_hit: on_hit(hit)
+
+    run = await tool_runner.run("holehe", cmd, timeout=90, on_line=on_line, keep_output=False)
+    if run["stderr"]: print(f"[HOLEHE STDERR]: {run['stderr'][:200]}")
     
     if results: return results
 
+    return holehe_manual_checks(email)
+
+def holehe_manual_checks(email: str):
     return [
         {
             "tool": "Holehe",
@@ -211,72 +401,60 @@ async def run_holehe(email: str):
         }
     ]
 
-def run_dorks(query: str):
-    print(f"--> [DORKS FULL MODE] Buscando: {query}")
-
-    # Lista OSINT profissional (15+)
-    dorks = [
-        f'"{query}"',
-        f'"{query}" CPF',
-        f'"{query}" RG',
-        f'"{query}" processo',
-        f'site:jusbrasil.com.br "{query}"',
-        f'site:escavador.com "{query}"',
-        f'site:linkedin.com/in "{query}"',
-        f'site:facebook.com "{query}"',
-        f'site:instagram.com "{query}"',
-        f'site:twitter.com "{query}"',
-        f'site:x.com "{query}"',
-        f'site:github.com "{query}"',
-        f'site:medium.com "{query}"',
-        f'site:academia.edu "{query}"',
-        f'site:docplayer.com.br "{query}"',
-        f'"{query}" filetype:pdf',
-        f'"{query}" filetype:doc',
-        f'"{query}" filetype:xls',
-        f'"{query}" currículo',
-        f'"{query}" endereço'
-    ]
+async def run_holehe_batch(emails: list, full_matrix: bool = False):
+    """
+    Vários e-mails numa carga só (app/services/holehe_batch.py): módulos carregados uma vez,
+    um cliente HTTP compartilhado. Sem o pacote holehe no processo, cai no CLI por e-mail.
+    Devolve (resultados por e-mail no formato do run_holehe, matriz serviço x e-mail, estatísticas).
+    """
+    started = time.monotonic()
+    skipped = {}
+    for email in emails:
+        reason = holehe_skip_reason(email)
+        if reason:
+            skipped[email] = reason
+    emails = [e for e in emails if e not in skipped]
+    try:
+        checks = await holehe_batch.check_many(emails) if emails else []
+    except ModuleNotFoundError as e:
+        print(f"[HOLEHE] Lote em processo indisponível ({e}); usando o CLI por e-mail.")
+        results = await asyncio.gather(*[run_holehe(e) for e in emails])
+        return {**skipped, **dict(zip(emails, results))}, {}, {
+            "mode": "cli", "skipped": len(skipped), "elapsed": round(time.monotonic() - started, 3)}
 
-    results = []
+    per_email, matrix = build_email_matrix(emails, checks, full_matrix)
+    per_email.update(skipped)
+    for email, hits in per_email.items():
+        if hits:
+            # Mesmo formato e chave do /analyze/holehe: a checagem individual seguinte sai do cache
+            await scan_cache.set("holehe", email, hits, options={"args": HOLEHE_ARGS})
+        else:
+            per_email[email] = holehe_manual_checks(email)
+    elapsed = time.monotonic() - started
+    return per_email, matrix, {
+        "mode": "batch",
+        "services": len(checks) // max(1, len(emails)),
+        "checks": len(checks),
+        "skipped": len(skipped),
+        "rate_limited": sum(1 for c in checks if c["status"] == "rate_limited"),
+        "errors": sum(1 for c in checks if c["status"] == "error"),
+        "elapsed": round(elapsed, 3),
+    }
 
-    if google_search:
-        for dork in dorks:
-            try:
-                for url in google_search(
-                    dork,
-                    num_results=8,
-                    lang="pt",
-                ):
-                    domain = url.split("//")[-1].split("/")[0].replace("www.", "")
-                    results.append({
-                        "tool": "Dorks",
-                        "site": domain,
-                        "url": url,
-                        "query": dork
-                    })
-            except Exception as e:
-                print(f"[DORK ERROR] {dork}: {e}")
-                continue
+async def run_dorks(query: str, on_hit=None):
+    print(f"--> [DORKS FULL MODE] Buscando: {query}")
 
-    # Deduplicação
-    seen = set()
+    # Dorks em paralelo, com rate limit, cache por dork e deduplicação (app/services/dorks.py)
     final = []
-    for r in results:
-        if r["url"] not in seen:
-            seen.add(r["url"])
-            final.append(r)
+    async for hit in iter_dorks(query):
+        final.append(hit)
+        if on_hit: on_hit(hit)
 
     # Fallback inteligente (nunca menos que 5)
     if len(final) < 5:
-        fallback = [
-            {"tool": "Dorks", "site": "JusBrasil", "url": f"https://jusbrasil.com.br/busca?q={query.replace(' ', '+')}"},
-            {"tool": "Dorks", "site": "Escavador", "url": f"https://www.escavador.com/busca?qo=p&q={query.replace(' ', '+')}"},
-            {"tool": "Dorks", "site": "Google Geral", "url": f"https://www.google.com/search?q={query.replace(' ', '+')}"},
-            {"tool": "Dorks", "site": "Google PDFs", "url": f"https://www.google.com/search?q={query.replace(' ', '+')}+filetype:pdf"},
-            {"tool": "Dorks", "site": "LinkedIn", "url": f"https://www.google.com/search?q=site:linkedin.com+{query.replace(' ', '+')}"}
-        ]
-        final.extend(fallback)
+        for hit in fallback_links(query):
+            final.append(hit)
+            if on_hit: on_hit(hit)
 
     return final
 
@@ -284,55 +462,499 @@ def run_dorks(query: str):
 # 2. ROTAS DA API
 # ==========================================
 
+def _has_hits(results) -> bool:
+    """Só vale cachear quando houve achado real (placeholders/timeouts não entram no cache)."""
+    return any(isinstance(r, dict) and "info" not in r and "checks" not in r for r in results or [])
+
+async def _cached_tool(tool: str, runner, target: str, args: list, refresh: bool, negative: bool = False):
+    """negative=True: runner usa o cache negativo (refresh também ignora os 'Not Found' guardados)."""
+    scan_stats = {"probes_saved": 0}
+    producer = (lambda: runner(target, refresh=refresh, stats=scan_stats)) if negative else (lambda: runner(target))
+    results, meta = await scan_cache.get_or_run(
+        tool, target, producer, options={"args": args},
+        refresh=refresh, should_cache=_has_hits,
+    )
+    # Arquivos da execução mais recente (também quando o resultado veio do cache)
+    response = {"target": target, "results": results, "cache": meta,
+                "artifacts": await artifact_store.latest(tool, target)}
+    if negative:
+        response["probes_saved"] = scan_stats["probes_saved"]
+    return response
+
+async def _cancellable(request: Request, scan_id: str, kind: str, target: str, coro):
+    """
+    Scan atrelado à requisição: se o cliente desconectar ou chamar /analyze/cancel/{scan_id},
+    as ferramentas em execução são mortas e o scan fica registrado como cancelado.
+    """
+    try:
+        scan_id, result = await scan_registry.run(coro, request, scan_id, kind, target)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ScanCancelled as e:
+        # 499: convenção do nginx para "cliente fechou a requisição"
+        return JSONResponse(status_code=499, content={"status": "cancelled", "scan_id": e.scan_id, "reason": e.reason})
+    result["scan_id"] = scan_id
+    return result
+
 @app.post("/analyze/sherlock")
-async def api_sherlock(username: str = Form(...)):
-    results = await run_sherlock(username)
-    return {"target": username, "results": results}
+async def api_sherlock(request: Request, username: str = Form(...), refresh: bool = Form(False), scan_id: str = Form(None)):
+    return await _cancellable(request, scan_id, "sherlock", username,
+                              _cached_tool("sherlock", run_sherlock, username, SHERLOCK_ARGS, refresh, negative=True))
 
 @app.post("/analyze/maigret")
-async def api_maigret(username: str = Form(...)):
-    results = await run_maigret(username)
-    return {"target": username, "results": results}
+async def api_maigret(request: Request, username: str = Form(...), refresh: bool = Form(False), scan_id: str = Form(None)):
+    return await _cancellable(request, scan_id, "maigret", username,
+                              _cached_tool("maigret", run_maigret, username, MAIGRET_ARGS, refresh, negative=True))
 
 @app.post("/analyze/holehe")
-async def api_holehe(email: str = Form(...)):
-    results = await run_holehe(email)
-    return {"target": email, "results": results}
+async def api_holehe(request: Request, email: str = Form(...), refresh: bool = Form(False), scan_id: str = Form(None)):
+    return await _cancellable(request, scan_id, "holehe", email,
+                              _cached_tool("holehe", run_holehe, email, HOLEHE_ARGS, refresh))
+
+@app.post("/analyze/cancel/{scan_id}")
+async def api_cancel_scan(scan_id: str):
+    """Cancela um scan em andamento (mata os processos das ferramentas e libera as vagas)."""
+    if not scan_registry.cancel(scan_id):
+        raise HTTPException(status_code=404, detail="Scan não encontrado ou já finalizado.")
+    return {"status": "cancelling", "scan_id": scan_id}
+
+@app.get("/analyze/scans")
+async def api_scans():
+    """Scans em andamento e desfecho dos recentes (ok / cancelled / error)."""
+    return scan_registry.snapshot()
+
+@app.get("/analyze/cache/stats")
+async def api_cache_stats():
+    """Contadores de hit/miss/colapso e ocupação do cache OSINT (e dos caches de buscas, negativo e de texto de PDF, e do pool de PDFs)."""
+    return {
+        **await scan_cache.stats(),
+        "search": await search_cache.stats(),
+        "negative": await negative_cache.stats(),
+        "pdf_text": pdf_text_cache.stats(),
+        "pdf_pool": pdf_pool.stats(),
+    }
+
+@app.get("/analyze/artifacts")
+async def api_artifacts(tool: str = None, target: str = None, limit: int = 50):
+    """Arquivos gerados pelos scans (relatórios do Maigret, listas do Sherlock), mais recentes primeiro."""
+    return {"artifacts": await artifact_store.list_artifacts(tool, target, limit), "stats": await artifact_store.stats()}
+
+@app.get("/analyze/artifacts/{artifact_id}")
+async def api_artifact(artifact_id: str, request: Request):
+    """Serve o artefato guardado, sem rodar a ferramenta de novo (gzip direto se o cliente aceitar)."""
+    gzip_ok = "gzip" in request.headers.get("accept-encoding", "")
+    found = await artifact_store.get(artifact_id, compressed=gzip_ok)
+    if not found:
+        raise HTTPException(status_code=404, detail="Artefato não encontrado.")
+    meta, data = found
+    headers = {"Content-Disposition": f'inline; filename="{meta["name"]}"', "X-Artifact-Digest": meta["digest"]}
+    if gzip_ok:
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=data, media_type=meta["content_type"], headers=headers)
+
+@app.get("/analyze/runner")
+async def api_runner_status():
+    """Vagas, execuções ativas e histórico recente (tempo de parede / código de saída)."""
+    return tool_runner.snapshot()
+
+@app.get("/analyze/sites/health")
+async def api_sites_health(limit: int = 50, site: str = None):
+    """Percentis de latência, taxa de falha, timeout adaptativo e estado do circuito por site."""
+    return {"sites": await site_health.report(limit, site)}
 
 @app.post("/analyze/dorks")
-def api_dorks(term: str = Form(...)):
-    results = run_dorks(term)
-    return {"target": term, "results": results}
+async def api_dorks(request: Request, term: str = Form(...), scan_id: str = Form(None)):
+    async def scan():
+        return {"target": term, "results": await run_dorks(term)}
+    return await _cancellable(request, scan_id, "dorks", term, scan())
+
+@app.post("/analyze/web")
+async def api_web_search(request: Request, queries: str = Form(...), limit: int = Form(5),
+                         refresh: bool = Form(False), scan_id: str = Form(None)):
+    """Busca web (DuckDuckGo): uma consulta por linha, em paralelo sob rate limit, resultados por consulta."""
+    lines = [q.strip() for q in queries.splitlines() if q.strip()]
+    if not lines:
+        raise HTTPException(status_code=400, detail="Informe ao menos uma consulta.")
+    async def scan():
+        return {"results": await web_search.search_many(lines, limit, refresh)}
+    return await _cancellable(request, scan_id, "web", ", ".join(lines), scan())
+
+# Prazo individual de cada ferramenta e orçamento total do full_scan (segundos)
+FULL_SCAN_BUDGET = float(os.getenv("FULL_SCAN_BUDGET", "60"))
+FULL_SCAN_DEADLINES = {"sherlock": 45.0, "maigret": 55.0, "holehe": 30.0, "dorks": 40.0}
+
+async def _run_with_deadline(tool: str, runner, target: str, deadline: float, on_hit=None):
+    """Roda uma ferramenta com prazo próprio. Em timeout devolve os hits já encontrados."""
+    partial = []
+    started = time.monotonic()
+    status = "ok"
+
+    def collect(hit):
+        partial.append(hit)
+        if on_hit: on_hit(hit)
+
+    try:
+        results = await asyncio.wait_for(runner(target, on_hit=collect), deadline)
+    except asyncio.TimeoutError:
+        status = "timeout"
+        results = partial
+    except Exception as e:
+        print(f"[FULL SCAN] Erro em {tool}: {e}")
+        status = "error"
+        results = partial
+    timing = {
+        "status": status,
+        "elapsed": round(time.monotonic() - started, 3),
+        "deadline": deadline,
+        "results": len(results),
+    }
+    return tool, results, timing
+
+def _full_scan_jobs(name: str, email: str, username: str):
+    """Lista (ferramenta, runner, alvo, prazo); nenhum prazo ultrapassa o orçamento global."""
+    jobs = []
+    if username:
+        jobs.append(("sherlock", run_sherlock, username))
+        jobs.append(("maigret", run_maigret, username))
+    if email:
+        jobs.append(("holehe", run_holehe, email))
+    if name:
+        jobs.append(("dorks", run_dorks, name))
+    return [(tool, runner, target, min(FULL_SCAN_DEADLINES[tool], FULL_SCAN_BUDGET)) for tool, runner, target in jobs]
 
 @app.post("/analyze/full_scan")
 async def full_scan(
+    request: Request,
     name: str = Form(None), 
     cpf: str = Form(None), 
     email: str = Form(None), 
-    username: str = Form(None)
+    username: str = Form(None),
+    scan_id: str = Form(None)
 ):
+    return await _cancellable(request, scan_id, "full_scan", name or username or email,
+                              _full_scan(name, email, username))
+
+async def _full_scan(name: str, email: str, username: str):
+    scan_started = time.monotonic()
+    # Todas as ferramentas em paralelo
+    outcomes = await asyncio.gather(*[
+        _run_with_deadline(tool, runner, target, deadline)
+        for tool, runner, target, deadline in _full_scan_jobs(name, email, username)
+    ])
+
     consolidated_report = []
-    if username:
-        res = await run_sherlock(username)
-        if res: consolidated_report.extend(res)
-    if email:
-        res = await run_holehe(email)
-        if res: consolidated_report.extend(res)
-    if name:
-        res = run_dorks(name)
-        if res: consolidated_report.extend(res)
+    tools = {}
+    for tool, results, timing in outcomes:
+        if results: consolidated_report.extend(results)
+        tools[tool] = timing
+    timed_out = [t for t, info in tools.items() if info["status"] == "timeout"]
 
     full_report = {
         "metadata": {"exportedAt": datetime.now().isoformat(), "target": name or "Desconhecido"},
         "results": consolidated_report
     }
     return {
-        "status": "Scan Finalizado", 
+        "status": "Scan Parcial" if timed_out else "Scan Finalizado", 
         "total_results": len(consolidated_report), 
         "report_data": consolidated_report,
-        "full_report": full_report
+        "full_report": full_report,
+        "tools": tools,
+        "timed_out": timed_out,
+        "elapsed": round(time.monotonic() - scan_started, 3)
     }
 
+def _encode_stream_event(event: dict, fmt: str) -> str:
+    payload = json.dumps(event, ensure_ascii=False, default=str)
+    if fmt == "sse":
+        return f"event: {event['event']}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+def _stream_tools(jobs: list, target: str, fmt: str) -> StreamingResponse:
+    """
+    Roda as ferramentas em paralelo e devolve um stream NDJSON/SSE.
+    Eventos: 'hit' ({tool, site, url}) assim que a ferramenta imprime,
+    'tool_done' (status/tempo de cada ferramenta) e 'done' (resumo final).
+    """
+    queue = asyncio.Queue()
+
+    async def worker(tool, runner, tool_target, deadline):
+        def emit(hit):
+            queue.put_nowait({"event": "hit", **hit})
+        _, _, timing = await _run_with_deadline(tool, runner, tool_target, deadline, on_hit=emit)
+        queue.put_nowait({"event": "tool_done", "tool": tool, **timing})
+
+    async def event_stream():
+        scan_started = time.monotonic()
+        tasks = [asyncio.create_task(worker(*job)) for job in jobs]
+        pending = len(tasks)
+        total = 0
+        tools = {}
+        try:
+            while pending:
+                event = await queue.get()
+                if event["event"] == "hit":
+                    total += 1
+                else:
+                    pending -= 1
+                    tools[event["tool"]] = event["status"]
+                yield _encode_stream_event(event, fmt)
+
+            yield _encode_stream_event({
+                "event": "done",
+                "target": target,
+                "total_results": total,
+                "tools": tools,
+                "timed_out": [t for t, st in tools.items() if st == "timeout"],
+                "elapsed": round(time.monotonic() - scan_started, 3),
+            }, fmt)
+        finally:
+            # Cliente desconectou: não deixa ferramentas rodando à toa
+            for t in tasks: t.cancel()
+
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        event_stream(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/analyze/full_scan/stream")
+async def full_scan_stream(
+    name: str = Form(None), 
+    cpf: str = Form(None), 
+    email: str = Form(None), 
+    username: str = Form(None),
+    format: str = Form("ndjson")
+):
+    """Variante streaming do full_scan (NDJSON ou SSE com format=sse)."""
+    fmt = "sse" if (format or "").lower() == "sse" else "ndjson"
+    return _stream_tools(_full_scan_jobs(name, email, username), name or username or email or "Desconhecido", fmt)
+
+@app.post("/analyze/dorks/stream")
+async def api_dorks_stream(term: str = Form(...), format: str = Form("ndjson")):
+    """Dorks em streaming: cada URL sai assim que a dork correspondente termina."""
+    fmt = "sse" if (format or "").lower() == "sse" else "ndjson"
+    return _stream_tools([("dorks", run_dorks, term, FULL_SCAN_DEADLINES["dorks"])], term, fmt)
+
+# --- SCAN EM LOTE (VÁRIAS GRAFIAS DO MESMO ALVO) ---
+OSINT_BATCH_MAX_TARGETS = int(os.getenv("OSINT_BATCH_MAX_TARGETS", "25"))
+
+def _split_targets(raw: str) -> list:
+    """'a, b\nc;a' -> ['a', 'b', 'c'] (ordem preservada, sem repetição)."""
+    seen = []
+    for item in re.split(r"[,;\n]+", raw or ""):
+        item = item.strip()
+        if item and item.lower() not in [s.lower() for s in seen]:
+            seen.append(item)
+    return seen
+
+@app.post("/analyze/batch")
+async def batch_scan(
+    request: Request,
+    usernames: str = Form(None),
+    emails: str = Form(None),
+    full_matrix: bool = Form(False),
+    scan_id: str = Form(None)
+):
+    """
+    Vários usernames/e-mails como uma carga só.
+    Usernames: sondagem compartilhada (uma sessão HTTP, limites por site valendo para o lote).
+    E-mails: Holehe em lote (módulos carregados uma vez, sessão HTTP compartilhada), com matriz serviço x e-mail.
+    """
+    users = _split_targets(usernames)
+    mails = _split_targets(emails)
+    if not users and not mails:
+        raise HTTPException(status_code=400, detail="Informe usernames e/ou emails.")
+    if len(users) + len(mails) > OSINT_BATCH_MAX_TARGETS:
+        raise HTTPException(status_code=400, detail=f"Máximo de {OSINT_BATCH_MAX_TARGETS} alvos por lote.")
+    return await _cancellable(request, scan_id, "batch", ", ".join(users + mails),
+                              _batch_scan(users, mails, full_matrix))
+
+async def _batch_scan(users: list, mails: list, full_matrix: bool):
+    started = time.monotonic()
+    print(f"--> [BATCH] {len(users)} usernames, {len(mails)} e-mails")
+
+    async def no_probes():
+        return []
+
+    async def no_emails():
+        return {}, {}, {}
+
+    probes, (email_results, email_matrix, email_stats) = await asyncio.gather(
+        site_prober.probe_many(users) if users else no_probes(),
+        run_holehe_batch(mails, full_matrix) if mails else no_emails(),
+    )
+
+    targets = {u: {"type": "username", "found": 0, "results": []} for u in users}
+    matrix = {}
+    for p in probes:
+        matrix.setdefault(p["site"], {})[p["username"]] = p["status"]
+        if p["status"] == "claimed":
+            targets[p["username"]]["results"].append({"tool": "Sherlock", "site": p["site"], "url": p["url"]})
+            targets[p["username"]]["found"] += 1
+    if not full_matrix:
+        # Matriz enxuta: só sites onde ao menos um alvo existe
+        matrix = {site: row for site, row in matrix.items() if "claimed" in row.values()}
+
+    for email, results in email_results.items():
+        hits = [r for r in results if r.get("status") == "Cadastrado"]
+        targets[email] = {"type": "email", "found": len(hits), "results": results}
+
+    elapsed = time.monotonic() - started
+    return {
+        "status": "Batch Finalizado",
+        "targets": targets,
+        "matrix": matrix,
+        "email_matrix": email_matrix,
+        "stats": {
+            "usernames": len(users),
+            "emails": len(mails),
+            "probes": len(probes),
+            "circuit_open": sum(1 for p in probes if p["status"] == "circuit_open"),
+            "holehe": email_stats,
+            "elapsed": round(elapsed, 3),
+            "probes_per_second": round(len(probes) / elapsed, 1) if elapsed else 0,
+        }
+    }
+
+@app.post("/analyze/variants")
+async def variants_scan(
+    name: str = Form(...),
+    surnames: str = Form(None),
+    max_variants: int = Form(OSINT_VARIANTS_MAX),
+    run: bool = Form(True)
+):
+    """
+    Gera variantes de username a partir do nome (PersonResult.name) e, se run=true,
+    sonda todas como uma carga só, juntando os perfis por site.
+    """
+    variants = generate_variants(name, _split_targets(surnames) or None, max_variants)
+    if not variants:
+        raise HTTPException(status_code=400, detail="Nome sem tokens utilizáveis.")
+    if not run:
+        return {"target": name, "variants": variants}
+
+    started = time.monotonic()
+    usernames = [v["username"] for v in variants]
+    print(f"--> [VARIANTS] {name}: {len(usernames)} variantes")
+    probes = await site_prober.probe_many(usernames)
+
+    hits_per_variant = {u: 0 for u in usernames}
+    for p in probes:
+        if p["status"] == "claimed":
+            hits_per_variant[p["username"]] += 1
+    for v in variants:
+        v["hits"] = hits_per_variant[v["username"]]
+
+    profiles = merge_profiles(probes)
+    return {
+        "target": name,
+        "variants": variants,
+        "total_results": len(profiles),
+        "results": profiles,
+        "stats": {"probes": len(probes), "elapsed": round(time.monotonic() - started, 3)}
+    }
+
+async def _maigret_tier(username: str, args: list, deadline: float, skip_top: int = 0, lane: str = None):
+    runner = functools.partial(run_maigret, args=args, timeout=deadline + 5, skip_top=skip_top, lane=lane)
+    _, results, timing = await _run_with_deadline("maigret", runner, username, deadline)
+    return results, timing
+
+@app.post("/analyze/maigret/tiered")
+async def maigret_tiered(
+    username: str = Form(...),
+    tags: str = Form(None),
+    fast_top: int = Form(MAIGRET_FAST_TOP),
+    deep_top: int = Form(MAIGRET_DEEP_TOP),
+    deep: bool = Form(True)
+):
+    """
+    Camada rápida (top-N sites por alexaRank, filtro opcional por tag, ex.: "br,social")
+    respondida na hora; a camada profunda roda em background e é consultada no GET.
+    """
+    if fast_top < 1 or deep_top < fast_top:
+        raise HTTPException(status_code=400, detail="Use 1 <= fast_top <= deep_top.")
+    state = await start_tiered_scan(username, _maigret_tier, MAIGRET_BASE_ARGS, parse_tags(tags),
+                                    fast_top, deep_top, deep)
+    return {"target": username, "total_results": len(state["results"]), **state}
+
+@app.get("/analyze/maigret/tiered")
+async def maigret_tiered_status(
+    username: str,
+    tags: str = None,
+    fast_top: int = MAIGRET_FAST_TOP,
+    deep_top: int = MAIGRET_DEEP_TOP
+):
+    """Resultado mesclado das camadas (mesmos parâmetros do POST)."""
+    state = await get_state(username, parse_tags(tags), fast_top, deep_top)
+    if not state:
+        raise HTTPException(status_code=404, detail="Nenhum scan em camadas para esses parâmetros.")
+    return {"target": username, "total_results": len(state["results"]), **state}
+
+# ==========================================
+# 3. JOBS DE SCAN EM BACKGROUND (app/services/jobs.py)
+# ==========================================
+
+@app.on_event("startup")
+async def start_jobs_event():
+    job_queue.start(
+        runners={"sherlock": run_sherlock, "maigret": run_maigret, "holehe": run_holehe, "dorks": run_dorks},
+        executor=_run_with_deadline,
+    )
+
+@app.on_event("shutdown")
+async def stop_jobs_event():
+    await job_queue.stop()
+
+@app.post("/jobs")
+async def submit_scan_job(
+    name: str = Form(None), 
+    cpf: str = Form(None), 
+    email: str = Form(None), 
+    username: str = Form(None),
+    priority: int = Form(0)
+):
+    """Enfileira um full_scan; devolve o id na hora. Maior prioridade roda primeiro."""
+    plan = [
+        {"tool": tool, "target": target, "deadline": deadline}
+        for tool, _, target, deadline in _full_scan_jobs(name, email, username)
+    ]
+    if not plan:
+        raise HTTPException(status_code=400, detail="Informe ao menos name, email ou username.")
+    job_id = await job_queue.submit(plan, name or username or email, priority)
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "urls": {"status": f"/jobs/{job_id}", "stream": f"/jobs/{job_id}/stream", "cancel": f"/jobs/{job_id}/cancel"}
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_scan_job(job_id: str):
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_scan_job(job_id: str):
+    """Cancela o job (na fila ou rodando); o que já terminou continua em /jobs/{id}."""
+    status = await job_queue.cancel(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return {"job_id": job_id, "status": status}
+
+@app.get("/jobs/{job_id}/stream")
+async def stream_scan_job(job_id: str, format: str = "ndjson"):
+    """Progresso do job em NDJSON (ou SSE com ?format=sse) até o término."""
+    fmt = "sse" if (format or "").lower() == "sse" else "ndjson"
+
+    async def event_stream():
+        async for event in job_queue.watch(job_id):
+            yield _encode_stream_event(event, fmt)
+
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return StreamingResponse(event_stream(), media_type=media_type, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 # --- ROTA DE UPLOAD DE PDF (CORRIGIDA - EVITA ERRO 500) ---
 @app.post("/analyze/pdf", response_model=InvestigationReport)
 async def analyze_pdf_root(
@@ -349,8 +971,9 @@ async def analyze_pdf_root(
     try:
         content = await file.read()
         try:
-            from app.reports.routes import parse_mind7_pdf_to_data
-            parsed = parse_mind7_pdf_to_data(content)
+            from app.reports.routes import parse_mind7_text
+            # Extração + parse no pool de processos (não trava o event loop)
+            parsed = await pdf_pool.process(content, parse_mind7_text)
             
             if parsed.get('identificacao', {}).get('nome'):
                 final_name = parsed['identificacao']['nome']
@@ -366,7 +989,7 @@ async def analyze_pdf_root(
                         "raw_text": email_val,
                         "source_pdf": file.filename,
                         "registered_owner": "Desconhecido",
-                        "classification": "Pessoal",
+                        "classification": DOMAIN_LABELS[email_domains.classify_email(email_val)],
                         "confidence_score": 1.0
                     })
 
@@ -384,14 +1007,20 @@ async def analyze_pdf_root(
                         "classification": "Celular/Fixo",
                         "confidence_score": 1.0
                     })
+        except (PdfPoolBusy, BrokenProcessPool):
+            raise
         except Exception as e:
-            print(f"Erro no parser interno: {e}. Usando fallback.")
-            # Fallback Regex básico
+            print(f"Erro no parser interno: {e!r}. Usando fallback.")
+            # Fallback Regex básico (fora do event loop: o PDF bruto pode ser grande)
             text = content.decode('latin-1', errors='ignore')
-            email_matches = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text)
-            for em in list(set(email_matches)):
-                emails_data.append({"email": em, "raw_text": em, "source_pdf": file.filename, "registered_owner": "Auto", "classification": "Extraído", "confidence_score": 0.5})
+            email_matches = await asyncio.to_thread(lambda: {t.value for t in tokenize(text, ("EMAIL",))})
+            for em in email_matches:
+                emails_data.append({"email": em, "raw_text": em, "source_pdf": file.filename, "registered_owner": "Auto", "classification": DOMAIN_LABELS[email_domains.classify_email(em)], "confidence_score": 0.5})
 
+    except PdfPoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except BrokenProcessPool:
+        raise HTTPException(status_code=503, detail="Worker de PDF caiu. Tente novamente em instantes.")
     except Exception as e:
         print(f"[PDF ERROR] Erro fatal leitura: {e}")
 
@@ -1,11 +1,16 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from fastapi.responses import HTMLResponse
 from jinja2 import Environment, FileSystemLoader, select_autoescape
-import pdfplumber
-import io
+import asyncio
 import re
+from bisect import bisect_left
 from datetime import datetime
 
+from app.services.email_domains import email_domains
+from app.services.pdf_text_cache import pdf_text_cache
+from app.services.entity_tokenizer import first
+from app.services.pdf_pool import pdf_pool, PdfPoolBusy, BrokenProcessPool
+
 router = APIRouter()
 
 # Configuração do Jinja2 para templates HTML
@@ -14,26 +19,98 @@ env = Environment(
     autoescape=select_autoescape(["html", "xml"]),
 )
 
+# Regex compiladas uma vez (antes eram recompiladas/reaplicadas linha a linha em cada seção)
+DATE_OR_NI_RE = re.compile(r"\d{2}/\d{2}/\d{4}|N/I")
+PRIORITY_RE = re.compile(r"PRIORIDADE:\s*([0-9.]+)")
+INTERNET_RE = re.compile(r"[A-Za-z]+Internet")
+
+# Rótulos procurados pelo parser (indexados numa passada só pelo Mind7Index)
+MIND7_LABELS = (
+    "Nome Completo", "Nome da Mãe", "Nome do Pai", "CPF", "Data de Nascimento", "Sexo",
+    "Estado Civil", "Renda", "Faixa de Renda", "Nacionalidade", "Email", "Data Atualização",
+    "Código Controle", "RECEITA FEDERAL (2023)", "Nome", "Titulo Eleitor", "Nascimento",
+    "Situação Cadastral", "Residente Exterior", "Endereço", "Telefone", "NOME NA RECEITA",
+    "NÍVEL DATA INCLUSÃO", "HISTÓRICO PROFISSIONAL", "RAIS", "TELEFONES", "HISTÓRICO OPERADORAS",
+    "TELEFONE DATA OPERADORA ATALHO", "✉  E-MAILS", "E-MAILS", "E-MAIL", "EMAILS", "EMAIL",
+    "ENDEREÇOS", "PARENTES", "CLASSE SOCIAL", "INFORMAÇÕES DE CRÉDITO", "PODER AQUISITIVO",
+    "TARGET DE RENDA", "RISCO DE CRÉDITO", "Segmento", "DOCUMENTOS", "PIS", "NIS", "RG",
+    "IMPOSTO DE RENDA (IRPF)", "CREDIT ANALYTICS",
+)
+
+
+class Mind7Index:
+    """
+    Índice das linhas do relatório montado numa passada só.
+    - rótulo -> posições das linhas iguais ao rótulo ou terminadas nele (regra do antigo
+      find_line); a busca "primeira ocorrência a partir de start" vira um bisect
+    - data/telefone de cada linha calculados uma única vez, sob demanda
+    """
+
+    def __init__(self, lines: list, labels=MIND7_LABELS):
+        self.lines = lines
+        self._positions = {label: [] for label in labels}
+        # Candidatos agrupados pelo último caractere e pelo tamanho: a maioria das linhas
+        # não termina em nenhum rótulo e sai com uma consulta de dicionário
+        by_last = {}
+        for label in labels:
+            by_last.setdefault(label[-1], {}).setdefault(len(label), set()).add(label)
+        self._by_last = {ch: list(groups.items()) for ch, groups in by_last.items()}
+        for i, line in enumerate(lines):
+            for size, group in self._by_last.get(line[-1:], ()):
+                tail = line[-size:]
+                if tail in group:
+                    self._positions[tail].append(i)
+        self._dates = {}
+        self._phones = {}
+
+    def positions(self, label: str) -> list:
+        found = self._positions.get(label)
+        if found is None:  # rótulo fora da lista: uma varredura, depois fica indexado
+            found = self._positions[label] = [
+                i for i, line in enumerate(self.lines) if line == label or line.endswith(label)
+            ]
+        return found
+
+    def find(self, label: str, start: int = 0) -> int:
+        found = self.positions(label)
+        k = bisect_left(found, start)
+        return found[k] if k < len(found) else -1
+
+    def date(self, i: int):
+        """Primeira data dd/mm/aaaa da linha i (ou None)."""
+        if i not in self._dates:
+            self._dates[i] = first(self.lines[i], "DATE")
+        return self._dates[i]
+
+    def phone(self, i: int):
+        """Primeiro telefone da linha i pelo tokenizador de entidades (ou None)."""
+        if i not in self._phones:
+            self._phones[i] = first(self.lines[i], "PHONE")
+        return self._phones[i]
+
+
 def parse_mind7_pdf_to_data(file_bytes: bytes) -> dict:
     """
     Parser do relatório MIND-7 (CPF) para o modelo de dados do relatório Delta Trace.
-    - Usa pdfplumber para extrair texto
-    - Trabalha linha a linha
-    - Usa regex para capturar datas, CEP, telefones, etc.
+    - Usa pdfplumber para extrair texto (cache por SHA-256 do arquivo)
+    - O parse propriamente dito fica em parse_mind7_text
     """
-    # ---- 1. Extrair texto bruto ----
-    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-        texts = [page.extract_text() or "" for page in pdf.pages]
+    # ---- 1. Extrair texto bruto (cache por SHA-256 do arquivo) ----
+    return parse_mind7_text(pdf_text_cache.pages(file_bytes))
 
+
+def parse_mind7_text(texts: list) -> dict:
+    """
+    Parse do texto por página do MIND-7.
+    - Trabalha linha a linha, com índice de rótulos montado uma vez (Mind7Index)
+    - Usa regex para capturar datas, CEP, telefones, etc.
+    """
     full_text = "\n".join(texts)
     lines = [l.strip() for l in full_text.splitlines() if l.strip()]
+    index = Mind7Index(lines)
 
     # Helpers
-    def find_line(label: str, start: int = 0) -> int:
-        for i in range(start, len(lines)):
-            if lines[i] == label or lines[i].endswith(label):
-                return i
-        return -1
+    find_line = index.find
 
     def val_after(label: str, start: int = 0, default: str = "Não informado"):
         idx = find_line(label, start)
@@ -145,7 +222,7 @@ def parse_mind7_pdf_to_data(file_bytes: bytes) -> dict:
         if prof_idx != -1:
             i = prof_idx + 2  # pula cabeçalho
             while i < len(lines) and (rais_idx == -1 or i < rais_idx):
-                if i + 1 < len(lines) and re.search(r"\d{2}/\d{2}/\d{4}", lines[i + 1]):
+                if i + 1 < len(lines) and index.date(i + 1):
                     profissoes.append({"cargo": lines[i], "data": lines[i + 1]})
                     i += 2
                 else:
@@ -162,16 +239,13 @@ def parse_mind7_pdf_to_data(file_bytes: bytes) -> dict:
     if tel_header != -1:
         i = tel_header + 1
         while i < len(lines) and (histop_idx == -1 or i < histop_idx):
-            line = lines[i]
-            if re.search(r"\(\d{2}\)\s*[\d-]+", line):
-                m = re.search(r"\(\d{2}\)\s*[\d-]+", line)
-                numero = m.group(0)
-                m2 = re.search(r"\d{2}/\d{2}/\d{4}", line)
-                data_incl = m2.group(0) if m2 else ""
+            numero = index.phone(i)
+            if numero:
+                data_incl = index.date(i) or ""
                 l2 = lines[i + 1] if i + 1 < len(lines) else ""
-                m3 = re.search(r"\d{2}/\d{2}/\d{4}|N/I", l2)
+                m3 = DATE_OR_NI_RE.search(l2)
                 atual = m3.group(0) if m3 else ""
-                m4 = re.search(r"PRIORIDADE:\s*([0-9.]+)", l2)
+                m4 = PRIORITY_RE.search(l2)
                 prio = m4.group(1) if m4 else ""
                 tels.append(
                     {
@@ -197,7 +271,7 @@ def parse_mind7_pdf_to_data(file_bytes: bytes) -> dict:
     if histop_idx != -1:
         i = histop_idx + 1
         while i < len(lines) and (email_idx == -1 or i < email_idx):
-            if re.search(r"\(\d{2}\)\s*[\d-]+", lines[i]):
+            if index.phone(i):
                 tel = lines[i]
                 dataop = lines[i + 1] if i + 1 < len(lines) else ""
                 oper = lines[i + 2] if i + 2 < len(lines) else ""
@@ -227,11 +301,10 @@ def parse_mind7_pdf_to_data(file_bytes: bytes) -> dict:
                 date = ""
                 # Procura data nos próximos 5 itens
                 for j in range(i + 1, min(i + 6, len(lines))):
-                    m = re.search(r"\d{2}/\d{2}/\d{4}", lines[j])
-                    if m:
-                        date = m.group(0)
+                    if index.date(j):
+                        date = index.date(j)
                         break
-                emails.append({"email": email, "data": date})
+                emails.append({"email": email, "data": date, "tipo": email_domains.classify_email(email)})
             i += 1
 
     # ---- 9. ENDEREÇOS ----
@@ -246,16 +319,13 @@ def parse_mind7_pdf_to_data(file_bytes: bytes) -> dict:
             else lines[ender_idx + 2 :]
         )
 
+        # "Bairro:" mais recente antes de cada "Prioridade:" (acompanhado na mesma passada)
+        bairro_idx = None
         for i, line in enumerate(addr_lines):
-            if line.startswith("Prioridade:"):
+            if line.startswith("Bairro:"):
+                bairro_idx = i
+            elif line.startswith("Prioridade:"):
                 prio = line.split(":", 1)[1].strip()
-
-                # Volta até achar o "Bairro:"
-                bairro_idx = None
-                for j in range(i - 1, -1, -1):
-                    if addr_lines[j].startswith("Bairro:"):
-                        bairro_idx = j
-                        break
                 if bairro_idx is None:
                     continue
 
@@ -270,17 +340,12 @@ def parse_mind7_pdf_to_data(file_bytes: bytes) -> dict:
                 m2 = re.search(r"(\d{3})\s+\d{2}:\d{2}:\d{2}", bairro_line)
                 if m1 and m2:
                     cep = f"{m1.group(1)}-{m2.group(1)}"
-                else:
-                    mcep = re.search(r"(\d{5}-\d{3})", cidade_line + " " + bairro_line)
-                    if mcep:
-                        cep = mcep.group(1)
-                    else:
-                        mcep2 = re.search(r"(\d{5}-)\s*(\d{3})", cidade_line + " " + bairro_line)
-                        if mcep2:
-                            cep = mcep2.group(1) + mcep2.group(2)
+                cidade_bairro = cidade_line + " " + bairro_line
+                if not cep:
+                    # CEP do tokenizador compartilhado: "01234-567" ou "01234- 567"
+                    cep = "".join((first(cidade_bairro, "CEP") or "").split())
 
-                mdt = re.search(r"\d{2}/\d{2}/\d{4}", cidade_line + " " + bairro_line)
-                data_atual = mdt.group(0) if mdt else "Não informado"
+                data_atual = first(cidade_bairro, "DATE") or "Não informado"
 
                 mcity = re.search(r"[A-ZÇÃÉÍÓÚ]+/[A-Z]{2}", cidade_line)
                 cidade_uf = mcity.group(0) if mcity else cidade_line
@@ -301,27 +366,34 @@ def parse_mind7_pdf_to_data(file_bytes: bytes) -> dict:
     par_idx = find_line("PARENTES")
     mosaic_anchor = find_line("CLASSE SOCIAL", start=par_idx) if par_idx != -1 else -1
 
-    def linha_invalida(txt: str) -> bool:
-        return (
-            "http" in txt.lower()
-            or "mind7" in txt.lower()
-            or "consultas" in txt.lower()
-            or "vinculo" in txt.lower()
-            or ("/" in txt and " " in txt and txt.count("/") > 3)
-        )
+    invalidas = {}
+
+    def linha_invalida(i: int) -> bool:
+        # Cada linha é avaliada uma vez (o laço testa a mesma linha em até 3 posições)
+        if i not in invalidas:
+            txt = lines[i]
+            low = txt.lower()
+            invalidas[i] = (
+                "http" in low
+                or "mind7" in low
+                or "consultas" in low
+                or "vinculo" in low
+                or ("/" in txt and " " in txt and txt.count("/") > 3)
+            )
+        return invalidas[i]
 
     if par_idx != -1:
         i = par_idx + 2
         while i < len(lines) and (mosaic_anchor == -1 or i < mosaic_anchor):
-            if linha_invalida(lines[i]):
+            if linha_invalida(i):
                 i += 1
                 continue
 
             vinc = lines[i].strip()
             if (
                 i + 2 < len(lines)
-                and not linha_invalida(lines[i + 1])
-                and not linha_invalida(lines[i + 2])
+                and not linha_invalida(i + 1)
+                and not linha_invalida(i + 2)
             ):
                 parentes.append(
                     {
@@ -411,7 +483,7 @@ def parse_mind7_pdf_to_data(file_bytes: bytes) -> dict:
                 credit_flags["cliente_premium"] = l.split()[-1]
             elif l.startswith("Perfil Luxo"):
                 credit_flags["perfil_luxo"] = l.split()[-1]
-            if re.match(r"[A-Za-z]+Internet", l):
+            if INTERNET_RE.match(l):
                 break
 
     # ---- 15. SCORES ----
@@ -481,7 +553,14 @@ async def mind7_to_delta_html(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="PDF vazio.")
 
     try:
-        data = parse_mind7_pdf_to_data(file_bytes)
+        # pdfplumber + parse rodam no pool de processos: o event loop segue livre
+        data = await pdf_pool.process(file_bytes, parse_mind7_text)
+    except PdfPoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except BrokenProcessPool:
+        raise HTTPException(status_code=503, detail="Worker de PDF caiu. Tente novamente em instantes.")
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Tempo esgotado ao analisar o PDF MIND-7.")
     except Exception as e:
         print(f"Erro no Parser: {e}")
         raise HTTPException(status_code=500, detail=f"Erro ao analisar PDF MIND-7: {str(e)}")
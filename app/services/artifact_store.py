@@ -0,0 +1,253 @@
+"""
+Armazém de artefatos dos scans (arquivos gerados pelas ferramentas), endereçado por conteúdo.
+
+- Cada execução grava numa pasta temporária própria (sem colisão entre scans do mesmo nome);
+  os arquivos vêm para cá e a pasta é apagada
+- Blob = sha256 do conteúdo, gravado comprimido (gzip) em objects/<2>/<sha256>.gz;
+  conteúdo repetido (mesmo relatório de novo) ocupa espaço uma vez só
+- Índice SQLite: artefato (ferramenta, alvo, instante, nome) -> blob
+- Despejo por idade (OSINT_ARTIFACT_MAX_AGE) e por tamanho total (OSINT_ARTIFACT_MAX_MB, os
+  mais antigos saem primeiro); blobs sem referência são apagados
+- Gravação e despejo seguram a trava de escrita do SQLite (BEGIN IMMEDIATE) enquanto mexem no
+  disco: um blob reaproveitado não some entre "o arquivo existe" e a linha nova no índice
+- As rotas servem o artefato de novo a partir daqui, sem rodar a ferramenta
+"""
+import asyncio
+import gzip
+import hashlib
+import mimetypes
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from app.services.scan_cache import normalize_target
+
+OSINT_ARTIFACT_DIR = os.getenv("OSINT_ARTIFACT_DIR", "data/artifacts")
+OSINT_ARTIFACT_MAX_MB = float(os.getenv("OSINT_ARTIFACT_MAX_MB", "500"))
+OSINT_ARTIFACT_MAX_AGE = int(os.getenv("OSINT_ARTIFACT_MAX_AGE", str(30 * 24 * 3600)))
+OSINT_ARTIFACT_LEVEL = int(os.getenv("OSINT_ARTIFACT_LEVEL", "6"))
+
+
+def artifact_id(tool: str, target: str, created_at: float, name: str) -> str:
+    raw = f"{tool}\0{normalize_target(target)}\0{created_at!r}\0{name}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+
+
+class ArtifactStore:
+    def __init__(self, root: str = OSINT_ARTIFACT_DIR, max_mb: float = OSINT_ARTIFACT_MAX_MB,
+                 max_age: int = OSINT_ARTIFACT_MAX_AGE, level: int = OSINT_ARTIFACT_LEVEL):
+        self.root = root
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_age = max_age
+        self.level = level
+        self._ready = False
+
+    # ---------- SQLite ----------
+    @contextmanager
+    def _db(self):
+        conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.root, "index.db"), timeout=5)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS artifacts (
+                    id TEXT PRIMARY KEY,
+                    tool TEXT,
+                    target TEXT,
+                    name TEXT,
+                    digest TEXT,
+                    size INTEGER,
+                    created_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_artifacts_target ON artifacts(tool, target, created_at);
+                CREATE INDEX IF NOT EXISTS idx_artifacts_created ON artifacts(created_at);
+                CREATE TABLE IF NOT EXISTS blobs (
+                    digest TEXT PRIMARY KEY,
+                    size INTEGER,
+                    stored_size INTEGER,
+                    created_at REAL
+                );
+            """)
+            self._ready = True
+        return conn
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.gz")
+
+    def _write_blob(self, digest: str, data: bytes) -> int:
+        path = self._blob_path(digest)
+        if os.path.exists(path):
+            return os.path.getsize(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(gzip.compress(data, compresslevel=self.level, mtime=0))
+        os.replace(tmp, path)
+        return os.path.getsize(path)
+
+    @staticmethod
+    def _row(row) -> dict:
+        art_id, tool, target, name, digest, size, created_at = row
+        return {
+            "id": art_id,
+            "tool": tool,
+            "target": target,
+            "name": name,
+            "digest": digest,
+            "size": size,
+            "created_at": created_at,
+            "url": f"/analyze/artifacts/{art_id}",
+        }
+
+    def _put_files(self, tool: str, target: str, files: list) -> list:
+        """files = [(nome, bytes)]; todos com o mesmo instante (uma execução)."""
+        now = time.time()
+        stored = []
+        for name, data in files:
+            digest = hashlib.sha256(data).hexdigest()
+            art_id = artifact_id(tool, target, now, name)
+            with self._db() as conn:
+                # Trava antes de olhar o disco: o _evict apaga os órfãos dentro da mesma trava
+                conn.execute("BEGIN IMMEDIATE")
+                stored_size = self._write_blob(digest, data)
+                conn.execute(
+                    "INSERT OR IGNORE INTO blobs(digest, size, stored_size, created_at) VALUES (?, ?, ?, ?)",
+                    (digest, len(data), stored_size, now),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO artifacts(id, tool, target, name, digest, size, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (art_id, tool, normalize_target(target), name, digest, len(data), now),
+                )
+            stored.append(self._row((art_id, tool, normalize_target(target), name, digest, len(data), now)))
+        self._evict()
+        return stored
+
+    def _put_dir(self, tool: str, target: str, folder: str) -> list:
+        files = []
+        for name in sorted(os.listdir(folder)):
+            path = os.path.join(folder, name)
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    files.append((name, f.read()))
+        return self._put_files(tool, target, files) if files else []
+
+    def _evict(self):
+        now = time.time()
+        with self._db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if self.max_age > 0:
+                conn.execute("DELETE FROM artifacts WHERE created_at < ?", (now - self.max_age,))
+            if self.max_bytes > 0:
+                # Tamanho em disco = blobs referenciados; os artefatos mais antigos saem primeiro
+                total = conn.execute(
+                    "SELECT COALESCE(SUM(stored_size), 0) FROM blobs WHERE digest IN (SELECT digest FROM artifacts)"
+                ).fetchone()[0]
+                while total > self.max_bytes:
+                    oldest = conn.execute("SELECT id, digest FROM artifacts ORDER BY created_at ASC LIMIT 1").fetchone()
+                    if not oldest:
+                        break
+                    conn.execute("DELETE FROM artifacts WHERE id = ?", (oldest[0],))
+                    if not conn.execute("SELECT 1 FROM artifacts WHERE digest = ? LIMIT 1", (oldest[1],)).fetchone():
+                        total -= conn.execute("SELECT stored_size FROM blobs WHERE digest = ?", (oldest[1],)).fetchone()[0]
+            # Blobs sem artefato (idade, tamanho): saem do índice e do disco
+            orphans = [r[0] for r in conn.execute(
+                "SELECT digest FROM blobs WHERE digest NOT IN (SELECT digest FROM artifacts)"
+            ).fetchall()]
+            conn.executemany("DELETE FROM blobs WHERE digest = ?", [(d,) for d in orphans])
+            # Ainda com a trava: nenhum _put_files reaproveita o arquivo entre a checagem e a remoção
+            for digest in orphans:
+                try:
+                    os.remove(self._blob_path(digest))
+                except OSError:
+                    pass
+
+    def _get(self, art_id: str, compressed: bool = False):
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT id, tool, target, name, digest, size, created_at FROM artifacts WHERE id = ?", (art_id,)
+            ).fetchone()
+        if not row:
+            return None
+        meta = self._row(row)
+        try:
+            with open(self._blob_path(meta["digest"]), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        meta["content_type"] = mimetypes.guess_type(meta["name"])[0] or "application/octet-stream"
+        return meta, data if compressed else gzip.decompress(data)
+
+    def _list(self, tool: str = None, target: str = None, limit: int = 50) -> list:
+        query = "SELECT id, tool, target, name, digest, size, created_at FROM artifacts WHERE 1 = 1"
+        params = []
+        if tool:
+            query += " AND tool = ?"
+            params.append(tool)
+        if target:
+            query += " AND target = ?"
+            params.append(normalize_target(target))
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._db() as conn:
+            return [self._row(r) for r in conn.execute(query, params).fetchall()]
+
+    def _latest(self, tool: str, target: str) -> list:
+        """Artefatos da execução mais recente de (ferramenta, alvo)."""
+        with self._db() as conn:
+            rows = conn.execute(
+                "SELECT id, tool, target, name, digest, size, created_at FROM artifacts "
+                "WHERE tool = ? AND target = ? AND created_at = "
+                "(SELECT MAX(created_at) FROM artifacts WHERE tool = ? AND target = ?) ORDER BY name",
+                (tool, normalize_target(target), tool, normalize_target(target)),
+            ).fetchall()
+        return [self._row(r) for r in rows]
+
+    def _stats(self) -> dict:
+        with self._db() as conn:
+            artifacts, raw = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts").fetchone()
+            blobs, size, stored = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM blobs"
+            ).fetchone()
+            per_tool = dict(conn.execute("SELECT tool, COUNT(*) FROM artifacts GROUP BY tool").fetchall())
+        return {
+            "root": self.root,
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "max_age": self.max_age,
+            "artifacts": artifacts,
+            "per_tool": per_tool,
+            "blobs": blobs,
+            "logical_mb": round(raw / (1024 * 1024), 3),
+            "stored_mb": round(stored / (1024 * 1024), 3),
+            "compression_ratio": round(size / stored, 2) if stored else 0.0,
+        }
+
+    # ---------- API assíncrona ----------
+    async def put_dir(self, tool: str, target: str, folder: str) -> list:
+        return await asyncio.to_thread(self._put_dir, tool, target, folder)
+
+    async def get(self, art_id: str, compressed: bool = False):
+        return await asyncio.to_thread(self._get, art_id, compressed)
+
+    async def list_artifacts(self, tool: str = None, target: str = None, limit: int = 50) -> list:
+        return await asyncio.to_thread(self._list, tool, target, limit)
+
+    async def latest(self, tool: str, target: str) -> list:
+        return await asyncio.to_thread(self._latest, tool, target)
+
+    async def stats(self) -> dict:
+        return await asyncio.to_thread(self._stats)
+
+
+# Instância única compartilhada pelas rotas
+artifact_store = ArtifactStore()
@@ -0,0 +1,184 @@
+"""
+Motor assíncrono de Google Dorks.
+
+- As ~20 dorks rodam em paralelo (googlesearch é síncrono: cada busca vai para uma thread)
+- Token bucket limita a taxa de buscas reais ao Google (evita bloqueio 429)
+- Resultado de cada dork fica no cache de buscas (search_cache, app/services/scan_cache.py) com TTL próprio
+- URLs deduplicadas pela forma normalizada
+- Resultados saem à medida que cada dork termina (async generator)
+- Gravação/replay das buscas (OSINT_RECORD_DIR / OSINT_REPLAY_DIR, ver tool_replay.py)
+"""
+import asyncio
+import os
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.services.scan_cache import search_cache
+from app.services.tool_replay import OSINT_RECORD_DIR, OSINT_REPLAY_DIR, OSINT_REPLAY_SPEED, load_dork_tape, record_dork
+
+try:
+    from googlesearch import search as google_search
+except ImportError:
+    google_search = None
+
+DORK_CONCURRENCY = int(os.getenv("DORK_CONCURRENCY", "4"))
+DORK_RATE = float(os.getenv("DORK_RATE", "1.0"))  # buscas por segundo
+DORK_BURST = int(os.getenv("DORK_BURST", "3"))
+DORK_CACHE_TTL = int(os.getenv("DORK_CACHE_TTL", str(24 * 3600)))
+
+# Parâmetros de rastreio: nomes exatos, mais o prefixo utm_ (referencia=, refid= etc. identificam a página)
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "ref", "ref_src", "igshid"})
+TRACKING_PREFIXES = ("utm_",)
+
+
+def is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def build_dorks(query: str) -> list:
+    # Lista OSINT profissional (15+)
+    return [
+        f'"{query}"',
+        f'"{query}" CPF',
+        f'"{query}" RG',
+        f'"{query}" processo',
+        f'site:jusbrasil.com.br "{query}"',
+        f'site:escavador.com "{query}"',
+        f'site:linkedin.com/in "{query}"',
+        f'site:facebook.com "{query}"',
+        f'site:instagram.com "{query}"',
+        f'site:twitter.com "{query}"',
+        f'site:x.com "{query}"',
+        f'site:github.com "{query}"',
+        f'site:medium.com "{query}"',
+        f'site:academia.edu "{query}"',
+        f'site:docplayer.com.br "{query}"',
+        f'"{query}" filetype:pdf',
+        f'"{query}" filetype:doc',
+        f'"{query}" filetype:xls',
+        f'"{query}" currículo',
+        f'"{query}" endereço'
+    ]
+
+
+def normalize_url(url: str) -> str:
+    """Forma canônica para deduplicação: sem www, sem fragmento, sem parâmetros de rastreio, sem barra final."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip().lower()
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not is_tracking_param(k)
+    ))
+    path = parts.path.rstrip("/") or ""
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme, host, path, query, ""))
+
+
+def domain_of(url: str) -> str:
+    return url.split("//")[-1].split("/")[0].replace("www.", "")
+
+
+class TokenBucket:
+    """Limitador de taxa assíncrono: `rate` fichas por segundo, até `capacity` acumuladas."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = max(rate, 0.001)
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+_bucket = TokenBucket(DORK_RATE, DORK_BURST)
+_slots = asyncio.Semaphore(DORK_CONCURRENCY)
+
+
+def _google_sync(dork: str, num_results: int, lang: str) -> list:
+    return list(google_search(dork, num_results=num_results, lang=lang))
+
+
+async def _replay_dork(dork: str) -> list:
+    """Replay: URLs gravadas, devolvidas após a latência gravada (sem cache, sem rede)."""
+    tape = load_dork_tape(dork)
+    if not tape:
+        print(f"[DORK REPLAY] Sem fita para {dork}")
+        return []
+    if OSINT_REPLAY_SPEED > 0:
+        await asyncio.sleep(tape.get("latency", 0) / OSINT_REPLAY_SPEED)
+    return tape.get("urls", [])
+
+
+async def search_dork(dork: str, num_results: int = 8, lang: str = "pt") -> list:
+    """URLs de uma dork (cache primeiro; busca real respeita o token bucket)."""
+    if OSINT_REPLAY_DIR:
+        return await _replay_dork(dork)
+
+    async def producer():
+        async with _slots:
+            await _bucket.acquire()
+            started = time.monotonic()
+            urls = await asyncio.to_thread(_google_sync, dork, num_results, lang)
+            if OSINT_RECORD_DIR:
+                await asyncio.to_thread(record_dork, dork, urls, time.monotonic() - started)
+            return urls
+
+    urls, _ = await search_cache.get_or_run(
+        "dork", dork, producer,
+        options={"num": num_results, "lang": lang}, ttl=DORK_CACHE_TTL,
+    )
+    return urls
+
+
+async def iter_dorks(query: str, num_results: int = 8, lang: str = "pt"):
+    """Gera hits {tool, site, url, query} deduplicados, na ordem em que as dorks terminam."""
+    if not google_search and not OSINT_REPLAY_DIR:
+        return
+
+    async def one(dork):
+        try:
+            return dork, await search_dork(dork, num_results, lang)
+        except Exception as e:
+            print(f"[DORK ERROR] {dork}: {e}")
+            return dork, []
+
+    seen = set()
+    tasks = [asyncio.create_task(one(d)) for d in build_dorks(query)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            dork, urls = await next_done
+            for url in urls:
+                key = normalize_url(url)
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield {"tool": "Dorks", "site": domain_of(url), "url": url, "query": dork}
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+def fallback_links(query: str) -> list:
+    q = query.replace(' ', '+')
+    return [
+        {"tool": "Dorks", "site": "JusBrasil", "url": f"https://jusbrasil.com.br/busca?q={q}"},
+        {"tool": "Dorks", "site": "Escavador", "url": f"https://www.escavador.com/busca?qo=p&q={q}"},
+        {"tool": "Dorks", "site": "Google Geral", "url": f"https://www.google.com/search?q={q}"},
+        {"tool": "Dorks", "site": "Google PDFs", "url": f"https://www.google.com/search?q={q}+filetype:pdf"},
+        {"tool": "Dorks", "site": "LinkedIn", "url": f"https://www.google.com/search?q=site:linkedin.com+{q}"}
+    ]
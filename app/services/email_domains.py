@@ -0,0 +1,167 @@
+"""
+Classificação offline do domínio de e-mail: descartável, webmail gratuito ou corporativo.
+
+- Listas em texto (app/services/email_domain_lists/disposable*.txt e free*.txt): basta soltar
+  listas maiores na pasta (OSINT_EMAIL_DOMAIN_LISTS) para ampliar a cobertura
+- Índice compacto gerado sob demanda (OSINT_EMAIL_DOMAIN_INDEX): tabela hash de endereçamento
+  aberto (hash de 64 bits + 1 byte de categoria por slot); refeito quando alguma lista muda
+- O índice é lido via mmap: uma cópia só na page cache, compartilhada pelos workers do uvicorn
+- Consulta = 1 hash (crc32 + adler32, em C) + 1-2 leituras no array mapeado; domínios quentes
+  (gmail, hotmail...) ainda passam por um LRU em memória
+"""
+import glob
+import mmap
+import os
+import struct
+import threading
+import zlib
+from array import array
+from functools import lru_cache
+
+OSINT_EMAIL_DOMAIN_LISTS = os.getenv(
+    "OSINT_EMAIL_DOMAIN_LISTS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "email_domain_lists")
+)
+OSINT_EMAIL_DOMAIN_INDEX = os.getenv("OSINT_EMAIL_DOMAIN_INDEX", "data/email_domains.idx")
+
+INDEX_MAGIC = b"OSDOM001"
+HEADER = struct.Struct("=8sQQ")  # magic, slots (potência de 2), quantidade de domínios
+
+# Código no índice -> categoria (0 fica livre para "não listado")
+CATEGORIES = {1: "disposable", 2: "free"}
+CATEGORY_CODES = {name: code for code, name in CATEGORIES.items()}
+
+# Rótulos usados no campo "classification" dos e-mails dos relatórios
+DOMAIN_LABELS = {"disposable": "Descartável", "free": "Pessoal", "corporate": "Corporativo", "invalid": "Inválido"}
+
+
+def domain_hash(domain: str) -> int:
+    """64 bits (crc32 nos bits altos, que escolhem o slot); 0 fica reservado para slot vazio."""
+    raw = domain.encode("utf-8")
+    return (zlib.crc32(raw) << 32 | zlib.adler32(raw)) or 1
+
+
+def normalize_domain(domain: str) -> str:
+    return (domain or "").strip().strip(".").lower()
+
+
+def email_domain(email: str) -> str:
+    _, at, domain = (email or "").strip().rpartition("@")
+    return normalize_domain(domain) if at else ""
+
+
+def read_lists(folder: str) -> dict:
+    """domínio -> categoria. Webmail gratuito prevalece se um domínio cair nas duas listas."""
+    domains = {}
+    for category in ("disposable", "free"):
+        for path in sorted(glob.glob(os.path.join(folder, f"{category}*.txt"))):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    domain = normalize_domain(line.split("#", 1)[0])
+                    if domain:
+                        domains[domain] = category
+    return domains
+
+
+def build_index(folder: str, path: str) -> int:
+    """Gera o arquivo de índice (escrita atômica: workers concorrentes nunca leem meio arquivo)."""
+    domains = read_lists(folder)
+    slots = 8
+    while slots < len(domains) * 2:  # ocupação <= 50%: sondagem linear curta
+        slots *= 2
+    hashes = array("Q", bytes(8 * slots))
+    codes = array("B", bytes(slots))
+    for domain, category in domains.items():
+        h = domain_hash(domain)
+        i = (h >> 32) & (slots - 1)
+        while hashes[i] not in (0, h):
+            i = (i + 1) & (slots - 1)
+        hashes[i] = h
+        codes[i] = CATEGORY_CODES[category]
+    folder_out = os.path.dirname(path)
+    if folder_out:
+        os.makedirs(folder_out, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(INDEX_MAGIC, slots, len(domains)))
+        hashes.tofile(f)
+        codes.tofile(f)
+    os.replace(tmp, path)
+    return len(domains)
+
+
+class EmailDomainIndex:
+    def __init__(self, lists_dir: str = OSINT_EMAIL_DOMAIN_LISTS, path: str = OSINT_EMAIL_DOMAIN_INDEX):
+        self.lists_dir = lists_dir
+        self.path = path
+        self._hashes = None
+        self._codes = None
+        self._mask = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        self.classify_domain = lru_cache(maxsize=4096)(self._classify_domain)
+
+    def _stale(self) -> bool:
+        try:
+            built = os.path.getmtime(self.path)
+        except OSError:
+            return True
+        lists = glob.glob(os.path.join(self.lists_dir, "*.txt"))
+        return any(os.path.getmtime(p) > built for p in lists)
+
+    def _load(self):
+        with self._lock:
+            if self._hashes is not None:
+                return
+            if self._stale():
+                count = build_index(self.lists_dir, self.path)
+                print(f"[EMAIL DOMAINS] Índice gerado: {count} domínios -> {self.path}")
+            with open(self.path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, slots, count = HEADER.unpack_from(mapped, 0)
+            if magic != INDEX_MAGIC:
+                raise ValueError(f"Índice de domínios inválido: {self.path}")
+            start = HEADER.size
+            view = memoryview(mapped)
+            self._codes = view[start + 8 * slots: start + 9 * slots]
+            self._mask = slots - 1
+            self._count = count
+            self._hashes = view[start: start + 8 * slots].cast("Q")
+
+    def lookup(self, domain: str):
+        """Categoria do domínio exato ('disposable' | 'free') ou None."""
+        if self._hashes is None:
+            self._load()
+        h = domain_hash(domain)
+        hashes, mask = self._hashes, self._mask
+        i = (h >> 32) & mask
+        while True:
+            found = hashes[i]
+            if found == h:
+                return CATEGORIES.get(self._codes[i])
+            if not found:
+                return None
+            i = (i + 1) & mask
+
+    def _classify_domain(self, domain: str) -> str:
+        """'disposable' | 'free' | 'corporate' | 'invalid'. Subdomínios herdam a categoria do pai."""
+        domain = normalize_domain(domain)
+        if "." not in domain:
+            return "invalid"
+        labels = domain.split(".")
+        for i in range(len(labels) - 1):
+            category = self.lookup(".".join(labels[i:]))
+            if category:
+                return category
+        return "corporate"
+
+    def classify_email(self, email: str) -> str:
+        return self.classify_domain(email_domain(email))
+
+    def stats(self) -> dict:
+        if self._hashes is None:
+            self._load()
+        return {"path": self.path, "lists_dir": self.lists_dir, "domains": self._count}
+
+
+# Instância única compartilhada pelas rotas
+email_domains = EmailDomainIndex()
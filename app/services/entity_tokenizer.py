@@ -0,0 +1,90 @@
+"""
+Tokenizador de entidades (CPF, telefone, placa, e-mail, CEP, data) para os extratores de PDF.
+
+- Um único regex pré-compilado: alternação com grupos nomeados, o texto é varrido uma vez
+  e cada trecho reconhecido sai como (tipo, valor, início, fim)
+- A ordem da alternação resolve as ambiguidades: e-mail antes dos números (CPF dentro do
+  e-mail não vira CPF), CPF antes de telefone, CEP antes de telefone
+- 11 dígitos soltos: CPF, a menos que os dígitos verificadores não batam e o número tenha
+  cara de celular (DDD + 9 + 8 dígitos) -- aí é telefone
+- Busca de um tipo só (first): padrão daquele tipo, pré-compilado à parte
+- Números delimitados por (?<!\\d) / (?!\\d): sem casar pedaço de um número maior
+  (título de eleitor, protocolo)
+"""
+import re
+from typing import Iterator, NamedTuple, Optional
+
+ENTITY_PATTERNS = (
+    ("EMAIL", r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b"),
+    ("CPF", r"(?<!\d)\d{3}\.?\d{3}\.?\d{3}-?\d{2}(?!\d)"),
+    ("CEP", r"(?<!\d)\d{5}-\s*\d{3}(?!\d)"),
+    ("DATE", r"(?<!\d)\d{2}/\d{2}/\d{4}(?!\d)"),
+    ("PHONE", r"\(\d{2}\)\s*\d{4,5}[-\s]?\d{4}(?!\d)"
+              r"|(?<!\d)[1-9]{2}\s?(?:9\d{4}[-\s]?\d{4}|[2-5]\d{3}[-\s]?\d{4})(?!\d)"),
+    ("PLACA", r"\b[A-Z]{3}-?\d[A-Z0-9]\d{2}\b"),
+)
+
+ENTITY_KINDS = tuple(kind for kind, _ in ENTITY_PATTERNS)
+
+ENTITY_RE = re.compile("|".join(f"(?P<{kind}>{pattern})" for kind, pattern in ENTITY_PATTERNS))
+
+# Mesmo padrão, um tipo só: busca pontual sem pagar a alternação inteira
+ENTITY_KIND_RE = {kind: re.compile(pattern) for kind, pattern in ENTITY_PATTERNS}
+
+
+# Celular sem formatação: DDD (sem zero) + 9 + 8 dígitos
+BARE_MOBILE_RE = re.compile(r"[1-9]{2}9\d{8}")
+
+
+def cpf_valid(value: str) -> bool:
+    """Dígitos verificadores do CPF (11 dígitos, sem todos iguais)."""
+    nums = [int(c) for c in value if c.isdigit()]
+    if len(nums) != 11 or len(set(nums)) == 1:
+        return False
+    for size in (9, 10):
+        check = sum(n * w for n, w in zip(nums[:size], range(size + 1, 1, -1))) * 10 % 11 % 10
+        if check != nums[size]:
+            return False
+    return True
+
+
+def _classify(kind: str, value: str) -> str:
+    """11 dígitos soltos com cara de celular casam CPF e telefone: o dígito verificador decide."""
+    if kind in ("CPF", "PHONE") and BARE_MOBILE_RE.fullmatch(value):
+        return "CPF" if cpf_valid(value) else "PHONE"
+    return kind
+
+
+class EntityToken(NamedTuple):
+    kind: str
+    value: str
+    start: int
+    end: int
+
+
+def tokenize(text: str, kinds=None) -> Iterator[EntityToken]:
+    """Entidades do texto, em ordem, numa única varredura (kinds filtra os tipos)."""
+    for m in ENTITY_RE.finditer(text):
+        kind = _classify(m.lastgroup, m.group())
+        if kinds is None or kind in kinds:
+            yield EntityToken(kind, m.group(), m.start(), m.end())
+
+
+def first_by_kind(text: str) -> dict:
+    """Primeiro valor de cada tipo encontrado no texto -> {tipo: valor}."""
+    found = {}
+    for m in ENTITY_RE.finditer(text):
+        found.setdefault(_classify(m.lastgroup, m.group()), m.group())
+    return found
+
+
+def first(text: str, kind: str) -> Optional[str]:
+    """Primeiro valor do tipo pedido (ou None)."""
+    for m in ENTITY_KIND_RE[kind].finditer(text):
+        if _classify(kind, m.group()) == kind:
+            return m.group()
+    return None
+
+
+def digits(value: str) -> str:
+    return re.sub(r"\D", "", value)
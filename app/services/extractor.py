@@ -1,6 +1,7 @@
 ﻿import re
 from typing import List
 from app.schemas import PhoneResult, AddressResult
+from app.services.entity_tokenizer import tokenize, digits
 
 class Mind7Extractor:
     def __init__(self, raw_text: str, target_name: str):
@@ -10,25 +11,30 @@ class Mind7Extractor:
 
     def extract_phones(self) -> List[PhoneResult]:
         results = []
-        raw_matches = re.findall(r'\b\d{10,11}\b', self.text)
-        fmt_matches = re.findall(r'\(\d{2}\)\s?\d{4,5}[-\s]?\d{4}', self.text)
-        all_candidates = list(set(raw_matches + fmt_matches))
-        print(f"--- DEBUG PHONES ENCONTRADOS: {len(all_candidates)}")
+        # Uma varredura do texto: telefones (primeira ocorrência de cada) e placas, com posição
+        first_seen = {}
+        placas = []
+        for token in tokenize(self.text, ("PHONE", "PLACA")):
+            if token.kind == "PLACA":
+                placas.append(token.value)
+            else:
+                first_seen.setdefault(token.value, token)
+        print(f"--- DEBUG PHONES ENCONTRADOS: {len(first_seen)}")
 
-        for ph in all_candidates:
-            clean = re.sub(r'\D', '', ph)
+        for ph, token in first_seen.items():
+            clean = digits(ph)
             if len(clean) == 11 and clean.startswith('0'): continue
             if len(clean) > 11: continue
 
             # ANÁLISE DE CONTEXTO (NOVO)
             # Verifica se o nome do alvo está PERTO deste telefone no texto
-            escaped_ph = re.escape(ph)
-            context_window = re.search(f".{{0,200}}{escaped_ph}.{{0,200}}", self.text, re.DOTALL | re.IGNORECASE)
+            # (janela de 200 caracteres em volta da primeira ocorrência, direto pelo offset)
+            context_window = self.text[max(0, token.start - 200):token.end + 200]
             is_linked = False
             owner = "TERCEIRO / DESCONHECIDO"
             
             if context_window:
-                snippet = context_window.group(0).upper()
+                snippet = context_window.upper()
                 if self.target_name in snippet:
                     is_linked = True
                     owner = f"VINCULADO A {self.target_name}"
@@ -60,7 +66,6 @@ class Mind7Extractor:
                 ))
             
         # PLACAS
-        placas = re.findall(r'\b([A-Z]{3}[0-9][0-9A-Z][0-9]{2})\b', self.text)
         for p in placas:
             results.append(PhoneResult(
                 raw_text="VEICULO", 
@@ -91,3 +96,16 @@ class Mind7Extractor:
                 match_count=1
             ))
         return results
+
+
+def extract_evidence(pages: list, target_name: str) -> dict:
+    """Telefones e endereços das páginas do PDF, só com os campos usados no grafo (roda no pool de PDFs)."""
+    text = "".join(page + "\n" for page in pages if page)
+    extractor = Mind7Extractor(raw_text=text, target_name=target_name)
+    return {
+        "phones": [
+            {"number": p.number, "owner": p.registered_owner, "score": p.confidence_score}
+            for p in extractor.extract_phones()
+        ],
+        "addresses": [a.full_address for a in extractor.extract_addresses()],
+    }
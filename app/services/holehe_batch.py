@@ -0,0 +1,126 @@
+"""
+Verificação de e-mails em lote com os módulos do Holehe, no próprio processo.
+
+O Holehe CLI abre um processo por e-mail: importa os ~120 módulos e cria um cliente HTTP
+a cada vez. Aqui vários e-mails viram uma carga só:
+- módulos importados uma única vez por processo
+- um único httpx.AsyncClient com pool de conexões compartilhado entre e-mails e módulos
+- limite global de checagens simultâneas e limite por serviço (evita rate limit dos sites)
+- resultado em matriz e-mail x serviço: used | not_used | rate_limited | error
+"""
+import asyncio
+import os
+import time
+
+import httpx
+
+OSINT_HOLEHE_CONCURRENCY = int(os.getenv("OSINT_HOLEHE_CONCURRENCY", "48"))
+OSINT_HOLEHE_PER_SERVICE = int(os.getenv("OSINT_HOLEHE_PER_SERVICE", "2"))
+OSINT_HOLEHE_TIMEOUT = float(os.getenv("OSINT_HOLEHE_TIMEOUT", "10"))
+
+
+def load_holehe_modules() -> list:
+    """Funções de checagem do Holehe (uma por serviço). ModuleNotFoundError sem o pacote."""
+    from holehe.core import get_functions, import_submodules
+
+    return get_functions(import_submodules("holehe.modules"))
+
+
+def check_status(entry: dict) -> str:
+    if entry.get("rateLimit"):
+        return "rate_limited"
+    return "used" if entry.get("exists") else "not_used"
+
+
+class HoleheBatch:
+    def __init__(self, concurrency: int = OSINT_HOLEHE_CONCURRENCY, per_service: int = OSINT_HOLEHE_PER_SERVICE,
+                 timeout: float = OSINT_HOLEHE_TIMEOUT, modules: list = None):
+        self.concurrency = max(1, concurrency)
+        self.per_service = max(1, per_service)
+        self.timeout = timeout
+        self._modules = modules
+        self._loading = asyncio.Lock()
+
+    async def modules(self) -> list:
+        if self._modules is None:
+            # Import pesado (~120 submódulos): uma vez, fora do event loop
+            async with self._loading:
+                if self._modules is None:
+                    self._modules = await asyncio.to_thread(load_holehe_modules)
+        return self._modules
+
+    async def _check(self, client, module, email: str) -> dict:
+        name = module.__name__
+        check = {"service": name, "domain": name, "email": email, "status": None, "latency": None}
+        out = []
+        started = time.monotonic()
+        try:
+            # Os módulos fazem 1-3 requisições; o teto cobre a checagem inteira
+            await asyncio.wait_for(module(email, client, out), self.timeout * 3)
+            entry = out[0] if out else {}
+            check["domain"] = entry.get("domain") or name
+            check["status"] = check_status(entry) if entry else "error"
+            extras = {k: entry.get(k) for k in ("emailrecovery", "phoneNumber", "others") if entry.get(k)}
+            if extras:
+                check["extras"] = extras
+        except asyncio.TimeoutError:
+            check["status"] = "error"
+            check["error"] = "timeout"
+        except Exception as e:
+            check["status"] = "error"
+            check["error"] = f"{type(e).__name__}: {e}"[:200]
+        check["latency"] = round(time.monotonic() - started, 3)
+        return check
+
+    async def check_many(self, emails: list, on_result=None) -> list:
+        """
+        Checa todos os e-mails em todos os serviços como uma carga única.
+        on_result(check) é chamado a cada checagem concluída.
+        """
+        modules = await self.modules()
+        global_slots = asyncio.Semaphore(self.concurrency)
+        service_slots = {m.__name__: asyncio.Semaphore(self.per_service) for m in modules}
+
+        async def run_one(client, module, email):
+            async with service_slots[module.__name__], global_slots:
+                check = await self._check(client, module, email)
+            if on_result:
+                on_result(check)
+            return check
+
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout) as client:
+            # Ordem serviço -> e-mails: checagens do mesmo serviço reaproveitam a conexão keep-alive
+            tasks = [
+                asyncio.create_task(run_one(client, module, email))
+                for module in modules
+                for email in emails
+            ]
+            try:
+                return await asyncio.gather(*tasks)
+            finally:
+                for t in tasks:
+                    t.cancel()
+
+
+def build_email_matrix(emails: list, checks: list, full_matrix: bool = False) -> tuple:
+    """
+    -> (por e-mail: achados no formato do run_holehe, matriz serviço -> {e-mail: status}).
+    Matriz enxuta por padrão: só serviços onde ao menos um e-mail está cadastrado.
+    """
+    per_email = {email: [] for email in emails}
+    matrix = {}
+    for c in checks:
+        matrix.setdefault(c["domain"], {})[c["email"]] = c["status"]
+        if c["status"] == "used":
+            hit = {"tool": "Holehe", "site": c["domain"], "status": "Cadastrado"}
+            if c.get("extras"):
+                hit["extras"] = c["extras"]
+            per_email[c["email"]].append(hit)
+    if not full_matrix:
+        matrix = {domain: row for domain, row in matrix.items() if "used" in row.values()}
+    return per_email, matrix
+
+
+# Instância única compartilhada pelas rotas
+holehe_batch = HoleheBatch()
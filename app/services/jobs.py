@@ -0,0 +1,377 @@
+"""
+Fila de jobs de scan OSINT em background (SQLite).
+
+- POST cria o job e devolve o id na hora; o scan roda fora da requisição HTTP
+- Pool de workers asyncio configurável (OSINT_JOB_WORKERS), prioridade (maior primeiro)
+- Cada ferramenta grava seu resultado (checkpoint) assim que termina
+- Falha/timeout de ferramenta: retry com backoff exponencial, só das ferramentas pendentes
+- Lease com heartbeat: se o processo morrer, outro worker (ou o próximo boot) retoma o job
+- Cancelamento (POST /jobs/{id}/cancel): job na fila não roda; job rodando é interrompido
+  (no próprio processo na hora, em outro processo no próximo heartbeat)
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+OSINT_JOBS_DB = os.getenv("OSINT_JOBS_DB", "data/osint_jobs.db")
+OSINT_JOB_WORKERS = int(os.getenv("OSINT_JOB_WORKERS", "2"))
+OSINT_JOB_MAX_ATTEMPTS = int(os.getenv("OSINT_JOB_MAX_ATTEMPTS", "3"))
+OSINT_JOB_BACKOFF = float(os.getenv("OSINT_JOB_BACKOFF", "10"))
+
+JOB_LEASE = 60
+IDLE_POLL = 1.0
+TERMINAL = ("done", "failed", "cancelled")
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+
+class JobQueue:
+    def __init__(self, path: str = OSINT_JOBS_DB, workers: int = OSINT_JOB_WORKERS,
+                 max_attempts: int = OSINT_JOB_MAX_ATTEMPTS, backoff: float = OSINT_JOB_BACKOFF):
+        self.path = path
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.runners = {}
+        self.executor = None
+        self._tasks = []
+        self._running = {}  # job_id -> task do job neste processo
+        self._cancelled = set()
+        self._wakeup = None
+        self._ready = False
+
+    # ---------- SQLite ----------
+    @contextmanager
+    def _db(self):
+        conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _connect(self):
+        if not self._ready:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT,
+                    priority INTEGER DEFAULT 0,
+                    target TEXT,
+                    plan TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    next_run_at REAL,
+                    lease_until REAL,
+                    owner TEXT,
+                    error TEXT,
+                    created_at REAL,
+                    started_at REAL,
+                    finished_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_pick ON jobs(status, priority DESC, created_at);
+                CREATE TABLE IF NOT EXISTS job_results (
+                    job_id TEXT,
+                    tool TEXT,
+                    status TEXT,
+                    results TEXT,
+                    timing TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    finished_at REAL,
+                    PRIMARY KEY (job_id, tool)
+                );
+            """)
+            self._ready = True
+        return conn
+
+    def _submit(self, plan: list, target: str, priority: int) -> str:
+        job_id = f"job_{uuid.uuid4().hex[:12]}"
+        now = time.time()
+        with self._db() as conn:
+            conn.execute(
+                "INSERT INTO jobs(id, status, priority, target, plan, next_run_at, created_at) VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, priority, target, json.dumps(plan), now, now),
+            )
+        return job_id
+
+    def _claim(self):
+        """Pega o próximo job (fila por prioridade, ou job 'running' com lease vencido = retomada)."""
+        now = time.time()
+        with self._db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE (status = 'queued' AND next_run_at <= ?) "
+                "OR (status = 'running' AND lease_until < ?) "
+                "ORDER BY priority DESC, created_at ASC LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if not row:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, lease_until = ?, attempts = attempts + 1, "
+                "started_at = coalesce(started_at, ?) WHERE id = ?",
+                (self.owner, now + JOB_LEASE, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        job = dict(row)
+        job["attempts"] += 1
+        return job
+
+    def _heartbeat(self, job_id: str) -> bool:
+        """Renova o lease; False = o job não está mais 'running' por nós (cancelado)."""
+        with self._db() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND owner = ? AND status = 'running'",
+                (time.time() + JOB_LEASE, job_id, self.owner),
+            )
+            return cur.rowcount > 0
+
+    def _checkpoints(self, conn, job_id: str) -> dict:
+        rows = conn.execute("SELECT * FROM job_results WHERE job_id = ?", (job_id,)).fetchall()
+        return {r["tool"]: dict(r) for r in rows}
+
+    def _load_checkpoints(self, job_id: str) -> dict:
+        with self._db() as conn:
+            return self._checkpoints(conn, job_id)
+
+    def _checkpoint(self, job_id: str, tool: str, results: list, timing: dict):
+        with self._db() as conn:
+            conn.execute(
+                "INSERT INTO job_results(job_id, tool, status, results, timing, attempts, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, 1, ?) "
+                "ON CONFLICT(job_id, tool) DO UPDATE SET status = excluded.status, results = excluded.results, "
+                "timing = excluded.timing, attempts = job_results.attempts + 1, finished_at = excluded.finished_at",
+                (job_id, tool, timing["status"], json.dumps(results, default=str), json.dumps(timing), time.time()),
+            )
+
+    def _finish(self, job_id: str, status: str, error: str = None, retry_in: float = None):
+        now = time.time()
+        with self._db() as conn:
+            if retry_in is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', next_run_at = ?, lease_until = NULL, error = ? "
+                    "WHERE id = ? AND status = 'running'",
+                    (now + retry_in, error, job_id),
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, lease_until = NULL, error = ? "
+                    "WHERE id = ? AND status = 'running'",
+                    (status, now, error, job_id),
+                )
+
+    def _requeue(self, job_id: str):
+        """Devolve à fila um job interrompido (desligamento), sem contar a tentativa."""
+        with self._db() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', next_run_at = ?, lease_until = NULL, attempts = attempts - 1 "
+                "WHERE id = ? AND owner = ? AND status = 'running'",
+                (time.time(), job_id, self.owner),
+            )
+
+    def _cancel(self, job_id: str):
+        """Marca o job como cancelado (se ainda não terminou) -> status final ou None."""
+        with self._db() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ?, lease_until = NULL, error = 'Cancelado' "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                (time.time(), job_id),
+            )
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row["status"] if row else None
+
+    def _get(self, job_id: str):
+        with self._db() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if not row:
+                return None
+            checkpoints = self._checkpoints(conn, job_id)
+
+        plan = json.loads(row["plan"])
+        tools = {}
+        results = []
+        for step in plan:
+            cp = checkpoints.get(step["tool"])
+            if cp:
+                tool_results = json.loads(cp["results"])
+                results.extend(tool_results)
+                tools[step["tool"]] = {**json.loads(cp["timing"]), "attempts": cp["attempts"], "finished_at": _iso(cp["finished_at"])}
+            else:
+                tools[step["tool"]] = {"status": "pending", "deadline": step["deadline"]}
+        done_tools = sum(1 for t in tools.values() if t["status"] == "ok")
+        return {
+            "id": row["id"],
+            "status": row["status"],
+            "priority": row["priority"],
+            "target": row["target"],
+            "attempts": row["attempts"],
+            "error": row["error"],
+            "created_at": _iso(row["created_at"]),
+            "started_at": _iso(row["started_at"]),
+            "finished_at": _iso(row["finished_at"]),
+            "next_run_at": _iso(row["next_run_at"]) if row["status"] == "queued" else None,
+            "progress": f"{done_tools}/{len(plan)}",
+            "tools": tools,
+            "total_results": len(results),
+            "results": results,
+        }
+
+    # ---------- API assíncrona ----------
+    async def submit(self, plan: list, target: str, priority: int = 0) -> str:
+        """plan = [{"tool", "target", "deadline"}]"""
+        job_id = await asyncio.to_thread(self._submit, plan, target, priority)
+        if self._wakeup:
+            self._wakeup.set()
+        return job_id
+
+    async def get(self, job_id: str):
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def cancel(self, job_id: str):
+        """Cancela o job -> status final (None se não existe); checkpoints já gravados ficam."""
+        status = await asyncio.to_thread(self._cancel, job_id)
+        if status == "cancelled":
+            self._interrupt(job_id)
+        return status
+
+    def _interrupt(self, job_id: str):
+        task = self._running.get(job_id)
+        if task and not task.done():
+            self._cancelled.add(job_id)
+            task.cancel()
+
+    async def watch(self, job_id: str, interval: float = 1.0):
+        """Gera eventos de progresso ('status', 'tool_done') até o job terminar."""
+        last_status = None
+        reported = {}
+        while True:
+            job = await self.get(job_id)
+            if not job:
+                yield {"event": "error", "detail": "Job não encontrado"}
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield {"event": "status", "status": last_status, "progress": job["progress"], "attempts": job["attempts"]}
+            for tool, info in job["tools"].items():
+                if info["status"] != "pending" and reported.get(tool) != info.get("finished_at"):
+                    reported[tool] = info.get("finished_at")
+                    yield {"event": "tool_done", "tool": tool, **info}
+            if last_status in TERMINAL:
+                yield {"event": "done", "status": last_status, "total_results": job["total_results"], "progress": job["progress"]}
+                return
+            await asyncio.sleep(interval)
+
+    async def _run_job(self, job: dict):
+        job_id = job["id"]
+        plan = json.loads(job["plan"])
+        checkpoints = await asyncio.to_thread(self._load_checkpoints, job_id)
+        pending = [s for s in plan if checkpoints.get(s["tool"], {}).get("status") != "ok"]
+        print(f"--> [JOBS] {job_id} tentativa {job['attempts']}: {len(pending)}/{len(plan)} ferramentas pendentes")
+
+        async def heartbeat():
+            while True:
+                await asyncio.sleep(JOB_LEASE / 3)
+                if not await asyncio.to_thread(self._heartbeat, job_id):
+                    # Cancelado por outro processo (ou lease perdido): para de rodar aqui
+                    self._interrupt(job_id)
+                    return
+
+        async def run_step(step):
+            runner = self.runners.get(step["tool"])
+            if not runner:
+                timing = {"status": "error", "elapsed": 0, "deadline": step["deadline"], "results": 0}
+                await asyncio.to_thread(self._checkpoint, job_id, step["tool"], [], timing)
+                return "error"
+            _, results, timing = await self.executor(step["tool"], runner, step["target"], step["deadline"])
+            await asyncio.to_thread(self._checkpoint, job_id, step["tool"], results, timing)
+            return timing["status"]
+
+        beat = asyncio.create_task(heartbeat())
+        try:
+            statuses = await asyncio.gather(*[run_step(s) for s in pending])
+        finally:
+            beat.cancel()
+
+        failed = [s["tool"] for s, st in zip(pending, statuses) if st != "ok"]
+        if not failed:
+            await asyncio.to_thread(self._finish, job_id, "done")
+        elif job["attempts"] < self.max_attempts:
+            delay = self.backoff * (2 ** (job["attempts"] - 1))
+            print(f"[JOBS] {job_id}: {failed} sem sucesso. Nova tentativa em {delay:.0f}s")
+            await asyncio.to_thread(self._finish, job_id, "queued", f"Falha em: {', '.join(failed)}", delay)
+        else:
+            # Sem mais tentativas: entrega o que tiver (parcial) ou marca falha
+            any_ok = len(failed) < len(plan)
+            await asyncio.to_thread(self._finish, job_id, "done" if any_ok else "failed", f"Falha em: {', '.join(failed)}")
+
+    async def _worker_loop(self, n: int):
+        while True:
+            try:
+                job = await asyncio.to_thread(self._claim)
+            except sqlite3.Error as e:
+                print(f"[JOBS] Erro ao buscar job: {e}")
+                job = None
+            if not job:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), IDLE_POLL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = self._running[job["id"]] = asyncio.create_task(self._run_job(job))
+            try:
+                await task
+            except asyncio.CancelledError:
+                if job["id"] in self._cancelled:
+                    # Cancelado pela API: o status já foi gravado, o worker segue
+                    print(f"[JOBS] {job['id']} cancelado")
+                    continue
+                # Desligamento: checkpoints ficam; o job volta à fila e é retomado no próximo boot
+                await asyncio.to_thread(self._requeue, job["id"])
+                raise
+            except Exception as e:
+                print(f"[JOBS] Erro no job {job['id']}: {e}")
+                if job["attempts"] >= self.max_attempts:
+                    await asyncio.to_thread(self._finish, job["id"], "failed", str(e))
+                else:
+                    delay = self.backoff * (2 ** (job["attempts"] - 1))
+                    await asyncio.to_thread(self._finish, job["id"], "queued", str(e), delay)
+            finally:
+                self._running.pop(job["id"], None)
+                self._cancelled.discard(job["id"])
+
+    def start(self, runners: dict, executor):
+        """
+        runners: {"sherlock": run_sherlock, ...}
+        executor: coroutine (tool, runner, target, deadline) -> (tool, results, timing)
+        """
+        self.runners = runners
+        self.executor = executor
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker_loop(i)) for i in range(self.workers)]
+        print(f"--> [JOBS] {self.workers} workers de scan ativos ({self.path})")
+
+    async def stop(self):
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+# Instância única compartilhada pelas rotas
+job_queue = JobQueue()
@@ -0,0 +1,157 @@
+"""
+Leitura do relatório JSON do Maigret (`-J simple`) em vez de raspar o stdout.
+
+O relatório é um objeto {"Site": {...}, "Site2": {...}} que pode ter milhares de entradas;
+o parser abaixo lê o arquivo em blocos e devolve uma entrada por vez (memória constante),
+sem dependência extra (usa json.JSONDecoder.raw_decode).
+"""
+import json
+import os
+import sys
+from importlib import resources
+
+CHUNK_SIZE = 64 * 1024
+MAIGRET_DEFAULT_TOP = 500  # --top-sites padrão do Maigret
+MAIGRET_DEFAULT_TIMEOUT = 30  # --timeout padrão do Maigret (s)
+
+_decoder = json.JSONDecoder()
+_site_names = None
+
+
+def iter_json_object_items(fp, chunk_size: int = CHUNK_SIZE):
+    """Gera (chave, valor) de um objeto JSON de topo, lendo `fp` incrementalmente."""
+    buf, pos, eof = "", 0, False
+
+    def more():
+        nonlocal buf, pos, eof
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf, pos = buf[pos:] + chunk, 0
+
+    def peek() -> str:
+        # Pula espaços e devolve o próximo caractere significativo (sem consumir)
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if eof:
+                return ""
+            more()
+
+    def decode():
+        nonlocal pos
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more()
+                continue
+            if end == len(buf) and not eof:
+                # Um número no fim do bloco pode estar truncado: lê mais e decodifica de novo
+                more()
+                continue
+            pos = end
+            return value
+
+    if peek() != "{":
+        raise ValueError("Relatório Maigret inválido: esperado objeto JSON")
+    pos += 1
+    if peek() == "}":
+        return
+    while True:
+        if peek() != '"':
+            raise ValueError(f"Relatório Maigret inválido na posição {pos}")
+        key = decode()
+        if peek() != ":":
+            raise ValueError(f"Relatório Maigret inválido na posição {pos}")
+        pos += 1
+        peek()
+        value = decode()
+        yield key, value
+        sep = peek()
+        pos += 1
+        if sep == "}":
+            return
+        if sep != ",":
+            raise ValueError(f"Relatório Maigret inválido na posição {pos}")
+
+
+def maigret_hit(site_name: str, entry: dict):
+    """Entrada do relatório -> hit estruturado (apenas perfis 'Claimed')."""
+    status = entry.get("status") or {}
+    if status.get("status") != "Claimed":
+        return None
+    site = entry.get("site") or {}
+    return {
+        "tool": "Maigret",
+        "site": site_name,
+        "url": entry.get("url_user") or status.get("url"),
+        "tags": status.get("tags") or site.get("tags") or [],
+        "rank": entry.get("rank") or site.get("alexaRank"),
+        "check_type": site.get("checkType"),
+        "http_status": entry.get("http_status"),
+        "url_main": entry.get("url_main") or site.get("urlMain"),
+        "ids": status.get("ids") or {},
+        "is_similar": entry.get("is_similar", False),
+    }
+
+
+def iter_maigret_hits(path: str):
+    with open(path, encoding="utf-8", errors="replace") as fp:
+        for site_name, entry in iter_json_object_items(fp):
+            if isinstance(entry, dict):
+                hit = maigret_hit(site_name, entry)
+                if hit:
+                    yield hit
+
+
+def find_reports(folder: str) -> list:
+    """Relatórios `report_<username>_simple.json` gerados numa pasta de saída."""
+    if not os.path.isdir(folder):
+        return []
+    return sorted(
+        os.path.join(folder, f) for f in os.listdir(folder)
+        if f.startswith("report_") and f.endswith("_simple.json")
+    )
+
+
+def _ranked_sites() -> list:
+    """(nome, tags) dos sites de username ativos, na ordem do --top-sites do Maigret (alexaRank), lidos uma vez."""
+    global _site_names
+    if _site_names is None:
+        data = json.loads((resources.files("maigret") / "resources" / "data.json").read_text(encoding="utf-8"))
+        sites = [
+            (info.get("alexaRank") or sys.maxsize, name,
+             {t.lower() for t in [*(info.get("tags") or []), info.get("engine") or "", info.get("protocol") or ""] if t})
+            for name, info in data.get("sites", {}).items()
+            if not info.get("disabled") and info.get("type", "username") == "username"
+        ]
+        # sorted() é estável: empates de rank ficam na ordem do data.json, como no Maigret
+        _site_names = [(name, tags) for _, name, tags in sorted(sites, key=lambda s: s[0])]
+    return _site_names
+
+
+def maigret_site_names(top: int = None, tags=None) -> list:
+    """
+    Sites que o Maigret sondaria com --top-sites `top` e --tags `tags` (nomes aceitos por --site).
+    top None = banco inteiro.
+    """
+    wanted = {t.lower() for t in tags or []}
+    names = [name for name, site_tags in _ranked_sites() if not wanted or wanted & site_tags]
+    return names if top is None else names[:top]
+
+
+def maigret_scope(args: list) -> tuple:
+    """(top, tags) de uma linha de comando do Maigret; sem --top-sites vale o padrão do Maigret."""
+    top, tags = MAIGRET_DEFAULT_TOP, []
+    for flag, value in zip(args, args[1:]):
+        if flag == "--top-sites":
+            top = int(value)
+        elif flag == "--tags":
+            tags = [t.strip() for t in value.split(",") if t.strip()]
+    return top, tags
@@ -0,0 +1,115 @@
+"""
+Cache negativo de (site, username): sites que já responderam "Not Found" para o alvo.
+
+- TTL próprio (OSINT_NEGATIVE_TTL), independente do cache de resultados
+- Compartilhado entre Sherlock e Maigret: nome do site normalizado (minúsculas), então um
+  "Not Found" do GitHub no Sherlock também poupa o GitHub no Maigret
+- Um achado posterior (refresh) remove a entrada negativa do site
+- Contador de sondagens poupadas (visível em /analyze/cache/stats)
+"""
+import asyncio
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from app.services.scan_cache import OSINT_CACHE_DB, normalize_target
+
+OSINT_NEGATIVE_TTL = int(os.getenv("OSINT_NEGATIVE_TTL", str(24 * 3600)))
+
+
+class NegativeCache:
+    def __init__(self, path: str = OSINT_CACHE_DB, ttl: int = OSINT_NEGATIVE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._ready = False
+
+    # ---------- SQLite ----------
+    @contextmanager
+    def _db(self):
+        if not self._ready:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            if not self._ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS negative_cache (
+                        site TEXT,
+                        username TEXT,
+                        tool TEXT,
+                        expires_at REAL,
+                        PRIMARY KEY (site, username)
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_negative_expires ON negative_cache(expires_at);
+                    CREATE TABLE IF NOT EXISTS negative_stats (
+                        name TEXT PRIMARY KEY,
+                        value INTEGER
+                    );
+                """)
+                self._ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _bump(self, conn, name: str, amount: int):
+        conn.execute(
+            "INSERT INTO negative_stats(name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def _absent(self, username: str) -> set:
+        with self._db() as conn:
+            rows = conn.execute(
+                "SELECT site FROM negative_cache WHERE username = ? AND expires_at > ?",
+                (normalize_target(username), time.time()),
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def _update(self, tool: str, username: str, absent: list, found: list, saved: int):
+        now = time.time()
+        user = normalize_target(username)
+        with self._db() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO negative_cache(site, username, tool, expires_at) VALUES (?, ?, ?, ?)",
+                [(site.lower(), user, tool, now + self.ttl) for site in absent],
+            )
+            conn.executemany(
+                "DELETE FROM negative_cache WHERE site = ? AND username = ?",
+                [(site.lower(), user) for site in found],
+            )
+            conn.execute("DELETE FROM negative_cache WHERE expires_at <= ?", (now,))
+            if saved:
+                self._bump(conn, "probes_saved", saved)
+            self._bump(conn, "scans", 1)
+
+    def _stats(self) -> dict:
+        with self._db() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM negative_stats").fetchall())
+            entries = conn.execute("SELECT COUNT(*) FROM negative_cache WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+        return {
+            "ttl": self.ttl,
+            "entries": entries,
+            "scans": counters.get("scans", 0),
+            "probes_saved": counters.get("probes_saved", 0),
+        }
+
+    # ---------- API ----------
+    async def absent(self, username: str) -> set:
+        """Sites (minúsculos) com 'Not Found' ainda válido para o username."""
+        return await asyncio.to_thread(self._absent, username)
+
+    async def update(self, tool: str, username: str, absent: list, found: list, saved: int = 0):
+        """Fecha um scan: grava os 'Not Found', limpa sites agora achados e soma o que foi poupado."""
+        await asyncio.to_thread(self._update, tool, username, list(absent), list(found), saved)
+
+    async def stats(self) -> dict:
+        return await asyncio.to_thread(self._stats)
+
+
+# Instância única compartilhada pelos runners
+negative_cache = NegativeCache()
@@ -0,0 +1,281 @@
+"""
+Pool de processos para o trabalho pesado de CPU com PDFs (pdfplumber + parse/extração de entidades).
+
+As rotas de PDF são async; extrair o texto de um dossiê de 30 páginas no próprio processo
+travava o event loop (e todas as outras requisições do worker do uvicorn) por segundos.
+- ProcessPoolExecutor com OSINT_PDF_WORKERS processos (0 = thread no próprio processo; a thread
+  não é interrompível, então num timeout a vaga e o lugar na fila só voltam quando ela termina)
+- Fila limitada: até OSINT_PDF_QUEUE PDFs esperando além dos que estão rodando;
+  acima disso PdfPoolBusy (as rotas respondem 503)
+- Cada worker é um executor próprio de um processo só, e um job vai para um worker livre:
+  timeout (OSINT_PDF_TIMEOUT) ou cancelamento termina só o processo daquele job, sem derrubar
+  os PDFs que rodam nos outros; worker que morre sozinho (crash, OOM) é trocado e o job
+  refeito uma vez
+- Ida e volta compactas: vai o texto das páginas se já está no cache (senão o caminho do PDF);
+  volta só o resultado do parse, mais as páginas quando acabaram de ser extraídas (para o cache)
+- Dossiês grandes (>= OSINT_PDF_SPLIT_PAGES páginas): extração dividida por faixas de páginas
+  entre os workers; o PDF vai uma vez para OSINT_PDF_SPOOL_DIR (/dev/shm, memória compartilhada,
+  quando existe) e cada worker abre pelo caminho, sem cópia dos bytes por job. As faixas voltam
+  e são juntadas na ordem, então o parse das seções vê as linhas contíguas
+"""
+import asyncio
+import math
+import multiprocessing
+import os
+import signal
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from app.services.pdf_text_cache import count_pages, extract_page_range, extract_pages, pdf_text_cache
+
+OSINT_PDF_WORKERS = int(os.getenv("OSINT_PDF_WORKERS", str(os.cpu_count() or 2)))
+OSINT_PDF_QUEUE = int(os.getenv("OSINT_PDF_QUEUE", "16"))
+OSINT_PDF_TIMEOUT = float(os.getenv("OSINT_PDF_TIMEOUT", "120"))
+OSINT_PDF_START_METHOD = os.getenv("OSINT_PDF_START_METHOD", "spawn")
+OSINT_PDF_SPLIT_PAGES = int(os.getenv("OSINT_PDF_SPLIT_PAGES", "16"))  # 0 = nunca dividir
+OSINT_PDF_CHUNK_PAGES = int(os.getenv("OSINT_PDF_CHUNK_PAGES", "4"))  # mínimo de páginas por faixa
+OSINT_PDF_SPOOL_DIR = os.getenv("OSINT_PDF_SPOOL_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir())
+
+
+class PdfPoolBusy(Exception):
+    """Fila de PDFs cheia; quem chamou deve responder 503 (tente de novo)."""
+
+
+def page_ranges(total: int, parts: int) -> list:
+    """[0, total) em `parts` faixas contíguas [início, fim) de tamanhos quase iguais."""
+    step, extra = divmod(total, parts)
+    ranges, start = [], 0
+    for i in range(parts):
+        stop = start + step + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+# ==========================================
+# LADO DO WORKER (processo filho)
+# ==========================================
+
+def _warm_worker():
+    # Ctrl+C vai para o grupo inteiro; quem encerra os workers é o pai (shutdown)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import pdfplumber  # noqa: F401
+    import app.reports.routes  # noqa: F401
+    import app.services.extractor  # noqa: F401
+
+
+def _ping():
+    return os.getpid()
+
+
+def run_pdf_job(job, source, pages, args):
+    """Extrai o texto (se ainda não veio pronto) e roda job(páginas, *args) -> (páginas novas | None, resultado)."""
+    fresh = None
+    if pages is None:
+        pages = fresh = extract_pages(source)
+    return fresh, job(pages, *args)
+
+
+# ==========================================
+# LADO DO SERVIDOR
+# ==========================================
+
+class PdfPool:
+    def __init__(self, workers: int = OSINT_PDF_WORKERS, queue: int = OSINT_PDF_QUEUE,
+                 timeout: float = OSINT_PDF_TIMEOUT, start_method: str = OSINT_PDF_START_METHOD,
+                 split_pages: int = OSINT_PDF_SPLIT_PAGES, chunk_pages: int = OSINT_PDF_CHUNK_PAGES,
+                 spool_dir: str = OSINT_PDF_SPOOL_DIR):
+        self.workers = max(0, workers)
+        self.queue = max(0, queue)
+        self.timeout = timeout
+        self.start_method = start_method
+        self.split_pages = split_pages
+        self.chunk_pages = max(1, chunk_pages)
+        self.spool_dir = spool_dir
+        self._executors = [None] * self.workers
+        self._free = asyncio.Queue()
+        for slot in range(self.workers):
+            self._free.put_nowait(slot)
+        self._slots = asyncio.Semaphore(1)  # modo thread (workers=0)
+        self._pending = 0
+        self.counters = {
+            "jobs": 0, "done": 0, "failed": 0, "timeouts": 0, "rejected": 0, "recycled": 0, "split_pdfs": 0,
+        }
+
+    def _worker(self, slot: int) -> ProcessPoolExecutor:
+        if self._executors[slot] is None:
+            self._executors[slot] = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_warm_worker,
+            )
+        return self._executors[slot]
+
+    def _recycle(self, slot: int, executor: ProcessPoolExecutor):
+        """Descarta o worker (processo travado ou morto); o próximo job nessa vaga sobe outro."""
+        if self._executors[slot] is executor:
+            self._executors[slot] = None
+            self.counters["recycled"] += 1
+        # Job em execução não é cancelável: o processo é terminado à força
+        for proc in list((getattr(executor, "_processes", None) or {}).values()):
+            if proc.is_alive():
+                proc.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _in_thread(self, fn, args: tuple):
+        """
+        workers=0: fn numa thread do próprio processo; devolve a vaga (_slots) quando a thread termina.
+        Em timeout/cancelamento a thread segue rodando: ela continua com a vaga e um lugar na fila
+        (_pending) até acabar de verdade, senão cada timeout deixaria uma thread a mais fora do limite.
+        """
+        future = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        abandoned = False
+
+        def finished(f):
+            if not f.cancelled():
+                f.exception()  # resultado de quem já desistiu: só marca como lido
+            if abandoned:
+                self._pending -= 1
+            self._slots.release()
+
+        future.add_done_callback(finished)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if isinstance(e, asyncio.TimeoutError):
+                self.counters["timeouts"] += 1
+            if not future.done():
+                abandoned = True
+                self._pending += 1
+            raise
+
+    async def _execute(self, fn, args: tuple, retry: bool = True):
+        """fn(*args) num worker livre; timeout/cancelamento matam só o processo deste job."""
+        slot = await self._free.get()
+        try:
+            executor = self._worker(slot)
+            try:
+                future = executor.submit(fn, *args)
+                return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+            except asyncio.TimeoutError:
+                self.counters["timeouts"] += 1
+                self._recycle(slot, executor)
+                raise
+            except asyncio.CancelledError:
+                # Quem pediu desistiu: o worker não pode seguir ocupado com um job sem dono
+                self._recycle(slot, executor)
+                raise
+            except BrokenProcessPool:
+                # O próprio worker morreu (crash, OOM): troca o processo e tenta uma vez
+                self._recycle(slot, executor)
+                if not retry:
+                    raise
+        finally:
+            self._free.put_nowait(slot)
+        return await self._execute(fn, args, retry=False)
+
+    @contextmanager
+    def _admit(self):
+        """Vaga na fila limitada (uma por PDF / chamada, mesmo que vire vários jobs)."""
+        if self._pending >= max(1, self.workers) + self.queue:
+            self.counters["rejected"] += 1
+            raise PdfPoolBusy(f"Fila de PDFs cheia ({self._pending} na fila). Tente novamente em instantes.")
+        self._pending += 1
+        try:
+            yield
+        finally:
+            self._pending -= 1
+
+    async def _job(self, fn, *args):
+        self.counters["jobs"] += 1
+        try:
+            if self.workers == 0:
+                await self._slots.acquire()
+                result = await self._in_thread(fn, args)
+            else:
+                result = await self._execute(fn, args)
+            self.counters["done"] += 1
+            return result
+        except Exception:
+            self.counters["failed"] += 1
+            raise
+
+    async def run(self, fn, *args):
+        """fn(*args) num processo do pool (fn e args precisam ser picklable)."""
+        with self._admit():
+            return await self._job(fn, *args)
+
+    def _spool(self, file_bytes: bytes) -> str:
+        fd, path = tempfile.mkstemp(prefix="osint_pdf_", suffix=".pdf", dir=self.spool_dir)
+        with os.fdopen(fd, "wb") as f:
+            f.write(file_bytes)
+        return path
+
+    async def _extract_split(self, path: str):
+        """Texto das páginas extraído em faixas paralelas, na ordem (None = documento pequeno, sem divisão)."""
+        if self.workers < 2 or self.split_pages <= 0:
+            return None
+        total = await self._job(count_pages, path)
+        if total < self.split_pages:
+            return None
+        parts = min(self.workers, math.ceil(total / self.chunk_pages))
+        chunks = await asyncio.gather(*[
+            self._job(extract_page_range, path, start, stop) for start, stop in page_ranges(total, parts)
+        ])
+        self.counters["split_pdfs"] += 1
+        return [page for chunk in chunks for page in chunk]
+
+    async def process(self, file_bytes: bytes, job, *args):
+        """job(páginas, *args) sobre o texto do PDF, com o cache de texto por SHA-256 na frente."""
+        digest, pages = await asyncio.to_thread(pdf_text_cache.lookup, file_bytes)
+        with self._admit():
+            if pages is not None:
+                _, result = await self._job(run_pdf_job, job, None, pages, args)
+                return result
+            if self.workers == 0:
+                pages, result = await self._job(run_pdf_job, job, file_bytes, None, args)
+            else:
+                path = await asyncio.to_thread(self._spool, file_bytes)
+                try:
+                    pages = await self._extract_split(path)
+                    if pages is None:
+                        pages, result = await self._job(run_pdf_job, job, path, None, args)
+                    else:
+                        _, result = await self._job(run_pdf_job, job, None, pages, args)
+                finally:
+                    os.remove(path)
+        await asyncio.to_thread(pdf_text_cache.put_pages, digest, pages)
+        return result
+
+    async def prewarm(self):
+        """Sobe os processos (spawn + imports) antes do primeiro PDF."""
+        if self.workers == 0:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*[loop.run_in_executor(self._worker(slot), _ping) for slot in range(self.workers)])
+        except Exception as e:
+            print(f"[PDF POOL] Falha ao aquecer os workers: {e}")
+
+    async def close(self):
+        for slot, executor in enumerate(self._executors):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executors[slot] = None
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "workers": self.workers,
+            "queue": self.queue,
+            "timeout": self.timeout,
+            "split_pages": self.split_pages,
+            "pending": self._pending,
+            "running": sum(1 for executor in self._executors if executor is not None),
+        }
+
+
+# Instância única compartilhada pelas rotas
+pdf_pool = PdfPool()
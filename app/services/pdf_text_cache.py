@@ -0,0 +1,191 @@
+"""
+Cache do texto extraído dos PDFs (pdfplumber), por SHA-256 dos bytes do arquivo.
+
+O mesmo relatório MIND-7 costuma entrar por /analyze/pdf, /reports/mind7-to-delta-html e
+pelo upload do caso; a extração de layout do pdfplumber é a etapa mais cara das três.
+- Memória: texto por página num LRU limitado por tamanho (OSINT_PDF_TEXT_CACHE_MB)
+- Disco: cada extração também vai comprimida (gzip) para OSINT_PDF_TEXT_DIR, compartilhada
+  pelos workers do uvicorn e reaproveitada após restart; despejo dos mais antigos
+  (por último acesso) acima de OSINT_PDF_TEXT_DISK_MB
+"""
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pdfplumber
+
+OSINT_PDF_TEXT_CACHE_MB = float(os.getenv("OSINT_PDF_TEXT_CACHE_MB", "64"))
+OSINT_PDF_TEXT_DIR = os.getenv("OSINT_PDF_TEXT_DIR", "data/pdf_text")
+OSINT_PDF_TEXT_DISK_MB = float(os.getenv("OSINT_PDF_TEXT_DISK_MB", "256"))
+
+
+def pdf_digest(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def _open(source):
+    """source = bytes do PDF ou caminho do arquivo (workers do pool abrem pelo caminho)."""
+    return pdfplumber.open(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+
+
+def extract_pages(source) -> list:
+    """Texto de cada página (pdfplumber); página sem texto vira ''."""
+    with _open(source) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages]
+
+
+def extract_page_range(source, start: int, stop: int) -> list:
+    """Texto das páginas [start, stop) -- um pedaço do documento, para extração em paralelo."""
+    with _open(source) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages[start:stop]]
+
+
+def count_pages(source) -> int:
+    with _open(source) as pdf:
+        return len(pdf.pages)
+
+
+def _pages_size(pages: list) -> int:
+    return sum(len(p) for p in pages) + 64 * len(pages)
+
+
+class PdfTextCache:
+    def __init__(self, max_mb: float = OSINT_PDF_TEXT_CACHE_MB, folder: str = OSINT_PDF_TEXT_DIR,
+                 disk_mb: float = OSINT_PDF_TEXT_DISK_MB):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.folder = folder
+        self.disk_bytes = int(disk_mb * 1024 * 1024)
+        self._memory = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+
+    # ---------- memória (LRU) ----------
+    def _remember(self, digest: str, pages: list):
+        size = _pages_size(pages)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if digest in self._memory:
+                self._memory.move_to_end(digest)
+                return
+            self._memory[digest] = pages
+            self._size += size
+            while self._size > self.max_bytes and self._memory:
+                _, old = self._memory.popitem(last=False)
+                self._size -= _pages_size(old)
+                self.counters["evictions"] += 1
+
+    def _recall(self, digest: str):
+        with self._lock:
+            pages = self._memory.get(digest)
+            if pages is not None:
+                self._memory.move_to_end(digest)
+            return pages
+
+    # ---------- disco (gzip) ----------
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.folder, digest[:2], f"{digest}.json.gz")
+
+    def _load(self, digest: str):
+        path = self._path(digest)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                pages = json.load(f)
+            os.utime(path)  # último acesso, para o despejo
+            return pages
+        except (OSError, ValueError):
+            return None
+
+    def _spill(self, digest: str, pages: list):
+        path = self._path(digest)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                json.dump(pages, f, ensure_ascii=False)
+            os.replace(tmp, path)
+            self._trim_disk()
+        except OSError as e:
+            print(f"[PDF CACHE] Falha ao gravar {path}: {e}")
+
+    def _trim_disk(self):
+        if self.disk_bytes <= 0:
+            return
+        files = []
+        for root, _, names in os.walk(self.folder):
+            for name in names:
+                if name.endswith(".json.gz"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.counters["disk_evictions"] += 1
+            except OSError:
+                pass
+
+    # ---------- API ----------
+    def get_pages(self, digest: str):
+        """Páginas já extraídas (memória, depois disco) ou None."""
+        pages = self._recall(digest)
+        if pages is not None:
+            self.counters["memory_hits"] += 1
+            return pages
+        pages = self._load(digest)
+        if pages is not None:
+            self.counters["disk_hits"] += 1
+            self._remember(digest, pages)
+        return pages
+
+    def put_pages(self, digest: str, pages: list):
+        self._remember(digest, pages)
+        self._spill(digest, pages)
+
+    def lookup(self, file_bytes: bytes) -> tuple:
+        """(digest, páginas) sem extrair; páginas None = miss (quem chamou extrai e faz put_pages)."""
+        digest = pdf_digest(file_bytes)
+        pages = self.get_pages(digest)
+        if pages is None:
+            self.counters["misses"] += 1
+        return digest, pages
+
+    def pages(self, file_bytes: bytes) -> list:
+        """Texto por página do PDF, extraído no máximo uma vez por conteúdo."""
+        digest, pages = self.lookup(file_bytes)
+        if pages is None:
+            started = time.monotonic()
+            pages = extract_pages(file_bytes)
+            print(f"[PDF CACHE] {len(pages)} páginas extraídas em {time.monotonic() - started:.2f}s ({digest[:12]})")
+            self.put_pages(digest, pages)
+        return pages
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = len(self._memory), self._size
+        lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": entries,
+            "memory_mb": round(size / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "folder": self.folder,
+            "hit_ratio": round((lookups - self.counters["misses"]) / lookups, 3) if lookups else 0.0,
+        }
+
+
+# Instância única compartilhada pelas rotas
+pdf_text_cache = PdfTextCache()
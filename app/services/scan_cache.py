@@ -0,0 +1,249 @@
+"""
+Cache persistente (SQLite) dos resultados OSINT, com TTL, despejo LRU e single-flight.
+
+- Chave: (ferramenta, alvo normalizado, opções da ferramenta)
+- Arquivo SQLite local: sobrevive a restarts e é compartilhado entre os workers do uvicorn
+- Requisições idênticas simultâneas viram uma única execução:
+  no mesmo processo via Future; entre processos via lease na tabela scan_inflight
+- Contadores de hit/miss persistidos (visíveis por todos os workers)
+- Buscas (dorks, web search) ficam em outra instância (search_cache), com arquivo e limite
+  próprios: ~20 entradas por nome pesquisado não despejam os resultados das ferramentas
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+
+OSINT_CACHE_DB = os.getenv("OSINT_CACHE_DB", "data/osint_cache.db")
+OSINT_CACHE_TTL = int(os.getenv("OSINT_CACHE_TTL", str(6 * 3600)))
+OSINT_CACHE_MAX_ENTRIES = int(os.getenv("OSINT_CACHE_MAX_ENTRIES", "5000"))
+OSINT_SEARCH_CACHE_DB = os.getenv("OSINT_SEARCH_CACHE_DB", "data/osint_search_cache.db")
+OSINT_SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("OSINT_SEARCH_CACHE_MAX_ENTRIES", "20000"))
+
+# Tempo máximo que um worker segura o lease de uma execução (depois outro pode assumir)
+INFLIGHT_LEASE = 180
+INFLIGHT_POLL = 0.5
+
+
+def normalize_target(target: str) -> str:
+    return (target or "").strip().lower()
+
+
+def cache_key(tool: str, target: str, options=None) -> str:
+    raw = json.dumps([tool.lower(), normalize_target(target), options or {}], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ScanCache:
+    def __init__(self, path: str = OSINT_CACHE_DB, ttl: int = OSINT_CACHE_TTL, max_entries: int = OSINT_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._inflight = {}
+        self._ready = False
+
+    # ---------- SQLite ----------
+    @contextmanager
+    def _db(self):
+        conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _connect(self):
+        if not self._ready:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS scan_cache (
+                    key TEXT PRIMARY KEY,
+                    tool TEXT,
+                    target TEXT,
+                    value TEXT,
+                    created_at REAL,
+                    expires_at REAL,
+                    last_access REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_scan_cache_access ON scan_cache(last_access);
+                CREATE TABLE IF NOT EXISTS scan_inflight (
+                    key TEXT PRIMARY KEY,
+                    owner TEXT,
+                    expires_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS cache_stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER
+                );
+            """)
+            self._ready = True
+        return conn
+
+    def _bump(self, conn, name: str):
+        conn.execute(
+            "INSERT INTO cache_stats(name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def _get(self, key: str):
+        now = time.time()
+        with self._db() as conn:
+            row = conn.execute("SELECT value, expires_at, created_at FROM scan_cache WHERE key = ?", (key,)).fetchone()
+            if row and row[1] > now:
+                conn.execute("UPDATE scan_cache SET last_access = ? WHERE key = ?", (now, key))
+                return json.loads(row[0]), row[2]
+        return None
+
+    def _set(self, key: str, tool: str, target: str, value, ttl: int):
+        now = time.time()
+        with self._db() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scan_cache(key, tool, target, value, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, tool, normalize_target(target), json.dumps(value, default=str), now, now + ttl, now),
+            )
+            # TTL vencido sai primeiro; depois LRU até caber no limite
+            conn.execute("DELETE FROM scan_cache WHERE expires_at <= ?", (now,))
+            excess = conn.execute("SELECT COUNT(*) FROM scan_cache").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM scan_cache WHERE key IN (SELECT key FROM scan_cache ORDER BY last_access ASC LIMIT ?)",
+                    (excess,),
+                )
+                conn.execute(
+                    "INSERT INTO cache_stats(name, value) VALUES ('evictions', ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    (excess,),
+                )
+
+    def _record(self, name: str):
+        with self._db() as conn:
+            self._bump(conn, name)
+
+    def _try_lease(self, key: str) -> bool:
+        now = time.time()
+        with self._db() as conn:
+            conn.execute("DELETE FROM scan_inflight WHERE key = ? AND expires_at <= ?", (key, now))
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO scan_inflight(key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, self.owner, now + INFLIGHT_LEASE),
+            )
+            return cur.rowcount == 1
+
+    def _release_lease(self, key: str):
+        with self._db() as conn:
+            conn.execute("DELETE FROM scan_inflight WHERE key = ? AND owner = ?", (key, self.owner))
+
+    # ---------- API assíncrona ----------
+    async def get(self, tool: str, target: str, options=None):
+        found = await asyncio.to_thread(self._get, cache_key(tool, target, options))
+        return found[0] if found else None
+
+    async def set(self, tool: str, target: str, value, options=None, ttl: int = None):
+        await asyncio.to_thread(self._set, cache_key(tool, target, options), tool, target, value, ttl or self.ttl)
+
+    async def get_or_run(self, tool: str, target: str, producer, options=None, ttl: int = None,
+                         refresh: bool = False, should_cache=None) -> tuple:
+        """
+        Devolve (valor, meta). producer() é uma coroutine que roda a ferramenta de verdade.
+        meta = {"cached": bool, "shared": bool, "age": segundos desde a gravação}.
+        should_cache(valor) decide se o resultado vale guardar (ex.: não guardar timeouts).
+        """
+        key = cache_key(tool, target, options)
+
+        if not refresh:
+            found = await asyncio.to_thread(self._get, key)
+            if found:
+                await asyncio.to_thread(self._record, "hits")
+                return found[0], {"cached": True, "shared": False, "age": round(time.time() - found[1], 1)}
+
+        # Single-flight no processo: quem chega depois espera a mesma execução
+        while key in self._inflight:
+            leader = self._inflight[key]
+            await asyncio.to_thread(self._record, "collapsed")
+            try:
+                value = await asyncio.shield(leader)
+                return value, {"cached": False, "shared": True, "age": 0}
+            except asyncio.CancelledError:
+                # O cliente da execução original desconectou: este assume (se não foi ele o cancelado)
+                if not leader.cancelled():
+                    raise
+                await asyncio.sleep(0)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value, meta = await self._run_leased(key, tool, target, producer, ttl, refresh, should_cache)
+            future.set_result(value)
+            return value, meta
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            if future.done() and not future.cancelled():
+                future.exception()  # evita "exception was never retrieved"
+
+    async def _run_leased(self, key, tool, target, producer, ttl, refresh, should_cache) -> tuple:
+        # Single-flight entre workers do uvicorn: outro processo já está rodando?
+        deadline = time.monotonic() + INFLIGHT_LEASE
+        waiting_since = time.time()
+        while not await asyncio.to_thread(self._try_lease, key):
+            if time.monotonic() > deadline:
+                break
+            await asyncio.sleep(INFLIGHT_POLL)
+            found = await asyncio.to_thread(self._get, key)
+            if found and (not refresh or found[1] >= waiting_since):
+                await asyncio.to_thread(self._record, "collapsed")
+                return found[0], {"cached": False, "shared": True, "age": round(time.time() - found[1], 1)}
+
+        try:
+            await asyncio.to_thread(self._record, "misses")
+            value = await producer()
+            if should_cache is None or should_cache(value):
+                await asyncio.to_thread(self._set, key, tool, target, value, ttl or self.ttl)
+            return value, {"cached": False, "shared": False, "age": 0}
+        finally:
+            await asyncio.to_thread(self._release_lease, key)
+
+    def _stats(self) -> dict:
+        with self._db() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM cache_stats").fetchall())
+            entries = conn.execute("SELECT COUNT(*) FROM scan_cache WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+            per_tool = dict(conn.execute("SELECT tool, COUNT(*) FROM scan_cache GROUP BY tool").fetchall())
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "path": self.path,
+            "ttl": self.ttl,
+            "max_entries": self.max_entries,
+            "entries": entries,
+            "per_tool": per_tool,
+            "hits": hits,
+            "misses": misses,
+            "collapsed": counters.get("collapsed", 0),
+            "evictions": counters.get("evictions", 0),
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "inflight_local": len(self._inflight),
+        }
+
+    async def stats(self) -> dict:
+        return await asyncio.to_thread(self._stats)
+
+
+# Instância única compartilhada pelas rotas
+scan_cache = ScanCache()
+# Buscas (dorks, web search): LRU e contadores separados dos resultados das ferramentas
+search_cache = ScanCache(OSINT_SEARCH_CACHE_DB, max_entries=OSINT_SEARCH_CACHE_MAX_ENTRIES)
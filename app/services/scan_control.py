@@ -0,0 +1,116 @@
+"""
+Cancelamento dos scans OSINT por requisição.
+
+- Cada scan HTTP roda numa task registrada com um scan_id (enviado pelo cliente ou gerado)
+- Cliente fechou a aba (desconexão) ou POST /analyze/cancel/{scan_id}: a task é cancelada;
+  o ToolRunner mata o grupo de processos da ferramenta e a vaga é liberada na hora
+- Histórico recente com o desfecho de cada scan: ok | cancelled | error
+O registro é por processo: o cancelamento explícito precisa cair no mesmo worker do uvicorn.
+"""
+import asyncio
+import os
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+
+OSINT_DISCONNECT_POLL = float(os.getenv("OSINT_DISCONNECT_POLL", "0.5"))
+
+
+class ScanCancelled(Exception):
+    def __init__(self, scan_id: str, reason: str):
+        super().__init__(f"scan {scan_id} cancelado ({reason})")
+        self.scan_id = scan_id
+        self.reason = reason
+
+
+class ScanRegistry:
+    def __init__(self, history_size: int = 100, poll: float = OSINT_DISCONNECT_POLL):
+        self.poll = poll
+        self.running = {}
+        self.history = deque(maxlen=history_size)
+        self.counts = {"ok": 0, "cancelled": 0, "error": 0}
+
+    async def _watch_disconnect(self, request, scan_id: str):
+        while scan_id in self.running:
+            await asyncio.sleep(self.poll)
+            if await request.is_disconnected():
+                self.cancel(scan_id, "disconnect")
+                return
+
+    async def run(self, coro, request=None, scan_id: str = None, kind: str = "scan", target: str = None):
+        """
+        Executa `coro` como scan cancelável e devolve (scan_id, resultado).
+        Levanta ScanCancelled se o cliente desconectar ou o scan for cancelado explicitamente;
+        ValueError se o scan_id já estiver em uso.
+        """
+        scan_id = scan_id or uuid.uuid4().hex[:12]
+        if scan_id in self.running:
+            coro.close()
+            raise ValueError(f"scan_id {scan_id} já está em execução")
+
+        task = asyncio.create_task(coro)
+        entry = {
+            "scan_id": scan_id,
+            "kind": kind,
+            "target": target,
+            "started_at": datetime.now().isoformat(),
+            "reason": None,
+            "task": task,
+            "_started": time.monotonic(),
+        }
+        self.running[scan_id] = entry
+        watcher = asyncio.create_task(self._watch_disconnect(request, scan_id)) if request is not None else None
+        status = "error"
+        try:
+            result = await task
+            status = "ok"
+            return scan_id, result
+        except asyncio.CancelledError:
+            if entry["reason"] is None:
+                # A própria requisição foi cancelada (ex.: shutdown): a task já foi junto
+                entry["reason"] = "shutdown"
+                status = "cancelled"
+                raise
+            status = "cancelled"
+            raise ScanCancelled(scan_id, entry["reason"])
+        finally:
+            if watcher:
+                watcher.cancel()
+            self.running.pop(scan_id, None)
+            self.counts[status] += 1
+            self.history.append({
+                "scan_id": scan_id,
+                "kind": kind,
+                "target": target,
+                "started_at": entry["started_at"],
+                "status": status,
+                "reason": entry["reason"],
+                "elapsed": round(time.monotonic() - entry["_started"], 3),
+            })
+            if status == "cancelled":
+                print(f"--> [SCAN] {kind} {scan_id} cancelado ({entry['reason']})")
+
+    def cancel(self, scan_id: str, reason: str = "explicit") -> bool:
+        entry = self.running.get(scan_id)
+        if not entry or entry["task"].done():
+            return False
+        entry["reason"] = entry["reason"] or reason
+        entry["task"].cancel()
+        return True
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        return {
+            "running": [
+                {"scan_id": e["scan_id"], "kind": e["kind"], "target": e["target"],
+                 "started_at": e["started_at"], "elapsed": round(now - e["_started"], 3)}
+                for e in self.running.values()
+            ],
+            "counts": dict(self.counts),
+            "recent": list(self.history),
+        }
+
+
+# Instância única compartilhada pelas rotas
+scan_registry = ScanRegistry()
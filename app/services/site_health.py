@@ -0,0 +1,200 @@
+"""
+Histórico de latência/falhas por site e circuit breaker das sondagens de username.
+
+- Amostras (latência, sucesso) por site num SQLite local, compartilhado entre scans e workers
+- Timeout adaptativo: p95 das respostas bem-sucedidas x fator, limitado ao timeout padrão
+- Circuito abre após N falhas seguidas (timeout/erro de conexão): o site é pulado até o
+  fim do cooldown; depois volta "meio aberto" e uma falha já o fecha de novo para o scan
+- Percentis p50/p90/p99 por site para enxergar quem segura os scans
+- Nome do site em minúsculas (como no cache negativo): Sherlock e Maigret grafam diferente
+  o mesmo site ("Github" / "GitHub") e compartilham o histórico
+"""
+import asyncio
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+OSINT_SITE_HEALTH_DB = os.getenv("OSINT_SITE_HEALTH_DB", "data/osint_sites.db")
+OSINT_SITE_FAIL_THRESHOLD = int(os.getenv("OSINT_SITE_FAIL_THRESHOLD", "5"))
+OSINT_SITE_COOLDOWN = int(os.getenv("OSINT_SITE_COOLDOWN", "900"))
+OSINT_SITE_SAMPLES = int(os.getenv("OSINT_SITE_SAMPLES", "100"))  # amostras guardadas por site
+OSINT_SITE_MIN_TIMEOUT = float(os.getenv("OSINT_SITE_MIN_TIMEOUT", "3"))
+OSINT_ADAPTIVE_TIMEOUT = os.getenv("OSINT_ADAPTIVE_TIMEOUT", "1") == "1"
+
+# Timeout adaptativo = p95 * fator + folga (só com amostras suficientes)
+TIMEOUT_FACTOR = 2.0
+TIMEOUT_SLACK = 1.0
+MIN_SAMPLES = 5
+
+
+def percentile(values: list, q: float):
+    """Percentil por interpolação linear (values já ordenados)."""
+    if not values:
+        return None
+    pos = (len(values) - 1) * q
+    low = int(pos)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (pos - low)
+
+
+class SiteHealth:
+    def __init__(self, path: str = OSINT_SITE_HEALTH_DB, fail_threshold: int = OSINT_SITE_FAIL_THRESHOLD,
+                 cooldown: int = OSINT_SITE_COOLDOWN, samples: int = OSINT_SITE_SAMPLES,
+                 min_timeout: float = OSINT_SITE_MIN_TIMEOUT, adaptive: bool = OSINT_ADAPTIVE_TIMEOUT):
+        self.path = path
+        self.fail_threshold = max(1, fail_threshold)
+        self.cooldown = cooldown
+        self.samples = max(MIN_SAMPLES, samples)
+        self.min_timeout = min_timeout
+        self.adaptive = adaptive
+        self._ready = False
+
+    # ---------- SQLite ----------
+    @contextmanager
+    def _db(self):
+        if not self._ready:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            if not self._ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS site_samples (
+                        site TEXT,
+                        ts REAL,
+                        latency REAL,
+                        ok INTEGER
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_site_samples ON site_samples(site, ts);
+                    CREATE TABLE IF NOT EXISTS site_stats (
+                        site TEXT PRIMARY KEY,
+                        samples INTEGER DEFAULT 0,
+                        failures INTEGER DEFAULT 0,
+                        p50 REAL,
+                        p90 REAL,
+                        p99 REAL,
+                        timeout REAL,
+                        consecutive_failures INTEGER DEFAULT 0,
+                        opened_until REAL DEFAULT 0,
+                        updated_at REAL
+                    );
+                """)
+                # Bancos antigos guardavam o nome como veio do manifesto
+                conn.execute("UPDATE site_samples SET site = lower(site) WHERE site != lower(site)")
+                conn.execute("UPDATE OR IGNORE site_stats SET site = lower(site) WHERE site != lower(site)")
+                conn.execute("DELETE FROM site_stats WHERE site != lower(site)")
+                conn.commit()
+                self._ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _plan(self, sites: list, default_timeout: float) -> dict:
+        now = time.time()
+        with self._db() as conn:
+            rows = {r[0]: r[1:] for r in conn.execute("SELECT site, timeout, opened_until, consecutive_failures FROM site_stats")}
+        plan = {"timeouts": {}, "open": [], "half_open": []}
+        for site in sites:
+            timeout, opened_until, consecutive = rows.get(site.lower(), (None, 0, 0))
+            if opened_until and opened_until > now:
+                plan["open"].append(site)
+                continue
+            if consecutive >= self.fail_threshold:
+                plan["half_open"].append(site)
+            plan["timeouts"][site] = min(default_timeout, timeout) if self.adaptive and timeout else default_timeout
+        return plan
+
+    def _record(self, samples: list):
+        now = time.time()
+        by_site = {}
+        for site, latency, ok in samples:
+            by_site.setdefault(site.lower(), []).append((latency, ok))
+
+        with self._db() as conn:
+            conn.executemany(
+                "INSERT INTO site_samples(site, ts, latency, ok) VALUES (?, ?, ?, ?)",
+                [(site.lower(), now, latency, int(ok)) for site, latency, ok in samples],
+            )
+            for site, new in by_site.items():
+                # Janela deslizante: só as últimas N amostras do site
+                conn.execute(
+                    "DELETE FROM site_samples WHERE site = ? AND rowid NOT IN "
+                    "(SELECT rowid FROM site_samples WHERE site = ? ORDER BY ts DESC, rowid DESC LIMIT ?)",
+                    (site, site, self.samples),
+                )
+                window = conn.execute("SELECT latency, ok FROM site_samples WHERE site = ?", (site,)).fetchall()
+                latencies = sorted(lat for lat, _ in window)
+                ok_latencies = sorted(lat for lat, ok in window if ok)
+                timeout = None
+                if len(ok_latencies) >= MIN_SAMPLES:
+                    timeout = max(self.min_timeout, percentile(ok_latencies, 0.95) * TIMEOUT_FACTOR + TIMEOUT_SLACK)
+
+                row = conn.execute(
+                    "SELECT consecutive_failures, opened_until FROM site_stats WHERE site = ?", (site,)
+                ).fetchone()
+                consecutive, opened_until = row if row else (0, 0)
+                for _, ok in new:
+                    consecutive = 0 if ok else consecutive + 1
+                if consecutive == 0:
+                    opened_until = 0
+                elif consecutive >= self.fail_threshold:
+                    if opened_until <= now:
+                        print(f"--> [SITE HEALTH] Circuito aberto para {site} ({consecutive} falhas seguidas)")
+                    opened_until = now + self.cooldown
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO site_stats(site, samples, failures, p50, p90, p99, timeout, "
+                    "consecutive_failures, opened_until, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        site, len(window), sum(1 for _, ok in window if not ok),
+                        percentile(latencies, 0.5), percentile(latencies, 0.9), percentile(latencies, 0.99),
+                        timeout, consecutive, opened_until, now,
+                    ),
+                )
+
+    def _report(self, limit: int, site: str = None) -> list:
+        now = time.time()
+        query = "SELECT site, samples, failures, p50, p90, p99, timeout, consecutive_failures, opened_until FROM site_stats"
+        params = ()
+        if site:
+            query += " WHERE lower(site) = lower(?)"
+            params = (site,)
+        query += " ORDER BY p90 DESC LIMIT ?"
+        with self._db() as conn:
+            rows = conn.execute(query, params + (limit,)).fetchall()
+        return [
+            {
+                "site": r[0],
+                "samples": r[1],
+                "failure_rate": round(r[2] / r[1], 3) if r[1] else 0,
+                "p50": round(r[3], 3) if r[3] is not None else None,
+                "p90": round(r[4], 3) if r[4] is not None else None,
+                "p99": round(r[5], 3) if r[5] is not None else None,
+                "adaptive_timeout": round(r[6], 2) if r[6] else None,
+                "circuit": "open" if r[8] > now else ("half_open" if r[7] >= self.fail_threshold else "closed"),
+                "reopens_in": round(r[8] - now) if r[8] > now else None,
+            }
+            for r in rows
+        ]
+
+    # ---------- API ----------
+    async def plan(self, sites: list, default_timeout: float) -> dict:
+        """{"timeouts": {site: s}, "open": [...], "half_open": [...]} para um scan (nomes como vieram)."""
+        return await asyncio.to_thread(self._plan, list(sites), default_timeout)
+
+    async def record(self, samples: list):
+        """samples: [(site, latência, ok)] de um scan inteiro (uma transação só)."""
+        if samples:
+            await asyncio.to_thread(self._record, samples)
+
+    async def report(self, limit: int = 50, site: str = None) -> list:
+        """Sites ordenados pelo p90 (os que mais seguram os scans primeiro)."""
+        return await asyncio.to_thread(self._report, limit, site)
+
+
+# Instância única compartilhada pelas rotas
+site_health = SiteHealth()
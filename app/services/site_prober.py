@@ -0,0 +1,207 @@
+"""
+Sondagem de usernames em lote, direto do manifesto de sites do Sherlock.
+
+O Sherlock CLI abre um processo (e uma sessão HTTP) por username. Aqui vários alvos
+viram uma carga só:
+- um único httpx.AsyncClient com pool de conexões compartilhado entre todos os alvos
+- limite por site (concorrência + token bucket) válido para o lote inteiro
+- limite global de requisições simultâneas
+- timeout adaptativo e circuit breaker por site (app/services/site_health.py)
+As regras de detecção (status_code / message / response_url) seguem as do Sherlock.
+"""
+import asyncio
+import json
+import os
+import re
+import time
+from importlib import resources
+
+import httpx
+
+from app.services.dorks import TokenBucket
+from app.services.site_health import site_health as default_site_health
+
+SITE_MANIFEST = os.getenv("SITE_MANIFEST", "")
+OSINT_PROBE_CONCURRENCY = int(os.getenv("OSINT_PROBE_CONCURRENCY", "64"))
+OSINT_PROBE_PER_SITE = int(os.getenv("OSINT_PROBE_PER_SITE", "2"))
+OSINT_PROBE_SITE_RATE = float(os.getenv("OSINT_PROBE_SITE_RATE", "2.0"))  # req/s por site
+OSINT_PROBE_TIMEOUT = float(os.getenv("OSINT_PROBE_TIMEOUT", "15"))
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:129.0) Gecko/20100101 Firefox/129.0"
+
+# Páginas de desafio de WAF (mesma lista do Sherlock): resultado inconclusivo
+WAF_HIT_MSGS = [
+    '<span id="challenge-error-text">',
+    "AwsWafIntegration.forceRefreshToken",
+    '{return l.onPageView}}),Object.defineProperty(r,"perimeterxIdentifiers",{enumerable:',
+]
+
+_manifest = None
+
+
+def load_site_manifest(path: str = None) -> dict:
+    """Manifesto de sites (data.json do Sherlock), carregado uma vez por processo."""
+    global _manifest
+    if _manifest is not None and not path:
+        return _manifest
+    path = path or SITE_MANIFEST
+    if path:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    else:
+        data = json.loads((resources.files("sherlock_project") / "resources" / "data.json").read_text(encoding="utf-8"))
+    data = {name: info for name, info in data.items() if isinstance(info, dict) and "url" in info}
+    if not path or path == SITE_MANIFEST:
+        _manifest = data
+    return data
+
+
+def interpolate(value, username: str):
+    if isinstance(value, str):
+        return value.replace("{}", username).replace("{username}", username)
+    if isinstance(value, dict):
+        return {k: interpolate(v, username) for k, v in value.items()}
+    if isinstance(value, list):
+        return [interpolate(v, username) for v in value]
+    return value
+
+
+def evaluate(info: dict, status_code: int, text: str) -> str:
+    """Aplica as regras do Sherlock: 'claimed' | 'available' | 'waf' | 'unknown'."""
+    if text and any(msg in text for msg in WAF_HIT_MSGS):
+        return "waf"
+    error_type = info.get("errorType")
+    error_type = [error_type] if isinstance(error_type, str) else list(error_type or [])
+    if not error_type or any(t not in ("message", "status_code", "response_url") for t in error_type):
+        return "unknown"
+
+    status = None
+    if "message" in error_type:
+        errors = info.get("errorMsg") or []
+        errors = [errors] if isinstance(errors, str) else errors
+        status = "available" if any(e in (text or "") for e in errors) else "claimed"
+    if "status_code" in error_type and status != "available":
+        codes = info.get("errorCode")
+        codes = [codes] if isinstance(codes, int) else (codes or [])
+        status = "available" if status_code in codes or not 200 <= status_code < 300 else "claimed"
+    if "response_url" in error_type and status != "available":
+        status = "claimed" if 200 <= status_code < 300 else "available"
+    return status
+
+
+class SiteProber:
+    def __init__(self, manifest: dict = None, concurrency: int = OSINT_PROBE_CONCURRENCY,
+                 per_site: int = OSINT_PROBE_PER_SITE, site_rate: float = OSINT_PROBE_SITE_RATE,
+                 timeout: float = OSINT_PROBE_TIMEOUT, include_nsfw: bool = False, health=None):
+        self._manifest = manifest
+        self.health = health
+        self.concurrency = max(1, concurrency)
+        self.per_site = max(1, per_site)
+        self.site_rate = site_rate
+        self.timeout = timeout
+        self.include_nsfw = include_nsfw
+
+    @property
+    def manifest(self) -> dict:
+        if self._manifest is None:
+            self._manifest = load_site_manifest()
+        return self._manifest
+
+    def sites(self, names=None) -> dict:
+        wanted = {n.lower() for n in names} if names else None
+        return {
+            name: info for name, info in self.manifest.items()
+            if (wanted is None or name.lower() in wanted)
+            and (self.include_nsfw or not info.get("isNSFW"))
+        }
+
+    async def _probe(self, client, name: str, info: dict, username: str, timeout: float) -> dict:
+        url = interpolate(info["url"], username)
+        probe = {"site": name, "username": username, "url": url, "status": None, "http_status": None, "latency": None}
+
+        regex = info.get("regexCheck")
+        if regex and re.search(regex, username) is None:
+            probe["status"] = "illegal"
+            return probe
+
+        error_type = info.get("errorType")
+        method = info.get("request_method") or ("HEAD" if error_type == "status_code" else "GET")
+        started = time.monotonic()
+        try:
+            r = await client.request(
+                method,
+                interpolate(info.get("urlProbe") or info["url"], username),
+                headers=info.get("headers"),
+                json=interpolate(info.get("request_payload"), username),
+                follow_redirects=error_type != "response_url",
+                timeout=timeout,
+            )
+            text = r.text if method != "HEAD" else ""
+            probe["http_status"] = r.status_code
+            probe["status"] = evaluate(info, r.status_code, text)
+        except httpx.TimeoutException:
+            probe["status"] = "timeout"
+        except Exception as e:
+            probe["status"] = "error"
+            probe["error"] = f"{type(e).__name__}: {e}"[:200]
+        probe["latency"] = round(time.monotonic() - started, 3)
+        return probe
+
+    async def probe_many(self, usernames: list, site_names=None, on_result=None) -> list:
+        """
+        Sonda todos os usernames em todos os sites como uma carga única.
+        on_result(probe) é chamado a cada sondagem concluída.
+        Sites com circuito aberto voltam com status 'circuit_open' (sem requisição).
+        """
+        sites = self.sites(site_names)
+        plan = await self.health.plan(sites, self.timeout) if self.health else {"timeouts": {}, "open": [], "half_open": []}
+        open_sites = set(plan["open"])
+        # Falhas seguidas dentro deste scan: o site "desarma" sem esperar o próximo scan
+        trip_after = {name: 1 if name in plan["half_open"] else (self.health.fail_threshold if self.health else None) for name in sites}
+        failures = {name: 0 for name in sites}
+        samples = []
+        global_slots = asyncio.Semaphore(self.concurrency)
+        limiters = {name: (asyncio.Semaphore(self.per_site), TokenBucket(self.site_rate, self.per_site)) for name in sites}
+
+        def skipped(name, info, username):
+            return {"site": name, "username": username, "url": interpolate(info["url"], username),
+                    "status": "circuit_open", "http_status": None, "latency": None}
+
+        async def run_one(client, name, info, username):
+            site_slots, bucket = limiters[name]
+            async with site_slots:
+                if name in open_sites:
+                    probe = skipped(name, info, username)
+                else:
+                    await bucket.acquire()
+                    async with global_slots:
+                        probe = await self._probe(client, name, info, username, plan["timeouts"].get(name, self.timeout))
+                    if probe["latency"] is not None:
+                        ok = probe["status"] not in ("timeout", "error")
+                        samples.append((name, probe["latency"], ok))
+                        failures[name] = 0 if ok else failures[name] + 1
+                        if trip_after[name] and failures[name] >= trip_after[name]:
+                            open_sites.add(name)
+            if on_result:
+                on_result(probe)
+            return probe
+
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(headers={"User-Agent": USER_AGENT}, limits=limits, timeout=self.timeout) as client:
+            # Ordem site -> alvos: requisições do mesmo site reaproveitam a conexão keep-alive
+            tasks = [
+                asyncio.create_task(run_one(client, name, info, username))
+                for name, info in sites.items()
+                for username in usernames
+            ]
+            try:
+                return await asyncio.gather(*tasks)
+            finally:
+                for t in tasks:
+                    t.cancel()
+                if self.health:
+                    await self.health.record(samples)
+
+
+# Instância única compartilhada pelas rotas
+site_prober = SiteProber(health=default_site_health)
@@ -0,0 +1,205 @@
+"""
+Scan em camadas do Maigret usando os metadados de site (alexaRank / tags).
+
+- Camada rápida: só os top-N sites por ranking (--top-sites), opcionalmente filtrados por
+  tag (--tags br,social), com timeout curto. Responde em poucos segundos.
+- Camada profunda: cauda longa em background (só os sites além do top-N da camada rápida), na
+  faixa MAIGRET_DEEP_LANE do tool_runner: não ocupa a vaga do Maigret interativo (camadas
+  rápidas, /analyze/maigret, full_scan). Os hits entram no mesmo conjunto de resultados.
+O estado (camadas, latências, resultados mesclados) fica numa tabela própria no SQLite do
+cache (fora do LRU do scan_cache, que poderia despejá-lo no meio da camada profunda), então
+qualquer worker do uvicorn responde o polling. Um scan em andamento para o mesmo
+(username, opções) não é repetido: o POST seguinte recebe o estado atual.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from app.services.scan_cache import OSINT_CACHE_DB, cache_key
+
+MAIGRET_FAST_TOP = int(os.getenv("MAIGRET_FAST_TOP", "100"))
+MAIGRET_FAST_TIMEOUT = int(os.getenv("MAIGRET_FAST_TIMEOUT", "8"))      # timeout por site
+MAIGRET_FAST_DEADLINE = float(os.getenv("MAIGRET_FAST_DEADLINE", "20"))  # prazo da camada
+MAIGRET_DEEP_TOP = int(os.getenv("MAIGRET_DEEP_TOP", "3000"))
+MAIGRET_DEEP_TIMEOUT = int(os.getenv("MAIGRET_DEEP_TIMEOUT", "40"))
+MAIGRET_DEEP_DEADLINE = float(os.getenv("MAIGRET_DEEP_DEADLINE", "600"))
+MAIGRET_DEEP_LANE = os.getenv("MAIGRET_DEEP_LANE", "maigret_deep")
+MAIGRET_TIER_TTL = int(os.getenv("MAIGRET_TIER_TTL", str(24 * 3600)))  # estados guardados para o polling
+
+TIER_STORE = "maigret_tiered"
+
+# Referências das tarefas em background (evita coleta pelo GC no meio do scan)
+_background = set()
+
+RUNNING = ("fast_running", "deep_running")
+
+
+class TierStore:
+    """Estado dos scans em camadas por (username, opções); busy_until = até quando a execução vale."""
+
+    def __init__(self, path: str = OSINT_CACHE_DB, ttl: int = MAIGRET_TIER_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._ready = False
+
+    @contextmanager
+    def _db(self):
+        if not self._ready:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            if not self._ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS tiered_scans (
+                        key TEXT PRIMARY KEY,
+                        username TEXT,
+                        state TEXT,
+                        busy_until REAL,
+                        updated_at REAL
+                    )
+                """)
+                self._ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _get(self, key: str):
+        with self._db() as conn:
+            row = conn.execute("SELECT state, busy_until FROM tiered_scans WHERE key = ?", (key,)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else (None, 0)
+
+    def _put(self, key: str, username: str, state: dict, busy_until: float):
+        now = time.time()
+        with self._db() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tiered_scans(key, username, state, busy_until, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (key, username, json.dumps(state, default=str), busy_until, now),
+            )
+            conn.execute("DELETE FROM tiered_scans WHERE updated_at < ? AND busy_until < ?", (now - self.ttl, now))
+
+    def _claim(self, key: str, username: str, busy_until: float) -> tuple:
+        """(True, estado anterior | None) se este worker pode rodar; (False, estado atual) se já há um em andamento."""
+        with self._db() as conn:
+            conn.execute("BEGIN IMMEDIATE")  # atômico entre os workers do uvicorn
+            row = conn.execute("SELECT state, busy_until FROM tiered_scans WHERE key = ?", (key,)).fetchone()
+            previous = json.loads(row[0]) if row else None
+            if previous and previous.get("status") in RUNNING and row[1] > time.time():
+                return False, previous
+            claimed = {**(previous or {"username": username, "tiers": {}, "results": []}), "status": "fast_running",
+                       "updated_at": datetime.now().isoformat()}
+            conn.execute(
+                "INSERT OR REPLACE INTO tiered_scans(key, username, state, busy_until, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (key, username, json.dumps(claimed, default=str), busy_until, time.time()),
+            )
+        return True, previous
+
+    async def get(self, key: str) -> tuple:
+        return await asyncio.to_thread(self._get, key)
+
+    async def put(self, key: str, username: str, state: dict, busy_until: float = 0):
+        await asyncio.to_thread(self._put, key, username, state, busy_until)
+
+    async def claim(self, key: str, username: str, busy_until: float) -> tuple:
+        return await asyncio.to_thread(self._claim, key, username, busy_until)
+
+
+def tier_args(base_args: list, top: int, site_timeout: int, tags=None) -> list:
+    args = ["--timeout", str(site_timeout), *base_args, "--top-sites", str(top)]
+    if tags:
+        args += ["--tags", ",".join(tags)]
+    return args
+
+
+def parse_tags(raw: str) -> list:
+    return sorted({t.strip().lower() for t in (raw or "").split(",") if t.strip()})
+
+
+def merge_hits(current: list, new: list) -> list:
+    """Um hit por site; a camada mais nova completa o que faltava sem duplicar."""
+    merged = {h["site"].lower(): h for h in current if h.get("site")}
+    for hit in new:
+        if hit.get("site") and hit["site"].lower() not in merged:
+            merged[hit["site"].lower()] = hit
+    return sorted(merged.values(), key=lambda h: (h.get("rank") or 10**9, h["site"].lower()))
+
+
+def _options(tags, fast_top, deep_top) -> dict:
+    return {"tags": tags, "fast_top": fast_top, "deep_top": deep_top}
+
+
+def _key(username: str, options: dict) -> str:
+    return cache_key(TIER_STORE, username, options)
+
+
+async def get_state(username: str, tags: list, fast_top: int, deep_top: int):
+    state, busy_until = await tier_store.get(_key(username, _options(tags, fast_top, deep_top)))
+    if state and state["status"] in RUNNING and time.time() > busy_until:
+        # Processo reiniciou (ou o cliente caiu) no meio do scan: o estado nunca vai fechar
+        state["status"] = "deep_lost" if state["status"] == "deep_running" else "fast_lost"
+    return state
+
+
+async def start_tiered_scan(username: str, run_tier, base_args: list, tags=None,
+                            fast_top: int = MAIGRET_FAST_TOP, deep_top: int = MAIGRET_DEEP_TOP,
+                            deep: bool = True) -> dict:
+    """
+    run_tier(username, args, deadline, skip_top=0, lane=None) -> (results, timing) executa uma camada;
+    skip_top = sites do topo do ranking que a camada pula, lane = faixa de background.
+    Devolve o estado após a camada rápida; a profunda segue em background.
+    """
+    tags = tags or []
+    options = _options(tags, fast_top, deep_top)
+    key = _key(username, options)
+    claimed, current = await tier_store.claim(key, username, time.time() + MAIGRET_FAST_DEADLINE + 30)
+    if not claimed:
+        print(f"--> [MAIGRET TIERED] {username}: scan já em andamento ({current['status']}); devolvendo o estado atual")
+        return current
+    fast_results, fast_timing = await run_tier(
+        username, tier_args(base_args, fast_top, MAIGRET_FAST_TIMEOUT, tags), MAIGRET_FAST_DEADLINE
+    )
+    fast_hits = [h for h in fast_results if "site" in h]
+    state = {
+        "username": username,
+        "tags": tags,
+        "status": "deep_running" if deep else "done",
+        "tiers": {"fast": {"top_sites": fast_top, **fast_timing}},
+        "results": merge_hits([], fast_hits),
+        "updated_at": datetime.now().isoformat(),
+    }
+    if deep:
+        state["tiers"]["deep"] = {"top_sites": deep_top, "status": "running"}
+        state["deep_deadline_at"] = time.time() + MAIGRET_DEEP_DEADLINE
+    await tier_store.put(key, username, state, state["deep_deadline_at"] + 30 if deep else 0)
+
+    if deep:
+        async def deep_tier():
+            deep_results, deep_timing = await run_tier(
+                username, tier_args(base_args, deep_top, MAIGRET_DEEP_TIMEOUT, tags), MAIGRET_DEEP_DEADLINE,
+                skip_top=fast_top, lane=MAIGRET_DEEP_LANE
+            )
+            before = len(state["results"])
+            state["results"] = merge_hits(state["results"], [h for h in deep_results if "site" in h])
+            state["tiers"]["deep"] = {"top_sites": deep_top, "new_results": len(state["results"]) - before, **deep_timing}
+            state["status"] = "done" if deep_timing["status"] == "ok" else "deep_partial"
+            state["updated_at"] = datetime.now().isoformat()
+            await tier_store.put(key, username, state)
+            print(f"--> [MAIGRET TIERED] {username}: camada profunda {deep_timing['status']} "
+                  f"(+{state['tiers']['deep']['new_results']} perfis em {deep_timing['elapsed']}s)")
+
+        task = asyncio.create_task(deep_tier())
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+
+    return state
+
+
+# Instância única compartilhada pelas rotas
+tier_store = TierStore()
@@ -0,0 +1,181 @@
+"""
+Gravação e replay das saídas das ferramentas OSINT (benchmark do pipeline sem rede).
+
+Gravação (OSINT_RECORD_DIR): cada execução do ToolRunner vira uma "fita" JSON com as linhas
+do stdout e o instante de cada uma, o stderr, o código de saída e os arquivos gerados em -fo
+(relatório JSON do Maigret). Cada busca de dork grava as URLs e a latência.
+
+Replay (OSINT_REPLAY_DIR): o ToolRunner troca o comando por um processo falso
+(python tool_replay.py <fita> <alvo> ...) que reemite as linhas no ritmo gravado
+(OSINT_REPLAY_SPEED: 1 = tempo real, 2 = 2x mais rápido, 0 = sem espera) e recria os arquivos
+de saída. Com OSINT_REPLAY_ANY=1, um alvo sem fita usa a fita de outro alvo da mesma
+ferramenta (o nome do alvo é trocado na saída).
+Sem imports de app.*: o arquivo também roda como a ferramenta falsa.
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+OSINT_RECORD_DIR = os.getenv("OSINT_RECORD_DIR", "")
+OSINT_REPLAY_DIR = os.getenv("OSINT_REPLAY_DIR", "")
+OSINT_REPLAY_SPEED = float(os.getenv("OSINT_REPLAY_SPEED", "1"))
+OSINT_REPLAY_ANY = os.getenv("OSINT_REPLAY_ANY", "0") == "1"
+
+REPLAY_SCRIPT = os.path.abspath(__file__)
+TAPE_VERSION = 1
+
+
+def safe_name(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", text or "")[:80] or "_"
+
+
+def command_target(cmd: list):
+    """Alvo de um comando `python -m <ferramenta> <alvo> ...`."""
+    return cmd[3] if len(cmd) > 3 and cmd[1] == "-m" else None
+
+
+def _tape_path(folder: str, tool: str, target: str) -> str:
+    stamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
+    return os.path.join(folder, f"{safe_name(tool)}__{safe_name(target)}__{stamp}.json")
+
+
+def _write_tape(folder: str, tape: dict):
+    os.makedirs(folder, exist_ok=True)
+    path = _tape_path(folder, tape["tool"], tape["target"])
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(tape, f, ensure_ascii=False)
+    return path
+
+
+def find_tape(tool: str, target: str, folder: str = None, any_target: bool = None):
+    """Fita mais recente do alvo; sem ela (e com any_target) uma fita qualquer da ferramenta."""
+    folder = folder if folder is not None else OSINT_REPLAY_DIR
+    any_target = OSINT_REPLAY_ANY if any_target is None else any_target
+    exact = sorted(glob.glob(os.path.join(folder, f"{safe_name(tool)}__{safe_name(target)}__*.json")))
+    if exact:
+        return exact[-1]
+    if not any_target:
+        return None
+    candidates = sorted(glob.glob(os.path.join(folder, f"{safe_name(tool)}__*.json")))
+    if not candidates:
+        return None
+    # Escolha estável por alvo: o mesmo alvo sempre cai na mesma fita
+    index = int(hashlib.sha1((target or "").encode("utf-8")).hexdigest(), 16) % len(candidates)
+    return candidates[index]
+
+
+def replay_cmd(tape_path: str, cmd: list) -> list:
+    return [sys.executable, REPLAY_SCRIPT, tape_path, command_target(cmd) or "", *cmd[4:]]
+
+
+# ==========================================
+# GRAVAÇÃO
+# ==========================================
+
+class TapeRecorder:
+    """Grava uma execução do ToolRunner (linhas com instante relativo ao início)."""
+
+    def __init__(self, tool: str, cmd: list, folder: str = None):
+        self.tool = tool
+        self.cmd = cmd
+        self.folder = folder or OSINT_RECORD_DIR
+        self.lines = []
+        self.started = time.monotonic()
+
+    def wrap(self, on_line):
+        def recording(line):
+            self.lines.append([round(time.monotonic() - self.started, 4), line])
+            if on_line:
+                on_line(line)
+        return recording
+
+    def save(self, result: dict):
+        if result.get("status") not in ("ok", "error"):
+            return None  # timeout/cancelado: fita incompleta não serve para replay
+        files = {}
+        if "-fo" in self.cmd:
+            out_dir = self.cmd[self.cmd.index("-fo") + 1]
+            for path in glob.glob(os.path.join(out_dir, "*")):
+                if os.path.isfile(path):
+                    with open(path, encoding="utf-8", errors="replace") as f:
+                        files[os.path.basename(path)] = f.read()
+        tape = {
+            "version": TAPE_VERSION,
+            "tool": self.tool,
+            "target": command_target(self.cmd),
+            "argv": self.cmd[1:],
+            "recorded_at": datetime.now().isoformat(),
+            "returncode": result.get("returncode"),
+            "wall_time": result.get("wall_time"),
+            "lines": self.lines,
+            "stderr": result.get("stderr", ""),
+            "files": files,
+        }
+        return _write_tape(self.folder, tape)
+
+
+def record_dork(dork: str, urls: list, latency: float, folder: str = None):
+    _write_tape(folder or OSINT_RECORD_DIR, {
+        "version": TAPE_VERSION,
+        "tool": "dork",
+        "target": dork,
+        "recorded_at": datetime.now().isoformat(),
+        "latency": round(latency, 4),
+        "urls": urls,
+    })
+
+
+def load_dork_tape(dork: str, folder: str = None):
+    path = find_tape("dork", dork, folder)
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ==========================================
+# REPLAY (ferramenta falsa)
+# ==========================================
+
+def replay_main(argv: list) -> int:
+    tape_path, target, rest = argv[0], argv[1], argv[2:]
+    with open(tape_path, encoding="utf-8") as f:
+        tape = json.load(f)
+    recorded = tape.get("target") or ""
+    speed = OSINT_REPLAY_SPEED
+
+    def swap(text: str) -> str:
+        return text.replace(recorded, target) if recorded and target and recorded != target else text
+
+    started = time.monotonic()
+
+    def wait_until(offset: float):
+        if speed > 0:
+            delay = started + offset / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    for offset, text in tape.get("lines", []):
+        wait_until(offset)
+        sys.stdout.write(swap(text) + "\n")
+        sys.stdout.flush()
+
+    if "-fo" in rest:
+        out_dir = rest[rest.index("-fo") + 1]
+        os.makedirs(out_dir, exist_ok=True)
+        for name, content in tape.get("files", {}).items():
+            with open(os.path.join(out_dir, swap(name)), "w", encoding="utf-8") as f:
+                f.write(swap(content))
+
+    wait_until(tape.get("wall_time") or 0)
+    sys.stderr.write(swap(tape.get("stderr", "")))
+    return tape.get("returncode") or 0
+
+
+if __name__ == "__main__":
+    sys.exit(replay_main(sys.argv[1:]))
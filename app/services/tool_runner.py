@@ -0,0 +1,397 @@
+"""
+Motor assíncrono de execução das ferramentas OSINT (Sherlock, Maigret, Holehe).
+
+Substitui o antigo subprocess.run dentro de asyncio.to_thread: cada ferramenta roda
+via asyncio.create_subprocess_exec, sem prender threads do executor padrão.
+- Limite global de execuções simultâneas + limite por ferramenta
+- Leitura do stdout linha a linha (callback on_line)
+- Timeout ou cancelamento (cliente desconectou) mata o grupo de processos inteiro
+- Cada execução devolve tempo de parede e código de saída
+- Comandos `python -m <ferramenta>` são atendidos pelo pool de workers quentes, se ativo
+- Sandbox (tool_sandbox.py): rlimits de memória/CPU/arquivos, pico de RSS e CPU por execução
+- Controle de admissão: execução só começa se a memória projetada couber no orçamento
+- Faixas (lane): execuções longas em background (camada profunda do Maigret) têm semáforo
+  próprio e baixa prioridade na memória, para não segurar as execuções interativas da ferramenta
+- Gravação/replay das saídas para benchmark sem rede (tool_replay.py)
+"""
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from app.services.tool_replay import OSINT_RECORD_DIR, OSINT_REPLAY_DIR, TapeRecorder, command_target, find_tape, replay_cmd
+from app.services.tool_sandbox import parse_rusage, sandboxed_cmd
+from app.services.tool_workers import OSINT_WARM_WORKERS, WarmWorkerPool, WorkerUnavailable
+
+IS_WINDOWS = sys.platform.startswith("win")
+
+# Configuração via ambiente (mesmo padrão do app/database.py)
+OSINT_MAX_CONCURRENCY = int(os.getenv("OSINT_MAX_CONCURRENCY", "4"))
+OSINT_TOOL_LIMITS = os.getenv("OSINT_TOOL_LIMITS", "sherlock=2,maigret=1,holehe=2,maigret_deep=1")
+
+# Orçamento de memória das ferramentas (MB, 0 = sem controle) e projeção inicial por ferramenta;
+# depois da primeira medição vale o maior pico de RSS recente da ferramenta
+OSINT_MEMORY_BUDGET_MB = int(os.getenv("OSINT_MEMORY_BUDGET_MB", "1024"))
+OSINT_TOOL_MEMORY = os.getenv("OSINT_TOOL_MEMORY", "sherlock=200,maigret=600,holehe=150")
+OSINT_ADMISSION_TIMEOUT = float(os.getenv("OSINT_ADMISSION_TIMEOUT", "30"))
+DEFAULT_TOOL_MEMORY = 300
+
+# Linhas do Maigret/Sherlock podem ser enormes (JSON, banners)
+STREAM_LIMIT = 1024 * 1024
+
+# Intervalo com que o fallback síncrono confere timeout/cancelamento
+CANCEL_POLL = 0.5
+
+
+def parse_tool_limits(raw: str) -> dict:
+    """Converte 'sherlock=2,maigret=1' em {'sherlock': 2, 'maigret': 1}."""
+    limits = {}
+    for part in (raw or "").split(","):
+        if "=" not in part:
+            continue
+        name, value = part.split("=", 1)
+        try:
+            limits[name.strip().lower()] = max(1, int(value))
+        except ValueError:
+            print(f"[AVISO] Limite inválido ignorado em OSINT_TOOL_LIMITS: {part}")
+    return limits
+
+
+def kill_process_group(proc):
+    """Mata o processo e todos os filhos (o grupo criado com start_new_session)."""
+    if proc.returncode is not None:
+        return
+    try:
+        if IS_WINDOWS:
+            proc.kill()
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_tool_sync(cmd_list, timeout=90, cancel_event=None):
+    """
+    Execução síncrona (fallback para o loop Selector do Windows, que não suporta subprocessos).
+    cancel_event (threading.Event) setado: mata o processo e libera a thread em até CANCEL_POLL.
+    """
+    try:
+        # encoding latin-1 evita erro de caractere estranho no console
+        proc = subprocess.Popen(
+            cmd_list,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="latin-1",
+            errors="ignore",
+            start_new_session=not IS_WINDOWS,
+        )
+    except Exception as e:
+        return None, "", str(e), False
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            stdout, stderr = proc.communicate(timeout=CANCEL_POLL)
+            return proc.returncode, stdout, stderr, False
+        except subprocess.TimeoutExpired:
+            cancelled = cancel_event is not None and cancel_event.is_set()
+            if not cancelled and time.monotonic() < deadline:
+                continue
+            kill_process_group(proc)
+            proc.communicate()
+            if cancelled:
+                return None, "", "Execução cancelada.", False
+            return None, "", "Timeout excedido na execução da ferramenta.", True
+
+
+class MemoryBudget:
+    """Reserva a memória projetada de cada execução; quem não cabe espera na fila ou é recusado."""
+
+    def __init__(self, budget_mb: int = OSINT_MEMORY_BUDGET_MB, timeout: float = OSINT_ADMISSION_TIMEOUT):
+        self.budget_mb = budget_mb
+        self.timeout = timeout
+        self.reserved = 0.0
+        self.background = 0.0  # parte de `reserved` que é de execuções em background
+        self.rejected = 0
+        self._changed = asyncio.Event()
+
+    def _fits(self, amount: float, background: bool) -> bool:
+        # Execução interativa não espera pelas de background (prioridade sobre o orçamento)
+        reserved = self.reserved if background else self.reserved - self.background
+        # Sozinha a execução sempre entra (senão uma projeção acima do orçamento travaria para sempre)
+        return self.budget_mb <= 0 or reserved == 0 or reserved + amount <= self.budget_mb
+
+    async def admit(self, amount: float, background: bool = False) -> bool:
+        deadline = time.monotonic() + self.timeout
+        while not self._fits(amount, background):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.rejected += 1
+                return False
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+        self.reserved += amount
+        if background:
+            self.background += amount
+        return True
+
+    def release(self, amount: float, background: bool = False):
+        self.reserved = max(0.0, self.reserved - amount)
+        if background:
+            self.background = max(0.0, self.background - amount)
+        self._changed.set()
+
+
+class ToolRunner:
+    def __init__(self, max_concurrency: int = OSINT_MAX_CONCURRENCY, tool_limits: dict = None, history_size: int = 50, pool=None,
+                 memory: MemoryBudget = None, tool_memory: dict = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.tool_limits = tool_limits if tool_limits is not None else parse_tool_limits(OSINT_TOOL_LIMITS)
+        # Pool de workers quentes (app/services/tool_workers.py); None = sempre processo frio
+        self.pool = pool
+        self._global = asyncio.Semaphore(self.max_concurrency)
+        self._per_tool = {}
+        self.active = {}
+        self.cancelled = 0
+        self.history = deque(maxlen=history_size)
+        self.memory = memory or MemoryBudget()
+        self.tool_memory = tool_memory if tool_memory is not None else parse_tool_limits(OSINT_TOOL_MEMORY)
+        self._peaks = {}
+
+    def projected_memory(self, tool: str) -> float:
+        peaks = self._peaks.get(tool)
+        if peaks:
+            return max(peaks)
+        return self.tool_memory.get(tool, DEFAULT_TOOL_MEMORY)
+
+    def _tool_semaphore(self, tool: str):
+        if tool not in self._per_tool:
+            limit = min(self.tool_limits.get(tool, self.max_concurrency), self.max_concurrency)
+            self._per_tool[tool] = asyncio.Semaphore(limit)
+        return self._per_tool[tool]
+
+    async def run(self, tool: str, cmd: list, timeout: float = 90, on_line=None, keep_output: bool = True,
+                  lane: str = None) -> dict:
+        """
+        Executa a ferramenta respeitando os limites de concorrência.
+        on_line(line) é chamado para cada linha do stdout assim que ela chega.
+        keep_output=False descarta o stdout bruto (memória constante em saídas enormes).
+        lane (ex.: 'maigret_deep') = execução em background: espera no semáforo da faixa, não no
+        da ferramenta, e cede a vez no orçamento de memória às execuções interativas.
+        Retorna dict com stdout, stderr, returncode, status ('ok' | 'timeout' | 'error'),
+        wall_time (execução) e queued_time (espera por vaga).
+        Cancelamento da task (cliente desconectou): o processo morre, a vaga é liberada e a
+        execução entra no histórico como 'cancelled'.
+        """
+        tool = tool.lower()
+        lane = lane.lower() if lane else None
+        enqueued = time.monotonic()
+        started_at = datetime.now().isoformat()
+        queued_time = None
+        if OSINT_REPLAY_DIR:
+            tape = find_tape(tool, command_target(cmd))
+            if not tape:
+                return self._not_run(tool, "error", started_at, enqueued,
+                                     f"Sem fita de replay para {tool} ({command_target(cmd)}) em {OSINT_REPLAY_DIR}.")
+            cmd = replay_cmd(tape, cmd)
+        projected = self.projected_memory(tool)
+        if not await self.memory.admit(projected, background=bool(lane)):
+            print(f"--> [{tool.upper()}] recusado: projeção de {projected:.0f} MB não cabe no orçamento")
+            return self._not_run(tool, "rejected", started_at, enqueued,
+                                 f"Orçamento de memória esgotado ({self.memory.reserved:.0f}/{self.memory.budget_mb} MB reservados).")
+        try:
+            async with self._global, self._tool_semaphore(lane or tool):
+                queued_time = time.monotonic() - enqueued
+                self.active[tool] = self.active.get(tool, 0) + 1
+                recorder = TapeRecorder(tool, cmd) if OSINT_RECORD_DIR and not OSINT_REPLAY_DIR else None
+                if recorder:
+                    on_line = recorder.wrap(on_line)
+                try:
+                    result = await self._execute(tool, cmd, timeout, on_line, keep_output)
+                finally:
+                    self.active[tool] -= 1
+                if recorder:
+                    await asyncio.to_thread(recorder.save, result)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            waited = queued_time if queued_time is not None else time.monotonic() - enqueued
+            self.history.append({
+                "tool": tool,
+                "started_at": started_at,
+                "returncode": None,
+                "status": "cancelled",
+                "wall_time": round(time.monotonic() - enqueued - waited, 3),
+                "queued_time": round(waited, 3),
+            })
+            print(f"--> [{tool.upper()}] cancelado; processo encerrado e vaga liberada")
+            raise
+        finally:
+            self.memory.release(projected, background=bool(lane))
+
+        if result["status"] == "ok" and "MemoryError" in (result.get("stderr") or ""):
+            result["status"] = "error"
+            result["stderr"] += "\nLimite de memória (OSINT_RLIMIT_AS_MB) excedido."
+        if result.get("peak_rss_mb"):
+            self._peaks.setdefault(tool, deque(maxlen=10)).append(result["peak_rss_mb"])
+        result["queued_time"] = round(queued_time, 3)
+        self.history.append({k: v for k, v in result.items() if k not in ("stdout", "stderr")})
+        usage = f" rss={result['peak_rss_mb']}MB cpu={result['cpu_time']}s" if result.get("peak_rss_mb") else ""
+        print(f"--> [{tool.upper()}] status={result['status']} exit={result['returncode']} em {result['wall_time']}s{usage}")
+        return result
+
+    def _not_run(self, tool: str, status: str, started_at: str, enqueued: float, message: str) -> dict:
+        """Resultado de uma execução que nem chegou a subir processo (recusada / sem fita)."""
+        result = {
+            "tool": tool,
+            "started_at": started_at,
+            "returncode": None,
+            "status": status,
+            "wall_time": 0.0,
+            "queued_time": round(time.monotonic() - enqueued, 3),
+            "stdout": "",
+            "stderr": message,
+        }
+        self.history.append({k: v for k, v in result.items() if k not in ("stdout", "stderr")})
+        return result
+
+    async def _execute(self, tool, cmd, timeout, on_line, keep_output=True) -> dict:
+        print(f"[DEBUG COMANDO] {' '.join(cmd)}")
+        started = time.monotonic()
+        result = {
+            "tool": tool,
+            "started_at": datetime.now().isoformat(),
+            "returncode": None,
+            "status": "ok",
+            "wall_time": 0.0,
+            "stdout": "",
+            "stderr": "",
+        }
+
+        if self.pool and self.pool.handles(cmd):
+            try:
+                return await self.pool.execute(cmd, timeout, on_line, keep_output, result, started)
+            except WorkerUnavailable as e:
+                print(f"[WARM POOL] {e}. Usando processo frio.")
+
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *sandboxed_cmd(cmd),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=STREAM_LIMIT,
+                start_new_session=not IS_WINDOWS,
+            )
+        except NotImplementedError:
+            # WindowsSelectorEventLoopPolicy (ver main.py) não implementa subprocessos
+            return await self._execute_in_thread(result, cmd, timeout, on_line, started)
+        except Exception as e:
+            result.update(status="error", stderr=str(e), wall_time=round(time.monotonic() - started, 3))
+            return result
+
+        out_lines = []
+        err_chunks = []
+
+        async def read_stdout():
+            while True:
+                raw = await proc.stdout.readline()
+                if not raw:
+                    break
+                line = raw.decode("latin-1")
+                if keep_output:
+                    out_lines.append(line)
+                if on_line:
+                    try:
+                        on_line(line.rstrip("\r\n"))
+                    except Exception as e:
+                        print(f"[{tool.upper()} PARSER] Linha ignorada: {e}")
+
+        async def read_stderr():
+            err_chunks.append(await proc.stderr.read())
+
+        gathered = asyncio.gather(read_stdout(), read_stderr(), proc.wait())
+        # Em cancelamento o gather termina com CancelledError: marca como consumido
+        gathered.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            await asyncio.wait_for(gathered, timeout)
+        except asyncio.TimeoutError:
+            kill_process_group(proc)
+            await proc.wait()
+            result["status"] = "timeout"
+            err_chunks.append(b"Timeout excedido na execucao da ferramenta.")
+        except BaseException:
+            # Cancelamento (cliente desconectou, orçamento estourado): não deixa processo órfão.
+            # SIGKILL é imediato; espera o reap antes de liberar a vaga.
+            kill_process_group(proc)
+            try:
+                await asyncio.wait_for(proc.wait(), 5)
+            except BaseException:
+                pass
+            raise
+
+        result["returncode"] = proc.returncode
+        result["stdout"] = "".join(out_lines)
+        result["stderr"], usage = parse_rusage(b"".join(err_chunks).decode("latin-1"))
+        if usage:
+            result["peak_rss_mb"] = usage["peak_rss_mb"]
+            result["cpu_time"] = usage["cpu_time"]
+            if usage["signal"] == "SIGXCPU":
+                result["status"] = "error"
+                result["stderr"] += "\nLimite de CPU (OSINT_RLIMIT_CPU) excedido."
+        result["wall_time"] = round(time.monotonic() - started, 3)
+        return result
+
+    async def _execute_in_thread(self, result, cmd, timeout, on_line, started) -> dict:
+        cancel_event = threading.Event()
+        try:
+            returncode, stdout, stderr, timed_out = await asyncio.to_thread(run_tool_sync, cmd, timeout, cancel_event)
+        except asyncio.CancelledError:
+            # A thread não é interrompível: sinaliza e ela mata o processo no próximo poll
+            cancel_event.set()
+            raise
+        if on_line:
+            for line in stdout.splitlines():
+                try:
+                    on_line(line)
+                except Exception as e:
+                    print(f"[{result['tool'].upper()} PARSER] Linha ignorada: {e}")
+        result.update(
+            returncode=returncode,
+            stdout=stdout,
+            stderr=stderr,
+            status="timeout" if timed_out else ("error" if returncode is None else "ok"),
+            wall_time=round(time.monotonic() - started, 3),
+        )
+        return result
+
+    def snapshot(self) -> dict:
+        """Estado atual do motor (para a rota de status)."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "tool_limits": self.tool_limits,
+            "active": {k: v for k, v in self.active.items() if v},
+            "cancelled": self.cancelled,
+            "memory": {
+                "budget_mb": self.memory.budget_mb,
+                "reserved_mb": round(self.memory.reserved, 1),
+                "background_mb": round(self.memory.background, 1),
+                "rejected": self.memory.rejected,
+                "projected_mb": {t: self.projected_memory(t) for t in set(self.tool_memory) | set(self._peaks)},
+            },
+            "warm_pool": self.pool.snapshot() if self.pool else None,
+            "recent_runs": list(self.history),
+        }
+
+
+# Instância única compartilhada pelas rotas
+tool_runner = ToolRunner(pool=WarmWorkerPool() if OSINT_WARM_WORKERS else None)
@@ -0,0 +1,143 @@
+"""
+Sandbox de recursos dos processos das ferramentas OSINT (Sherlock, Maigret, Holehe).
+
+- rlimits configuráveis: espaço de endereçamento (RLIMIT_AS), segundos de CPU (RLIMIT_CPU)
+  e arquivos abertos (RLIMIT_NOFILE); a ferramenta roda no próprio grupo de processos
+- Pico de RSS e tempo de CPU medidos por execução (wait4 do filho)
+
+Também roda como script lançador:  python tool_sandbox.py <comando...>
+aplica os limites, executa o comando como filho (stdout/stderr herdados) e, ao final,
+escreve uma linha RUSAGE_MARKER + JSON no stderr com as medições.
+Sem imports de app.*: o arquivo roda como script e é importado pelo worker quente.
+"""
+import json
+import os
+import signal
+import subprocess
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows: sem rlimits, a ferramenta roda direto
+    resource = None
+
+OSINT_SANDBOX = os.getenv("OSINT_SANDBOX", "1") == "1"
+OSINT_RLIMIT_AS_MB = int(os.getenv("OSINT_RLIMIT_AS_MB", "1536"))
+OSINT_RLIMIT_CPU = int(os.getenv("OSINT_RLIMIT_CPU", "120"))
+OSINT_RLIMIT_NOFILE = int(os.getenv("OSINT_RLIMIT_NOFILE", "1024"))
+
+SANDBOX_SCRIPT = os.path.abspath(__file__)
+SANDBOX_ENABLED = OSINT_SANDBOX and resource is not None
+RUSAGE_MARKER = "__OSINT_RUSAGE__ "
+
+
+def _set_soft_limit(kind, value: int):
+    """Ajusta só o soft limit (nunca acima do hard atual). value <= 0 = não mexe."""
+    if value <= 0:
+        return
+    soft, hard = resource.getrlimit(kind)
+    if hard != resource.RLIM_INFINITY:
+        value = min(value, hard)
+    resource.setrlimit(kind, (value, hard))
+
+
+def apply_rlimits(address_space_mb: int = OSINT_RLIMIT_AS_MB, cpu_seconds: int = OSINT_RLIMIT_CPU,
+                  open_files: int = OSINT_RLIMIT_NOFILE):
+    """Aplica os limites ao processo atual (herdados pelos filhos). 0 = sem limite."""
+    if resource is None:
+        return
+    _set_soft_limit(resource.RLIMIT_AS, address_space_mb * 1024 * 1024)
+    _set_soft_limit(resource.RLIMIT_CPU, cpu_seconds)
+    _set_soft_limit(resource.RLIMIT_NOFILE, open_files)
+
+
+def cpu_time_self() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def limit_cpu_from_now(seconds: int = OSINT_RLIMIT_CPU):
+    """Worker quente: o RLIMIT_CPU é cumulativo, então o teto é recalculado a cada job."""
+    if resource is None or seconds <= 0:
+        return
+    _set_soft_limit(resource.RLIMIT_CPU, int(cpu_time_self() + seconds) + 1)
+
+
+def reset_peak_rss():
+    """Zera o VmHWM do processo (Linux >= 4.0) para medir o pico de um único job."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return round(maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def sandboxed_cmd(cmd: list) -> list:
+    return [sys.executable, SANDBOX_SCRIPT, *cmd] if SANDBOX_ENABLED else list(cmd)
+
+
+def parse_rusage(stderr: str) -> tuple:
+    """Separa a linha de medição do lançador do stderr da ferramenta -> (stderr, medição|None)."""
+    pos = stderr.rfind(RUSAGE_MARKER)
+    if pos == -1:
+        return stderr, None
+    line_end = stderr.find("\n", pos)
+    raw = stderr[pos + len(RUSAGE_MARKER): line_end if line_end != -1 else None]
+    try:
+        usage = json.loads(raw)
+    except ValueError:
+        return stderr, None
+    return stderr[:pos].rstrip("\n"), usage
+
+
+def _signal_name(signum: int) -> str:
+    try:
+        return signal.Signals(signum).name
+    except ValueError:
+        return f"SIG{signum}"
+
+
+def launcher_main(cmd: list) -> int:
+    apply_rlimits()
+    try:
+        proc = subprocess.Popen(cmd)
+    except OSError as e:
+        print(f"[SANDBOX] Falha ao iniciar {cmd[0]}: {e}", file=sys.stderr)
+        return 127
+
+    while True:
+        try:
+            _, status, usage = os.wait4(proc.pid, 0)
+            break
+        except InterruptedError:
+            continue
+    code = os.waitstatus_to_exitcode(status)
+    proc.returncode = code  # já reapado pelo wait4
+
+    report = {
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),
+        "cpu_time": round(usage.ru_utime + usage.ru_stime, 3),
+        "signal": _signal_name(-code) if code < 0 else None,
+    }
+    sys.stderr.write("\n" + RUSAGE_MARKER + json.dumps(report) + "\n")
+    sys.stderr.flush()
+    return 128 - code if code < 0 else code
+
+
+if __name__ == "__main__":
+    sys.exit(launcher_main(sys.argv[1:]))
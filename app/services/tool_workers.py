@@ -0,0 +1,369 @@
+"""
+Pool de workers "quentes" para Sherlock, Maigret e Holehe.
+
+Em vez de `python -m <ferramenta>` a cada scan (startup do interpretador + imports +
+recarga da base de sites), cada worker é um processo de longa duração que:
+- importa a ferramenta uma única vez
+- memoriza o manifesto de sites (SitesInformation / MaigretDatabase) em memória
+- recebe jobs pelo stdin (JSON por linha) e devolve a saída da ferramenta linha a linha
+
+Protocolo (uma mensagem JSON por linha):
+  pai -> worker : {"argv": [...]}
+  worker -> pai : {"type": "ready"} | {"type": "line", "text": ...} |
+                  {"type": "done", "returncode": N, "stderr": ..., "peak_rss_mb": ..., "cpu_time": ...}
+
+O worker é reciclado após OSINT_WORKER_MAX_JOBS jobs e morto (grupo inteiro) em timeout.
+Limites de memória/arquivos valem para o worker inteiro; o de CPU é renovado a cada job.
+"""
+import asyncio
+import copy
+import importlib
+import io
+import json
+import os
+import runpy
+import signal
+import sys
+import time
+import traceback
+
+try:
+    from app.services.tool_sandbox import (
+        SANDBOX_ENABLED, apply_rlimits, cpu_time_self, limit_cpu_from_now, peak_rss_mb, reset_peak_rss
+    )
+except ImportError:  # rodando como script do worker (sem o pacote app no path)
+    from tool_sandbox import (
+        SANDBOX_ENABLED, apply_rlimits, cpu_time_self, limit_cpu_from_now, peak_rss_mb, reset_peak_rss
+    )
+
+IS_WINDOWS = sys.platform.startswith("win")
+WORKER_SCRIPT = os.path.abspath(__file__)
+
+OSINT_WARM_WORKERS = os.getenv("OSINT_WARM_WORKERS", "1") == "1"
+OSINT_WORKER_MAX_JOBS = int(os.getenv("OSINT_WORKER_MAX_JOBS", "25"))
+OSINT_WORKER_STARTUP_TIMEOUT = float(os.getenv("OSINT_WORKER_STARTUP_TIMEOUT", "60"))
+
+# Módulos aquecidos no worker (o que seria importado pelo `python -m`)
+WARM_IMPORTS = {
+    "sherlock_project": ["sherlock_project.sherlock", "sherlock_project.sites"],
+    "maigret": ["maigret.maigret", "maigret.sites"],
+    "holehe": ["holehe.core"],
+}
+
+# Carga do manifesto de sites que vale manter em memória entre jobs
+MANIFEST_LOADERS = {
+    "sherlock_project": ("sherlock_project.sites", "SitesInformation", "__init__"),
+    "maigret": ("maigret.sites", "MaigretDatabase", "load_from_path"),
+}
+
+# Ferramenta cujo worker não subiu: espera 5 min antes de tentar de novo
+RETRY_FAILED_AFTER = 300
+
+
+class WorkerUnavailable(Exception):
+    """O worker não subiu; quem chamou deve usar o processo frio."""
+
+
+# ==========================================
+# LADO DO WORKER (processo filho)
+# ==========================================
+
+def _memoize_loader(cls, method_name):
+    """Guarda uma cópia do estado do objeto após a carga do manifesto e reaproveita nos próximos jobs."""
+    original = getattr(cls, method_name)
+    cache = {}
+
+    def wrapper(self, *args, **kwargs):
+        key = repr((args, sorted(kwargs.items())))
+        if key in cache:
+            self.__dict__.update(copy.deepcopy(cache[key]))
+            return None if method_name == "__init__" else self
+        result = original(self, *args, **kwargs)
+        cache[key] = copy.deepcopy(self.__dict__)
+        return result
+
+    setattr(cls, method_name, wrapper)
+
+
+def _warm_up(module: str) -> list:
+    warm = []
+    for name in WARM_IMPORTS.get(module, [module]):
+        importlib.import_module(name)
+        warm.append(name)
+    loader = MANIFEST_LOADERS.get(module)
+    if loader:
+        mod_name, cls_name, method = loader
+        try:
+            _memoize_loader(getattr(importlib.import_module(mod_name), cls_name), method)
+            warm.append(f"{cls_name}.{method}")
+        except Exception as e:
+            print(f"[WORKER {module}] Manifesto sem cache: {e}", file=sys.stderr)
+    return warm
+
+
+class _LineEmitter(io.TextIOBase):
+    """stdout falso: cada linha completa vira uma mensagem para o processo pai."""
+
+    def __init__(self, send):
+        self._send = send
+        self._buffer = ""
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self._buffer += text
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            self._send({"type": "line", "text": line})
+        return len(text)
+
+    def flush_tail(self):
+        if self._buffer:
+            self._send({"type": "line", "text": self._buffer})
+            self._buffer = ""
+
+
+def _run_job(module: str, argv: list, send) -> tuple:
+    emitter = _LineEmitter(send)
+    err = io.StringIO()
+    old_argv, old_out, old_err = sys.argv, sys.stdout, sys.stderr
+    sys.argv = [module] + list(argv)
+    sys.stdout, sys.stderr = emitter, err
+    returncode = 0
+    try:
+        runpy.run_module(module, run_name="__main__", alter_sys=False)
+    except SystemExit as e:
+        returncode = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:
+        returncode = 1
+        err.write(traceback.format_exc())
+    finally:
+        emitter.flush_tail()
+        sys.argv, sys.stdout, sys.stderr = old_argv, old_out, old_err
+    return returncode, err.getvalue()
+
+
+def worker_main(module: str) -> int:
+    # O canal do protocolo é uma cópia do fd 1; qualquer escrita direta no fd 1 vai para o stderr
+    proto = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    os.dup2(2, 1)
+
+    def send(frame):
+        proto.write(json.dumps(frame, ensure_ascii=False) + "\n")
+        proto.flush()
+
+    try:
+        warm = _warm_up(module)
+    except Exception as e:
+        send({"type": "error", "error": f"{type(e).__name__}: {e}"})
+        return 1
+    send({"type": "ready", "module": module, "warm": warm})
+
+    for raw in sys.stdin:
+        if not raw.strip():
+            continue
+        job = json.loads(raw)
+        usage = {}
+        if SANDBOX_ENABLED:
+            limit_cpu_from_now()
+            reset_peak_rss()
+            cpu_before = cpu_time_self()
+        returncode, stderr = _run_job(module, job.get("argv", []), send)
+        if SANDBOX_ENABLED:
+            usage = {"peak_rss_mb": peak_rss_mb(), "cpu_time": round(cpu_time_self() - cpu_before, 3)}
+        send({"type": "done", "returncode": returncode, "stderr": stderr[-4000:], **usage})
+    return 0
+
+
+# ==========================================
+# LADO DO SERVIDOR (pool assíncrono)
+# ==========================================
+
+class WarmWorker:
+    def __init__(self, module: str, proc):
+        self.module = module
+        self.proc = proc
+        self.jobs = 0
+        self.warm = []
+        self.closed = False
+
+    @property
+    def alive(self) -> bool:
+        return not self.closed and self.proc.returncode is None
+
+    async def read_frame(self) -> dict:
+        raw = await self.proc.stdout.readline()
+        if not raw:
+            return None
+        return json.loads(raw.decode("utf-8"))
+
+    def kill(self):
+        # Sem import de app.* aqui: este arquivo também roda como script do worker
+        self.closed = True
+        if self.proc.returncode is not None:
+            return
+        try:
+            if IS_WINDOWS:
+                self.proc.kill()
+            else:
+                os.killpg(self.proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+class WarmWorkerPool:
+    def __init__(self, modules=None, max_jobs: int = OSINT_WORKER_MAX_JOBS, startup_timeout: float = OSINT_WORKER_STARTUP_TIMEOUT):
+        self.modules = list(modules or WARM_IMPORTS.keys())
+        self.max_jobs = max(1, max_jobs)
+        self.startup_timeout = startup_timeout
+        self.idle = {m: [] for m in self.modules}
+        self.failed = {}
+        self.stats = {"spawned": 0, "recycled": 0, "killed": 0, "jobs": 0, "startup_failures": 0}
+
+    def handles(self, cmd: list) -> bool:
+        """Só atende comandos no formato [python, -m, <modulo>, ...] de um módulo conhecido."""
+        if len(cmd) < 3 or cmd[0] != sys.executable or cmd[1] != "-m" or cmd[2] not in self.idle:
+            return False
+        failed_at = self.failed.get(cmd[2])
+        return failed_at is None or time.monotonic() - failed_at > RETRY_FAILED_AFTER
+
+    async def _spawn(self, module: str) -> WarmWorker:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, WORKER_SCRIPT, module,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                limit=1024 * 1024,
+                start_new_session=not IS_WINDOWS,
+                # CPU fica de fora aqui: o worker renova o teto a cada job
+                preexec_fn=(lambda: apply_rlimits(cpu_seconds=0)) if SANDBOX_ENABLED else None,
+            )
+        except NotImplementedError:
+            raise WorkerUnavailable("loop atual não suporta subprocessos")
+
+        worker = WarmWorker(module, proc)
+        try:
+            frame = await asyncio.wait_for(worker.read_frame(), self.startup_timeout)
+        except (asyncio.TimeoutError, ValueError):
+            frame = None
+        if not frame or frame.get("type") != "ready":
+            worker.kill()
+            self.failed[module] = time.monotonic()
+            self.stats["startup_failures"] += 1
+            detail = frame.get("error") if frame else "sem resposta"
+            raise WorkerUnavailable(f"worker {module} não subiu ({detail})")
+
+        worker.warm = frame.get("warm", [])
+        self.failed.pop(module, None)
+        self.stats["spawned"] += 1
+        print(f"--> [WARM POOL] Worker {module} pronto (pid {proc.pid})")
+        return worker
+
+    async def _acquire(self, module: str) -> WarmWorker:
+        while self.idle[module]:
+            worker = self.idle[module].pop()
+            if worker.alive:
+                return worker
+        return await self._spawn(module)
+
+    def _release(self, worker: WarmWorker):
+        if not worker.alive:
+            return
+        if worker.jobs >= self.max_jobs:
+            # Reciclagem: fecha o stdin e o worker termina sozinho
+            worker.closed = True
+            worker.proc.stdin.close()
+            self.stats["recycled"] += 1
+            return
+        self.idle[worker.module].append(worker)
+
+    async def execute(self, cmd: list, timeout: float, on_line, keep_output: bool, result: dict, started: float) -> dict:
+        """Mesmo contrato de ToolRunner._execute, mas num worker quente."""
+        module, argv = cmd[2], cmd[3:]
+        worker = await self._acquire(module)
+        worker.jobs += 1
+        self.stats["jobs"] += 1
+        out_lines = []
+        done = None
+
+        async def read_until_done():
+            nonlocal done
+            while True:
+                frame = await worker.read_frame()
+                if frame is None:
+                    return
+                if frame.get("type") == "line":
+                    line = frame.get("text", "")
+                    if keep_output:
+                        out_lines.append(line + "\n")
+                    if on_line:
+                        try:
+                            on_line(line)
+                        except Exception as e:
+                            print(f"[{result['tool'].upper()} PARSER] Linha ignorada: {e}")
+                elif frame.get("type") == "done":
+                    done = frame
+                    return
+
+        try:
+            worker.proc.stdin.write((json.dumps({"argv": argv}) + "\n").encode("utf-8"))
+            await worker.proc.stdin.drain()
+            await asyncio.wait_for(read_until_done(), timeout)
+        except asyncio.TimeoutError:
+            worker.kill()
+            self.stats["killed"] += 1
+            result["status"] = "timeout"
+            result["stderr"] = "Timeout excedido na execução da ferramenta."
+        except BaseException:
+            worker.kill()
+            self.stats["killed"] += 1
+            raise
+
+        if result["status"] != "timeout":
+            if done is None:
+                # Worker morreu no meio do job
+                worker.kill()
+                result["status"] = "error"
+                result["stderr"] = "Worker encerrou durante a execução."
+            else:
+                result["returncode"] = done.get("returncode")
+                result["stderr"] = done.get("stderr", "")
+                if "peak_rss_mb" in done:
+                    result["peak_rss_mb"] = done["peak_rss_mb"]
+                    result["cpu_time"] = done["cpu_time"]
+        self._release(worker)
+
+        result["stdout"] = "".join(out_lines)
+        result["worker"] = "warm"
+        result["wall_time"] = round(time.monotonic() - started, 3)
+        return result
+
+    async def prewarm(self):
+        """Sobe um worker por ferramenta (chamado no startup, em background)."""
+        for module in self.modules:
+            try:
+                self.idle[module].append(await self._spawn(module))
+            except WorkerUnavailable as e:
+                print(f"[WARM POOL] {e}. Ferramenta seguirá em processo frio.")
+
+    async def close(self):
+        for workers in self.idle.values():
+            for worker in workers:
+                worker.kill()
+            workers.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            "max_jobs": self.max_jobs,
+            "idle": {m: len(w) for m, w in self.idle.items()},
+            "failed": list(self.failed),
+            **self.stats,
+        }
+
+
+if __name__ == "__main__":
+    # Evita que app/services sombreie pacotes das ferramentas
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(WORKER_SCRIPT):
+        sys.path.pop(0)
+    sys.exit(worker_main(sys.argv[1]))
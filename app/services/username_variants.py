@@ -0,0 +1,103 @@
+"""
+Gerador de variantes de username a partir do nome do alvo (PersonResult).
+
+"Gilcileide Souza Campos" -> gilcileidecampos, gilcileide.campos, gilcileide_campos,
+gcampos, gilcileidec, gsc, gilcileidecampos01 ...
+- Remove acentos e partículas (da, de, dos...)
+- Combina primeiro nome com cada sobrenome (último sobrenome primeiro), separadores, iniciais
+- Sufixos comuns com peso menor
+- Variantes ranqueadas por probabilidade e limitadas (OSINT_VARIANTS_MAX)
+"""
+import os
+import re
+import unicodedata
+
+from app.services.dorks import normalize_url
+
+OSINT_VARIANTS_MAX = int(os.getenv("OSINT_VARIANTS_MAX", "12"))
+
+PARTICLES = {"da", "de", "do", "das", "dos", "e", "di", "del", "van", "von"}
+SEPARATORS = ["", ".", "_"]
+COMMON_SUFFIXES = ["01", "1", "oficial", "br"]
+
+# Usernames muito curtos/longos são rejeitados pela maioria dos sites
+MIN_LEN, MAX_LEN = 3, 30
+
+
+def fold_accents(text: str) -> str:
+    normalized = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in normalized if not unicodedata.combining(c))
+
+
+def name_tokens(name: str) -> list:
+    clean = re.sub(r"[^a-z\s]", " ", fold_accents(name).lower())
+    return [t for t in clean.split() if t not in PARTICLES]
+
+
+def generate_variants(name: str, surnames=None, max_variants: int = OSINT_VARIANTS_MAX) -> list:
+    """Lista [{"username", "score"}] ordenada do mais provável para o menos provável."""
+    tokens = name_tokens(name)
+    if not tokens:
+        return []
+    first = tokens[0]
+    rest = [t for t in (name_tokens(" ".join(surnames)) if surnames else tokens[1:]) if t != first]
+
+    scores = {}
+
+    def add(candidate: str, score: float):
+        if MIN_LEN <= len(candidate) <= MAX_LEN and scores.get(candidate, -1) < score:
+            scores[candidate] = score
+
+    # Último sobrenome pesa mais (padrão brasileiro: nome + sobrenome paterno no fim)
+    ordered_surnames = list(reversed(rest))
+    for rank, last in enumerate(ordered_surnames):
+        weight = 1.0 - 0.15 * rank
+        for sep_rank, sep in enumerate(SEPARATORS):
+            add(f"{first}{sep}{last}", 100 * weight - 3 * sep_rank)
+            add(f"{last}{sep}{first}", 70 * weight - 3 * sep_rank)
+        add(f"{first[0]}{last}", 80 * weight)
+        add(f"{first}{last[0]}", 65 * weight)
+        for suffix_rank, suffix in enumerate(COMMON_SUFFIXES):
+            add(f"{first}{last}{suffix}", 60 * weight - 2 * suffix_rank)
+            add(f"{first}.{last}{suffix}", 55 * weight - 2 * suffix_rank)
+
+    if len(rest) >= 2:
+        # Nome completo e iniciais
+        add(first + "".join(rest), 60)
+        add(".".join([first] + rest), 55)
+        add(first[0] + "".join(t[0] for t in rest), 50)
+        add(first + "".join(t[0] for t in rest), 45)
+
+    add(first, 30 if rest else 90)
+
+    ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))
+    return [{"username": u, "score": round(s, 1)} for u, s in ranked[:max(1, max_variants)]]
+
+
+def variants_for_person(person, max_variants: int = OSINT_VARIANTS_MAX) -> list:
+    """Atalho para PersonResult (usa `surnames` quando o extrator já os separou)."""
+    return generate_variants(person.name, getattr(person, "surnames", None) or None, max_variants)
+
+
+def merge_profiles(probes: list) -> list:
+    """Junta os hits de todas as variantes: um item por site, URLs deduplicadas."""
+    by_site = {}
+    for p in probes:
+        if p.get("status") != "claimed":
+            continue
+        entry = by_site.setdefault(p["site"], {"tool": "Sherlock", "site": p["site"], "urls": [], "variants": [], "_seen": set()})
+        key = normalize_url(p["url"])
+        if key not in entry["_seen"]:
+            entry["_seen"].add(key)
+            entry["urls"].append(p["url"])
+        if p["username"] not in entry["variants"]:
+            entry["variants"].append(p["username"])
+
+    profiles = []
+    for entry in by_site.values():
+        entry.pop("_seen")
+        entry["url"] = entry["urls"][0]
+        profiles.append(entry)
+    # Sites confirmados por mais variantes primeiro
+    profiles.sort(key=lambda e: (-len(e["variants"]), e["site"].lower()))
+    return profiles
@@ -0,0 +1,144 @@
+"""
+Busca web (DuckDuckGo) assíncrona para o agente de inteligência dos casos.
+
+- Um único httpx.AsyncClient (pool de conexões keep-alive) para todas as buscas do processo
+- Resultado de cada consulta no cache de buscas (search_cache, app/services/scan_cache.py) com TTL próprio
+- Várias consultas de uma vez: em paralelo, sob token bucket + limite de concorrência,
+  resultado indexado pela consulta
+- Sem o pacote duckduckgo_search: a versão HTML do DuckDuckGo é lida com html.parser
+"""
+import asyncio
+import os
+from html.parser import HTMLParser
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+from app.services.dorks import TokenBucket
+from app.services.scan_cache import search_cache
+
+WEB_SEARCH_URL = os.getenv("WEB_SEARCH_URL", "https://html.duckduckgo.com/html/")
+WEB_SEARCH_REGION = os.getenv("WEB_SEARCH_REGION", "br-pt")
+WEB_SEARCH_CONCURRENCY = int(os.getenv("WEB_SEARCH_CONCURRENCY", "3"))
+WEB_SEARCH_RATE = float(os.getenv("WEB_SEARCH_RATE", "1.0"))  # buscas por segundo
+WEB_SEARCH_BURST = int(os.getenv("WEB_SEARCH_BURST", "2"))
+WEB_SEARCH_TIMEOUT = float(os.getenv("WEB_SEARCH_TIMEOUT", "15"))
+WEB_SEARCH_CACHE_TTL = int(os.getenv("WEB_SEARCH_CACHE_TTL", str(6 * 3600)))
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:129.0) Gecko/20100101 Firefox/129.0"
+
+
+def unwrap_link(href: str) -> str:
+    """Links do DuckDuckGo passam por //duckduckgo.com/l/?uddg=<url real>."""
+    if "uddg=" in href:
+        target = parse_qs(urlsplit(href).query).get("uddg")
+        if target:
+            return target[0]
+    return "https:" + href if href.startswith("//") else href
+
+
+class ResultParser(HTMLParser):
+    """Extrai título / link / snippet dos blocos de resultado (anúncios ficam de fora)."""
+
+    def __init__(self):
+        super().__init__()
+        self.results = []
+        self._field = None
+        self._ad = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+        if tag == "div" and "result" in classes:
+            self._ad = "result--ad" in classes
+        elif tag == "a" and "result__a" in classes and not self._ad:
+            self.results.append({"title": "", "link": unwrap_link(attrs.get("href") or ""), "snippet": ""})
+            self._field = "title"
+        elif "result__snippet" in classes and self.results and not self._ad:
+            self._field = "snippet"
+
+    def handle_endtag(self, tag):
+        if tag in ("a", "div", "td"):
+            self._field = None
+
+    def handle_data(self, data):
+        if self._field:
+            self.results[-1][self._field] += data
+
+
+def parse_results(html: str, limit: int) -> list:
+    parser = ResultParser()
+    parser.feed(html)
+    results = []
+    for r in parser.results:
+        if not r["link"]:
+            continue
+        results.append({"title": r["title"].strip(), "link": r["link"], "snippet": " ".join(r["snippet"].split())})
+        if len(results) >= limit:
+            break
+    return results
+
+
+def error_result(e: Exception) -> list:
+    return [{"title": "Erro na busca", "snippet": str(e), "link": "#"}]
+
+
+class WebSearch:
+    def __init__(self, concurrency: int = WEB_SEARCH_CONCURRENCY, rate: float = WEB_SEARCH_RATE,
+                 burst: int = WEB_SEARCH_BURST, timeout: float = WEB_SEARCH_TIMEOUT, region: str = WEB_SEARCH_REGION):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.region = region
+        self._bucket = TokenBucket(rate, burst)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+            self._client = httpx.AsyncClient(headers={"User-Agent": USER_AGENT}, limits=limits,
+                                             timeout=self.timeout, follow_redirects=True)
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _fetch(self, query: str, limit: int) -> list:
+        async with self._slots:
+            await self._bucket.acquire()
+            r = await self.client.post(WEB_SEARCH_URL, data={"q": query, "kl": self.region})
+        # 202 = página de "anomalia" (limite de taxa do DuckDuckGo), não é resultado vazio
+        if r.status_code == 202:
+            raise RuntimeError("DuckDuckGo limitou a taxa de buscas (HTTP 202).")
+        r.raise_for_status()
+        return parse_results(r.text, limit)
+
+    async def search(self, query: str, limit: int = 5, refresh: bool = False) -> list:
+        """Resultados [{title, link, snippet}] de uma consulta (cache primeiro)."""
+        results, _ = await search_cache.get_or_run(
+            "web_search", query, lambda: self._fetch(query, limit),
+            options={"limit": limit, "region": self.region}, ttl=WEB_SEARCH_CACHE_TTL,
+            refresh=refresh, should_cache=bool,
+        )
+        return results
+
+    async def search_many(self, queries: list, limit: int = 5, refresh: bool = False) -> dict:
+        """Várias consultas em paralelo (sob o rate limit) -> {consulta: resultados}."""
+        unique = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+        found = await asyncio.gather(*[self.search(q, limit, refresh) for q in unique], return_exceptions=True)
+        results = {}
+        for query, value in zip(unique, found):
+            if isinstance(value, BaseException):
+                if not isinstance(value, Exception):
+                    raise value
+                print(f"Erro na busca OSINT ({query}): {value}")
+                value = error_result(value)
+            results[query] = value
+        return results
+
+
+# Instância única compartilhada pelas rotas
+web_search = WebSearch()
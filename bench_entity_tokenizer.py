@@ -0,0 +1,123 @@
+"""
+Micro-benchmark do tokenizador de entidades (app/services/entity_tokenizer.py), em caracteres/s.
+
+Texto = dossiê MIND-7 sintético (bench_mind7_parser.synthetic_pages). Compara:
+- varredura única (tokenize) no texto inteiro
+- extração por linha: antes (um re.search por padrão, padrões recriados a cada linha)
+  x agora (first_by_kind, uma varredura por linha)
+- telefones + placas do Mind7Extractor: antes (findall x3 + janela de contexto por regex)
+  x agora (uma varredura, janela de contexto pelo offset)
+Antes de medir, confere os casos de regressão (REGRESSION) do tipo de cada entidade.
+
+    python bench_entity_tokenizer.py
+    python bench_entity_tokenizer.py --pages 200 --repeat 3
+"""
+import argparse
+import re
+import sys
+import time
+
+from app.services.entity_tokenizer import ENTITY_KINDS, first_by_kind, tokenize
+from bench_mind7_parser import synthetic_pages
+
+# (texto, [(tipo, valor)] esperados): 11 dígitos soltos = CPF só com dígito verificador válido
+REGRESSION = [
+    ("Celular 11987654321", [("PHONE", "11987654321")]),
+    ("CPF 52998224725", [("CPF", "52998224725")]),
+    ("CPF 529.982.247-25 tel (11) 98765-4321", [("CPF", "529.982.247-25"), ("PHONE", "(11) 98765-4321")]),
+    ("fixo 1133334444", [("PHONE", "1133334444")]),
+    ("Titulo Eleitor 123456789012", []),
+]
+
+
+def check_regression() -> bool:
+    ok = True
+    for text, expected in REGRESSION:
+        got = [(t.kind, t.value) for t in tokenize(text)]
+        if got != expected:
+            ok = False
+            print(f"REGRESSÃO: {text!r} -> {got} (esperado {expected})")
+    return ok
+
+
+# ---------- como era antes (referência) ----------
+def legacy_lines(text: str) -> int:
+    found = 0
+    for line in text.split("\n"):
+        if re.search(r'(?:\d{3}\.?\d{3}\.?\d{3}-?\d{2})', line):
+            found += 1
+        patterns = {
+            "PHONE": r'\b(?:[1-9]{2})\s?(?:9\d{4}[-\s]?\d{4}|[2-5]\d{3}[-\s]?\d{4})\b',
+            "PLACA": r'\b[A-Z]{3}[-]?[0-9][A-Z0-9][0-9]{2}\b',
+            "EMAIL": r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+        }
+        for pat in patterns.values():
+            if re.search(pat, line):
+                found += 1
+    return found
+
+
+def legacy_phones(text: str) -> int:
+    raw_matches = re.findall(r'\b\d{10,11}\b', text)
+    fmt_matches = re.findall(r'\(\d{2}\)\s?\d{4,5}[-\s]?\d{4}', text)
+    found = 0
+    for ph in set(raw_matches + fmt_matches):
+        window = re.search(f".{{0,200}}{re.escape(ph)}.{{0,200}}", text, re.DOTALL | re.IGNORECASE)
+        found += bool(window)
+    return found + len(re.findall(r'\b([A-Z]{3}[0-9][0-9A-Z][0-9]{2})\b', text))
+
+
+# ---------- agora ----------
+def tokenizer_lines(text: str) -> int:
+    return sum(len(first_by_kind(line)) for line in text.split("\n"))
+
+
+def tokenizer_phones(text: str) -> int:
+    first_seen = {}
+    placas = 0
+    for token in tokenize(text, ("PHONE", "PLACA")):
+        if token.kind == "PLACA":
+            placas += 1
+        else:
+            first_seen.setdefault(token.value, token)
+    for token in first_seen.values():
+        text[max(0, token.start - 200):token.end + 200].upper()
+    return len(first_seen) + placas
+
+
+def throughput(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - started)
+    return len(text) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=80, help="tamanho do dossiê sintético (páginas)")
+    parser.add_argument("--repeat", type=int, default=5, help="repetições (vale o melhor tempo)")
+    args = parser.parse_args()
+
+    if not check_regression():
+        return 1
+    text = "\n".join(synthetic_pages(args.pages))
+    counts = {kind: 0 for kind in ENTITY_KINDS}
+    for token in tokenize(text):
+        counts[token.kind] += 1
+    print(f"Texto: {len(text)} caracteres, {text.count(chr(10)) + 1} linhas; entidades: {counts}")
+
+    full = throughput(lambda t: sum(1 for _ in tokenize(t)), text, args.repeat)
+    print(f"{'tokenize (texto inteiro)':<36} {full / 1e6:>8.2f} M chars/s")
+    for label, before, after in (
+        ("por linha (extract_entities_from_pdf)", legacy_lines, tokenizer_lines),
+        ("telefones/placas (Mind7Extractor)", legacy_phones, tokenizer_phones),
+    ):
+        old = throughput(before, text, args.repeat)
+        new = throughput(after, text, args.repeat)
+        print(f"{label:<36} antes {old / 1e6:>6.2f}  agora {new / 1e6:>6.2f} M chars/s  ({new / old:.1f}x)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Benchmark do parser MIND-7 (parse_mind7_text): tempo de parse x número de páginas.
+
+Usa dossiês sintéticos com o layout do MIND-7 (mesmos rótulos e seções), sem pdfplumber:
+mede só o parse do texto. Com --baseline, compara com o parser de outra revisão do git
+(a revisão precisa ler o texto via pdf_text_cache, ou seja, a partir do cache de texto de PDF).
+
+    python bench_mind7_parser.py
+    python bench_mind7_parser.py --pages 1,10,40,80,160 --baseline HEAD~1
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+LINES_PER_PAGE = 45
+
+
+def synthetic_pages(pages: int) -> list:
+    """Dossiê MIND-7 sintético com ~LINES_PER_PAGE linhas por página."""
+    lines = [
+        "18/10/2026, 10:15 MIND-7 Consulta CPF",
+        "DADOS BÁSICOS",
+        "Nome Completo", "FULANO DE TAL SILVA",
+        "Nome da Mãe", "MARIA DE TAL",
+        "Nome do Pai", "JOSE DE TAL",
+        "CPF", "12345678901",
+        "Data de Nascimento", "01/01/1980",
+        "Sexo", "M",
+        "Estado Civil", "CASADO",
+        "Renda", "R$ 1.000,00",
+        "Faixa de Renda", "C",
+        "Nacionalidade", "BRASILEIRA",
+        "Email", "fulano@gmail.com",
+        "Data Atualização", "01/02/2023",
+        "Código Controle", "ABC123",
+        "RECEITA FEDERAL (2023)",
+        "Nome", "FULANO DE TAL SILVA",
+        "CPF", "123.456.789-01",
+        "Titulo Eleitor", "123456789012",
+        "Nascimento", "01/01/1980",
+        "Situação Cadastral", "REGULAR",
+        "Residente Exterior", "NAO",
+        "Endereço", "RUA DAS FLORES 123",
+        "Telefone", "(11) 3333-4444",
+        "Data Atualização", "01/02/2023",
+        "NOME NA RECEITA", "NOME DATA", "FULANO DE TAL SILVA 01/01/2020",
+        "ESCOLARIDADE", "NÍVEL DATA INCLUSÃO", "SUPERIOR COMPLETO 01/01/2010",
+    ]
+    # Seções repetitivas crescem com o tamanho do dossiê (telefones, endereços, parentes...)
+    n = max(1, (pages * LINES_PER_PAGE - 150) // 17)
+    lines += ["HISTÓRICO PROFISSIONAL", "CARGO DATA"]
+    for i in range(n):
+        lines += [f"ANALISTA NIVEL {i}", f"01/01/{2000 + i % 20}"]
+    lines += ["RAIS", "EMPRESA DATA", "EMPRESA EXEMPLO LTDA"]
+    lines += ["TELEFONES"]
+    for i in range(n):
+        lines += [f"(11) 9{i % 10000:04d}-4321 01/01/2020", "01/02/2021 PRIORIDADE: 1.0"]
+    lines += ["HISTÓRICO OPERADORAS", "TELEFONE DATA OPERADORA ATALHO"]
+    for i in range(n):
+        lines += [f"(11) 9{i % 10000:04d}-4321", "01/01/2020", "VIVO"]
+    lines += ["✉  E-MAILS"]
+    for i in range(n):
+        lines += [f"fulano{i}@gmail.com", "01/01/2020"]
+    lines += ["ENDEREÇOS", "ENDEREÇO CIDADE"]
+    for i in range(n):
+        lines += [f"RUA DAS FLORES {i}", "SAO PAULO/SP 01234-", "Bairro: CENTRO 567 10:00:00 01/01/2020", f"Prioridade: {i}"]
+    lines += ["PARENTES", "VINCULO NOME CPF"]
+    for i in range(n):
+        lines += ["IRMAO", f"CICLANO DE TAL {i}", f"{i:011d}"]
+    lines += [
+        "CLASSE SOCIAL", "CLASSE", "CLASSE C",
+        "INFORMAÇÕES DE CRÉDITO", "RENDA", "R$ 2.000,00", "mensal",
+        "PODER AQUISITIVO", "PODER", "BAIXO", "faixa 1", "faixa 2",
+        "TARGET DE RENDA", "TARGET", "ATE 2 SM", "faixa 1", "faixa 2",
+        "RISCO DE CRÉDITO", "RISCO", "MEDIO", "a", "b", "c",
+        "Segmento", "B1", "Segmento B1", "x", "y", "z",
+        "Segmento", "C2", "Segmento C2", "x", "y", "z",
+        "DOCUMENTOS", "PIS", "12345678901", "NIS", "10987654321", "RG", "1234567",
+        "IMPOSTO DE RENDA (IRPF)", "NAO DECLARANTE",
+        "SCORE (CSB8) 500 /1000 Risco: MEDIO",
+        "SCORE (CSBA) 300 /1000 Risco: ALTO",
+        "CREDIT ANALYTICS",
+        "Data Atualização 01/01/2020", "10:00:00",
+        "Finalidade Consumo pessoal",
+        "Perfil Mobile ALTO",
+        "Cliente Premium NAO",
+        "Perfil Luxo NAO",
+        "ProvedorInternet X",
+    ]
+    return ["\n".join(lines[i:i + LINES_PER_PAGE]) for i in range(0, len(lines), LINES_PER_PAGE)]
+
+
+def synthetic_pdf(pages: int) -> bytes:
+    """O mesmo dossiê sintético renderizado em PDF (reportlab), para os benchmarks com pdfplumber."""
+    import io
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    for text in synthetic_pages(pages):
+        y = A4[1] - 40
+        for line in text.split("\n"):
+            pdf.drawString(40, y, line)
+            y -= 17
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+class _TextsAsPdf:
+    """Substitui o pdf_text_cache do parser antigo: o 'arquivo' já é a lista de páginas."""
+
+    @staticmethod
+    def pages(texts):
+        return texts
+
+
+def load_baseline(rev: str):
+    source = subprocess.run(
+        ["git", "show", f"{rev}:app/reports/routes.py"], capture_output=True, text=True, check=True
+    ).stdout
+    namespace = {"__name__": "mind7_baseline"}
+    exec(compile(source, f"{rev}:app/reports/routes.py", "exec"), namespace)
+    namespace["pdf_text_cache"] = _TextsAsPdf()
+    if "parse_mind7_text" in namespace:
+        return namespace["parse_mind7_text"]
+    return namespace["parse_mind7_pdf_to_data"]
+
+
+def timed(parse, texts, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse(texts)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="1,5,10,20,40,80", help="tamanhos de dossiê (páginas)")
+    parser.add_argument("--repeat", type=int, default=5, help="repetições (vale o melhor tempo)")
+    parser.add_argument("--baseline", help="revisão do git para comparar (ex.: HEAD~1)")
+    args = parser.parse_args()
+
+    from app.reports.routes import parse_mind7_text
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    header = f"{'páginas':>8} {'linhas':>7} {'atual (ms)':>11}"
+    if baseline:
+        header += f" {args.baseline + ' (ms)':>16} {'ganho':>7}  saída"
+    print(header)
+    for pages in [int(p) for p in args.pages.split(",") if p.strip()]:
+        texts = synthetic_pages(pages)
+        n_lines = sum(t.count("\n") + 1 for t in texts)
+        current = timed(parse_mind7_text, texts, args.repeat)
+        row = f"{len(texts):>8} {n_lines:>7} {current * 1000:>11.2f}"
+        if baseline:
+            before = timed(baseline, texts, args.repeat)
+            same = "idêntica" if baseline(texts) == parse_mind7_text(texts) else "DIFERENTE"
+            row += f" {before * 1000:>16.2f} {before / current:>6.1f}x  {same}"
+        print(row)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
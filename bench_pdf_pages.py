@@ -0,0 +1,78 @@
+"""
+Benchmark da extração paralela por faixas de páginas (app/services/pdf_pool.py): speedup x páginas x cores.
+
+Para cada tamanho de dossiê MIND-7 sintético (bench_mind7_parser.synthetic_pdf), processa o PDF
+(sem cache de texto) com o documento inteiro num worker só e com as faixas divididas entre W
+workers, e confere que o resultado do parse é idêntico (junção das faixas na ordem).
+
+    python bench_pdf_pages.py
+    python bench_pdf_pages.py --pages 20,80,160 --workers 2,4,8 --repeat 3
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+# Cache de texto de PDF isolado para o benchmark (cada rodada usa um PDF com SHA-256 novo)
+os.environ["OSINT_PDF_TEXT_DIR"] = tempfile.mkdtemp(prefix="bench_pdf_text_")
+
+from app.reports.routes import parse_mind7_text  # noqa: E402
+from app.services.pdf_pool import PdfPool  # noqa: E402
+from bench_mind7_parser import synthetic_pages, synthetic_pdf  # noqa: E402
+
+_serial = 0
+
+
+def unique(pdf: bytes) -> bytes:
+    # Comentário no fim do arquivo: PDF igual, SHA-256 diferente (sempre miss no cache de texto)
+    global _serial
+    _serial += 1
+    return pdf + f"\n% bench {_serial}\n".encode()
+
+
+async def timed(pool: PdfPool, pdf: bytes, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await pool.process(unique(pdf), parse_mind7_text)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="10,40,80,160", help="tamanhos de dossiê (páginas)")
+    parser.add_argument("--workers", default=f"2,{max(2, os.cpu_count() or 2)}", help="workers para a divisão")
+    parser.add_argument("--chunk", type=int, default=4, help="mínimo de páginas por faixa")
+    parser.add_argument("--repeat", type=int, default=2, help="repetições (vale o melhor tempo)")
+    args = parser.parse_args()
+
+    worker_counts = sorted({int(w) for w in args.workers.split(",") if w.strip()})
+    pools = {0: PdfPool(workers=max(worker_counts), split_pages=0, queue=4)}
+    for w in worker_counts:
+        pools[w] = PdfPool(workers=w, split_pages=1, chunk_pages=args.chunk, queue=4)
+    for pool in pools.values():
+        await pool.prewarm()
+
+    print(f"CPUs: {os.cpu_count()}")
+    header = f"{'páginas':>8} {'inteiro (s)':>12}"
+    for w in worker_counts:
+        header += f" {f'{w} workers (s)':>15} {'speedup':>8}"
+    print(header + "  saída")
+    for pages in [int(p) for p in args.pages.split(",") if p.strip()]:
+        pdf = synthetic_pdf(pages)
+        whole, expected = await timed(pools[0], pdf, args.repeat)
+        row, same = f"{len(synthetic_pages(pages)):>8} {whole:>12.2f}", True
+        for w in worker_counts:
+            split, result = await timed(pools[w], pdf, args.repeat)
+            same = same and result == expected
+            row += f" {split:>15.2f} {whole / split:>7.2f}x"
+        print(row + ("  idêntica" if same else "  DIFERENTE"))
+
+    for pool in pools.values():
+        await pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
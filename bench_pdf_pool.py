@@ -0,0 +1,91 @@
+"""
+Benchmark do pool de processos de PDF (app/services/pdf_pool.py): vazão e atraso do event loop.
+
+N dossiês MIND-7 sintéticos (bench_mind7_parser.synthetic_pdf) processados em paralelo:
+- inline: pdfplumber + parse dentro da corrotina, como as rotas faziam (trava o loop)
+- pool:   pdf_pool.process, com W processos
+Enquanto isso um "tique" de 10 ms mede o atraso do event loop (o que as outras requisições sentem).
+
+    python bench_pdf_pool.py
+    python bench_pdf_pool.py --pdfs 16 --pages 30 --workers 1,2,4
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+# Cache de texto de PDF isolado (e vazio) para o benchmark
+os.environ["OSINT_PDF_TEXT_DIR"] = tempfile.mkdtemp(prefix="bench_pdf_text_")
+
+from app.reports.routes import parse_mind7_text  # noqa: E402
+from app.services.pdf_pool import PdfPool  # noqa: E402
+from app.services.pdf_text_cache import extract_pages  # noqa: E402
+from bench_mind7_parser import synthetic_pdf  # noqa: E402
+
+TICK = 0.01
+
+
+async def measure(work) -> dict:
+    """Roda work() medindo o atraso do event loop a cada TICK."""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - before - TICK)
+
+    tick_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick_task
+    lags.sort()
+    return {
+        "elapsed": elapsed,
+        "max_lag": lags[-1] if lags else elapsed,
+        "p99_lag": lags[int(len(lags) * 0.99)] if lags else elapsed,
+    }
+
+
+def variants(base: bytes, count: int, tag: str) -> list:
+    # Comentário no fim do arquivo: PDF igual, SHA-256 diferente (sem hit no cache de texto)
+    return [base + f"\n% {tag} {i}\n".encode() for i in range(count)]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdfs", type=int, default=8, help="PDFs processados em paralelo")
+    parser.add_argument("--pages", type=int, default=30, help="páginas por PDF")
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 2}", help="tamanhos de pool a testar")
+    args = parser.parse_args()
+
+    base = synthetic_pdf(args.pages)
+    print(f"{args.pdfs} PDFs x {args.pages} páginas ({len(base) // 1024} KB cada), CPUs: {os.cpu_count()}")
+    print(f"{'modo':<12} {'tempo (s)':>10} {'PDFs/s':>8} {'atraso máx (ms)':>16} {'p99 (ms)':>9}")
+
+    async def inline():
+        async def one(pdf):
+            parse_mind7_text(extract_pages(pdf))
+        await asyncio.gather(*[one(pdf) for pdf in variants(base, args.pdfs, "inline")])
+
+    rows = [("inline", await measure(inline))]
+    for workers in sorted({int(w) for w in args.workers.split(",") if w.strip()}):
+        pool = PdfPool(workers=workers, queue=args.pdfs)
+        await pool.prewarm()
+        pdfs = variants(base, args.pdfs, f"pool{workers}")
+        rows.append((f"pool x{workers}", await measure(
+            lambda: asyncio.gather(*[pool.process(pdf, parse_mind7_text) for pdf in pdfs])
+        )))
+        await pool.close()
+
+    for label, r in rows:
+        print(f"{label:<12} {r['elapsed']:>10.2f} {args.pdfs / r['elapsed']:>8.2f} "
+              f"{r['max_lag'] * 1000:>16.1f} {r['p99_lag'] * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,215 @@
+"""
+Benchmark offline do pipeline de scan com fitas gravadas (app/services/tool_replay.py), sem rede.
+
+Gravar fitas (uma vez, com rede):
+    OSINT_RECORD_DIR=bench_tapes uvicorn app.main:app      # e use as rotas /analyze/* normalmente
+Rodar:
+    python bench_scan_pipeline.py --tapes bench_tapes
+    python bench_scan_pipeline.py --synthetic                      # fitas sintéticas geradas na hora
+    python bench_scan_pipeline.py --synthetic --speed 0 -n 32 --concurrency 1,2,4,8
+
+Mede:
+- parse: custo dos parsers de linha e do relatório JSON do Maigret (linhas/s, MB/s)
+- throughput: scans ponta a ponta por segundo (run_sherlock, run_maigret, run_holehe, run_dorks)
+- escala: throughput das ferramentas conforme o limite de concorrência do ToolRunner
+"""
+import argparse
+import asyncio
+import glob
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+SYNTHETIC_TARGET = "alvo_sintetico"
+
+
+def _write(folder, name, tape):
+    with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+        json.dump(tape, f, ensure_ascii=False)
+
+
+def synthetic_tapes(folder, sites=400, hits=25, duration=6.0):
+    """Fitas com o formato real de saída de cada ferramenta (conteúdo inventado, ritmo parecido)."""
+    from app.services.dorks import build_dorks
+
+    rng = random.Random(42)
+    os.makedirs(folder, exist_ok=True)
+    user = SYNTHETIC_TARGET
+    claimed = set(rng.sample(range(sites), hits))
+
+    def paced(lines):
+        offsets = sorted(rng.uniform(0, duration) for _ in lines)
+        return [[round(t, 4), line] for t, line in zip(offsets, lines)]
+
+    sherlock = [
+        f"[+] Site{i}: https://site{i}.com/{user}" if i in claimed else f"[-] Site{i}: Not Found!"
+        for i in range(sites)
+    ]
+    _write(folder, f"sherlock__{user}__0.json", {
+        "version": 1, "tool": "sherlock", "target": user, "returncode": 0,
+        "wall_time": duration + 0.3, "lines": paced(sherlock), "stderr": "", "files": {},
+    })
+
+    maigret = [
+        f"[+] Site{i}: https://site{i}.com/{user}" if i in claimed else f"[-] Site{i}: Not found!"
+        for i in range(sites)
+    ]
+    report = {
+        f"Site{i}": {
+            "username": user,
+            "url_user": f"https://site{i}.com/{user}",
+            "url_main": f"https://site{i}.com",
+            "http_status": 200,
+            "rank": i + 1,
+            "status": {"status": "Claimed", "tags": ["social", "br"], "ids": {"uid": str(i)}},
+            "site": {"alexaRank": i + 1, "checkType": "status_code", "tags": ["social"]},
+        }
+        for i in sorted(claimed)
+    }
+    _write(folder, f"maigret__{user}__0.json", {
+        "version": 1, "tool": "maigret", "target": user, "returncode": 0,
+        "wall_time": duration + 0.5, "lines": paced(maigret), "stderr": "",
+        "files": {f"report_{user}_simple.json": json.dumps(report)},
+    })
+
+    holehe = [f"[+] servico{i}.com" for i in range(5)]
+    _write(folder, f"holehe__{user}__0.json", {
+        "version": 1, "tool": "holehe", "target": user, "returncode": 0,
+        "wall_time": duration / 2, "lines": paced(holehe), "stderr": "", "files": {},
+    })
+
+    for n, dork in enumerate(build_dorks("Alvo Sintetico")):
+        _write(folder, f"dork__{n:02d}__0.json", {
+            "version": 1, "tool": "dork", "target": dork, "latency": round(rng.uniform(0.5, 1.5), 3),
+            "urls": [f"https://exemplo{n}-{k}.com.br/pagina/{k}" for k in range(8)],
+        })
+
+
+def load_tapes(folder):
+    tapes = {}
+    for path in sorted(glob.glob(os.path.join(folder, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            tape = json.load(f)
+        tapes.setdefault(tape["tool"], []).append(tape)
+    return tapes
+
+
+def bench_parse(main, tapes, repeat):
+    from app.services.maigret_report import iter_json_object_items, maigret_hit
+
+    parsers = {
+        "sherlock": lambda line, target: main.parse_sherlock_line(line) or main.parse_not_found_line(line),
+        "maigret": lambda line, target: main.parse_maigret_line(line, target) or main.parse_not_found_line(line),
+        "holehe": lambda line, target: main.parse_holehe_line(line),
+    }
+    print("\n=== PARSE ===")
+    for tool, parse in parsers.items():
+        lines = [(text, tape["target"]) for tape in tapes.get(tool, []) for _, text in tape["lines"]]
+        if not lines:
+            continue
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for text, target in lines:
+                parse(text, target)
+        elapsed = time.perf_counter() - started
+        print(f"{tool:<9} {len(lines) * repeat:>8} linhas  {len(lines) * repeat / elapsed:>12,.0f} linhas/s")
+
+    reports = [content for tape in tapes.get("maigret", []) for content in tape.get("files", {}).values()]
+    if reports:
+        size = sum(len(r) for r in reports) * repeat
+        hits = 0
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for content in reports:
+                for name, entry in iter_json_object_items(io.StringIO(content)):
+                    hits += maigret_hit(name, entry) is not None
+        elapsed = time.perf_counter() - started
+        print(f"{'relatório':<9} {size / 1e6:>8.2f} MB     {size / 1e6 / elapsed:>12,.1f} MB/s ({hits} hits)")
+
+
+async def bench_throughput(main, runs, label):
+    """Dispara `runs` scans de cada ferramenta ao mesmo tempo (alvos distintos) e mede scans/s."""
+    scanners = {
+        "sherlock": lambda t: main.run_sherlock(t, refresh=True),
+        "maigret": lambda t: main.run_maigret(t, refresh=True),
+        "holehe": lambda t: main.run_holehe(f"{t}@exemplo.com"),
+        "dorks": lambda t: main.run_dorks(t),
+    }
+    rows = {}
+    for tool, scan in scanners.items():
+        targets = [f"bench{i}" for i in range(runs)]
+        started = time.perf_counter()
+        results = await asyncio.gather(*[scan(t) for t in targets])
+        elapsed = time.perf_counter() - started
+        hits = sum(1 for res in results for r in res if "info" not in r and "checks" not in r)
+        rows[tool] = runs / elapsed
+        print(f"{label:<10} {tool:<9} {runs:>4} scans em {elapsed:7.2f}s  {runs / elapsed:7.2f} scans/s  ({hits} hits)")
+    return rows
+
+
+async def bench(args):
+    import app.main as main
+    from app.services.tool_runner import MemoryBudget, ToolRunner
+
+    tapes = load_tapes(args.tapes)
+    if not tapes:
+        print(f"❌ Nenhuma fita em {args.tapes}. Grave com OSINT_RECORD_DIR ou use --synthetic.")
+        return
+    print(f"Fitas: {', '.join(f'{tool}={len(t)}' for tool, t in sorted(tapes.items()))} | velocidade {args.speed}x")
+
+    bench_parse(main, tapes, args.repeat)
+
+    print("\n=== THROUGHPUT / ESCALA ===")
+    scaling = {}
+    for level in args.concurrency:
+        main.tool_runner = ToolRunner(
+            max_concurrency=level,
+            tool_limits={tool: level for tool in ("sherlock", "maigret", "holehe")},
+            memory=MemoryBudget(budget_mb=0),
+        )
+        scaling[level] = await bench_throughput(main, args.runs, f"conc={level}")
+
+    base = scaling[args.concurrency[0]]
+    print("\n=== GANHO x CONCORRÊNCIA (vs conc=%d) ===" % args.concurrency[0])
+    for level, rows in scaling.items():
+        gains = "  ".join(f"{tool}={rows[tool] / base[tool]:.2f}x" for tool in ("sherlock", "maigret", "holehe"))
+        print(f"conc={level:<4} {gains}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tapes", help="pasta com as fitas gravadas (OSINT_RECORD_DIR)")
+    parser.add_argument("--synthetic", action="store_true", help="gera fitas sintéticas numa pasta temporária")
+    parser.add_argument("--speed", type=float, default=1.0, help="ritmo do replay (1 = gravado, 0 = sem espera)")
+    parser.add_argument("-n", "--runs", type=int, default=8, help="scans simultâneos por ferramenta")
+    parser.add_argument("--concurrency", default="1,2,4", help="limites do ToolRunner a comparar")
+    parser.add_argument("--repeat", type=int, default=20, help="repetições do benchmark de parse")
+    args = parser.parse_args()
+    if not args.tapes and not args.synthetic:
+        parser.error("informe --tapes ou --synthetic")
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    # Ambiente isolado: replay no lugar das ferramentas, bancos SQLite e pastas de dados descartáveis
+    workdir = tempfile.mkdtemp(prefix="bench_scan_")
+    args.tapes = args.tapes or os.path.join(workdir, "tapes")
+    os.environ.update({
+        "OSINT_REPLAY_DIR": args.tapes,
+        "OSINT_REPLAY_ANY": "1",
+        "OSINT_REPLAY_SPEED": str(args.speed),
+        "OSINT_RECORD_DIR": "",
+        "OSINT_WARM_WORKERS": "0",
+        "OSINT_CACHE_DB": os.path.join(workdir, "cache.db"),
+        "OSINT_SEARCH_CACHE_DB": os.path.join(workdir, "search_cache.db"),
+        "OSINT_JOBS_DB": os.path.join(workdir, "jobs.db"),
+        "OSINT_SITE_HEALTH_DB": os.path.join(workdir, "sites.db"),
+        "OSINT_ARTIFACT_DIR": os.path.join(workdir, "artifacts"),
+        "OSINT_PDF_TEXT_DIR": os.path.join(workdir, "pdf_text"),
+        "OSINT_EMAIL_DOMAIN_INDEX": os.path.join(workdir, "email_domains.idx"),
+    })
+    if args.synthetic:
+        synthetic_tapes(args.tapes)
+    sys.exit(asyncio.run(bench(args)))
@@ -0,0 +1,57 @@
+"""
+Benchmark: processo frio (`python -m <ferramenta>`) x worker quente (app/services/tool_workers.py).
+
+Uso:
+    python bench_tool_workers.py                         # sherlock_project --version
+    python bench_tool_workers.py maigret --version -n 10
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+
+from app.services.tool_runner import ToolRunner
+from app.services.tool_workers import WarmWorkerPool
+
+
+def summary(label, samples):
+    print(f"{label:<8} n={len(samples):<3} média={statistics.mean(samples):.3f}s "
+          f"mediana={statistics.median(samples):.3f}s min={min(samples):.3f}s max={max(samples):.3f}s")
+
+
+async def bench(module, tool_args, runs, timeout):
+    cmd = [sys.executable, "-m", module, *tool_args]
+
+    cold_runner = ToolRunner(pool=None)
+    cold = []
+    for _ in range(runs):
+        res = await cold_runner.run(module, cmd, timeout=timeout, keep_output=False)
+        cold.append(res["wall_time"])
+
+    pool = WarmWorkerPool(modules=[module], max_jobs=runs + 1)
+    warm_runner = ToolRunner(pool=pool)
+    await pool.prewarm()
+    if not pool.idle[module]:
+        print(f"❌ Worker quente de {module} não subiu; só há números do processo frio.")
+        summary("frio", cold)
+        return
+    warm = []
+    for _ in range(runs):
+        res = await warm_runner.run(module, cmd, timeout=timeout, keep_output=False)
+        warm.append(res["wall_time"])
+    await pool.close()
+
+    print("\n=== RESULTADO ===")
+    print(f"Comando: {' '.join(cmd[1:])}")
+    summary("frio", cold)
+    summary("quente", warm)
+    print(f"Ganho (mediana): {statistics.median(cold) / max(statistics.median(warm), 1e-6):.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("module", nargs="?", default="sherlock_project")
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=90)
+    args, tool_args = parser.parse_known_args()
+    asyncio.run(bench(args.module, tool_args or ["--version"], args.runs, args.timeout))